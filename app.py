@@ -1,430 +1,337 @@
-import io
-import json
-from datetime import datetime, timedelta
-from decimal import Decimal
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-
-import openai
-import pandas as pd
+from datetime import datetime
+
 import streamlit as st
 
-from auth import Auth, initialize_auth
-from db import Database
-from fpdf import FPDF
-from pages.Project_Management import generate_pdf, send_email
+from auth import get_db, initialize_auth, logout, shows_outage
+import audit
+from pricing import calculate_quote
+import metrics
+from query_stats import counts_rerun
+
+# openai, pandas, fpdf and the email modules are imported where they are
+# first used, so a cold start or autoscaled server only pays for streamlit.
 
 
 
 # Initialize session state so it 
 if "team_selections" not in st.session_state:
     st.session_state.team_selections = []
-if "previous_selections" not in st.session_state:
-    st.session_state.previous_selections = {}
-
-def apply_psychological_pricing(price):
-    #Apply psychological pricing strategy by converting to .99 format
-    if price >= 100:
-        # For prices >= 100, round to nearest whole number and subtract 0.01
-        return round(price) - 0.01
-    else:
-        # For prices < 100, round to nearest 0.99
-        return round(price - 0.01) + 0.99
-
-
-# def calculate_quote(team_selections, timeline_weeks, tech_stack, complexity, marketing_strategy, db,):
-#     base_cost = 0.0
-
-#     # Calculate team cost using default rates
-#     for member in team_selections:
-#         if member.get("name"):
-#             # Get default rate from database
-#             team_member = db.get_team_member_by_name(member["name"])
-#             if team_member:
-#                 base_cost += float(team_member["default_rate"]) * float(timeline_weeks)
-
-#     # Add pricing for tech stack components
-#     for tech in tech_stack:
-#         tech_price = db.get_component_price(tech, "Technology Stack")
-#         base_cost += float(tech_price["base_price"]) * float(tech_price["multiplier"])
-
-#     # Add pricing for complexity
-#     complexity_price = db.get_component_price(complexity, "Complexity")
-#     base_cost += float(complexity_price["base_price"]) * float(complexity_price["multiplier"])
-
-#     # Get the profit margin from the previous month
-#     last_month = (datetime.now() - timedelta(days=30)).strftime("%B %Y")
-#     previous_revenue = db.get_previous_month_revenue(last_month)
-#     profit_margin = float(previous_revenue) if previous_revenue else 50.0
-
-#     total_cost_with_margin = base_cost * (1 + profit_margin / 100)
-
-#     # Apply marketing strategy pricing
-#     if marketing_strategy == "Psychological Pricing":
-#         total_cost_with_margin = apply_psychological_pricing(total_cost_with_margin)
-#     else:
-#         # Get pricing adjustment from database for other strategies
-#         strategy_price = db.get_component_price(marketing_strategy, "Pricing Strategy")
-#         if strategy_price:
-#             total_cost_with_margin *= float(strategy_price["multiplier"])
-
-#     profit = total_cost_with_margin - base_cost
-
-#     return base_cost, total_cost_with_margin, profit, profit_margin
-
-def calculate_quote(team_selections, timeline_weeks, tech_stack, complexity, marketing_strategy, db):
-    base_cost = 0.0
-    
-    print("\n=== DETAILED COST CALCULATION LOG ===")
-    print(f"\nTimeline: {timeline_weeks} weeks")
-    print(f"Complexity: {complexity}")
-    print(f"Marketing Strategy: {marketing_strategy}")
-    
-    # Get current month for reference
-    current_month = datetime.now().strftime("%B %Y")
-    print(f"\nCalculation Month: {current_month}")
-    
-    # Calculate team cost
-    print("\n1. TEAM COSTS:")
-    team_total = 0
-    for member in team_selections:
-        if member.get("name"):
-            team_member = db.get_team_member_by_name(member["name"])
-            if team_member:
-                member_cost = float(team_member["default_rate"]) * float(timeline_weeks)
-                team_total += member_cost
-                print(f"   - {member['name']} ({member['role']}):")
-                print(f"     Rate: ${float(team_member['default_rate'])}/week")
-                print(f"     Timeline: {timeline_weeks} weeks")
-                print(f"     Total: ${member_cost:,.2f}")
-    
-    base_cost += team_total
-    print(f"\nTotal Team Cost: ${team_total:,.2f}")
-    
-    # Technology stack costs
-    print("\n2. TECHNOLOGY STACK COSTS:")
-    tech_total = 0
-    for tech in tech_stack:
-        tech_price = db.get_component_price(tech, "Technology Stack")
-        tech_cost = float(tech_price["base_price"]) * float(tech_price["multiplier"])
-        tech_total += tech_cost
-        print(f"   - {tech}:")
-        print(f"     Base Price: ${float(tech_price['base_price']):,.2f}")
-        print(f"     Multiplier: {float(tech_price['multiplier'])}")
-        print(f"     Total: ${tech_cost:,.2f}")
-    
-    base_cost += tech_total
-    print(f"\nTotal Tech Stack Cost: ${tech_total:,.2f}")
-    
-    # Complexity costs
-    print("\n3. COMPLEXITY COSTS:")
-    complexity_price = db.get_component_price(complexity, "Complexity")
-    complexity_cost = float(complexity_price["base_price"]) * float(complexity_price["multiplier"])
-    base_cost += complexity_cost
-    print(f"   - {complexity}:")
-    print(f"     Base Price: ${float(complexity_price['base_price']):,.2f}")
-    print(f"     Multiplier: {float(complexity_price['multiplier'])}")
-    print(f"     Total: ${complexity_cost:,.2f}")
-    
-    # Get the profit margin
-    last_month = (datetime.now() - timedelta(days=30)).strftime("%B %Y")
-    previous_revenue = db.get_previous_month_revenue(last_month)
-    print("Previous Month Revenue:", previous_revenue);
-    profit_margin = float(previous_revenue) if previous_revenue else 50.0  # Default margin
-    
-    print(f"\n4. PROFIT CALCULATION:")
-    print(f"   Previous Month: {last_month}")
-    print(f"   Previous Month Revenue: ${previous_revenue if previous_revenue else 'No data'}")
-    print(f"   Applied Profit Margin: {profit_margin}%")
-    
-    # Calculate total with margin
-    total_cost_with_margin = base_cost * (1 + profit_margin / 100)
-    
-    print("\n5. MARKETING STRATEGY ADJUSTMENT:")
-    if marketing_strategy == "Psychological Pricing":
-        original_price = total_cost_with_margin
-        total_cost_with_margin = apply_psychological_pricing(total_cost_with_margin)
-        print(f"   - Psychological Pricing Applied:")
-        print(f"     Original: ${original_price:,.2f}")
-        print(f"     Adjusted: ${total_cost_with_margin:,.2f}")
-    else:
-        strategy_price = db.get_component_price(marketing_strategy, "Pricing Strategy")
-        print(f"   Retrieved strategy price data: {strategy_price}")  # Debug print
-        
-        if strategy_price and 'multiplier' in strategy_price:
-            original_price = total_cost_with_margin
-            multiplier = float(strategy_price['multiplier'])
-            total_cost_with_margin *= multiplier
-            print(f"   - {marketing_strategy}:")
-            print(f"     Original: ${original_price:,.2f}")
-            print(f"     Multiplier: {multiplier}")
-            print(f"     Adjusted: ${total_cost_with_margin:,.2f}")
-        else:
-            print(f"   Warning: Could not find valid multiplier for {marketing_strategy}")
-    
-    # Calculate final profit
-    profit = total_cost_with_margin - base_cost
-    
-    print("\n=== FINAL COST BREAKDOWN ===")
-    print(f"Base Development Cost: ${base_cost:,.2f}")
-    print(f"Profit Margin: {profit_margin}%")
-    print(f"Profit Amount: ${profit:,.2f}")
-    print(f"Total Cost (with margin): ${total_cost_with_margin:,.2f}")
-    print(f"Weekly Revenue Rate: ${total_cost_with_margin/float(timeline_weeks):,.2f}/week")
-    print("==============================\n")
-    
-    return base_cost, total_cost_with_margin, profit, profit_margin
-
-def generate_proposal(project_details):
-    #"""Generate project proposal using OpenAI"""
-    openai.api_key = st.secrets["openai_api_key"]
-
-    team_details = "\n".join(
-        [
-            f"- {member['name']} ({member['role']})"
-            for member in project_details["team_selections"]
-        ]
-    )
 
-    prompt = f"""Generate a professional website development proposal for {project_details['client_name']}.
-    Project Details:
-    - Pages: {project_details['pages']}
-    - Complexity: {project_details['complexity']}
-    - Technology Stack: {', '.join(project_details['tech_stack'])}
-    - Timeline: {project_details['timeline']} weeks
-    - Budget: ${project_details['total_cost']:,.2f}
-
-    Team Allocation:
-    {team_details}
-
-    Include:
-    1. Project Overview
-    2. Scope of Work
-    3. Technical Approach
-    4. Timeline
-    5. Team Composition
-    6. Cost Breakdown
-    
-    Don't include thing such as:
-    Sincerely,
-    [Your Name]
-    [Web Development Agency]
-    """
+def generate_proposal(project_details, use_template=False):
+    """Generate the project proposal with OpenAI, or from the local template.
 
-    
-
-    response = openai.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {
-                "role": "system",
-                "content": "You are a professional proposal writer for a web development agency.",
-            },
-            {"role": "user", "content": prompt},
-        ],
-    )
+    The template is also used when OpenAI takes longer than
+    PROPOSAL_LATENCY_BUDGET or fails. Returns (proposal, notice), where
+    notice says why the template was used instead, or is None.
+    """
+    from proposals import MODEL, proposal_messages, record_usage, render_proposal
 
-    return response.choices[0].message.content
+    if use_template:
+        return render_proposal(project_details), None
 
-def main():
+    import openai
+    from config import OPENAI_BASE_URL, PROPOSAL_LATENCY_BUDGET
 
-    st.set_page_config(
-        page_title="Website Quote Generator",
-        page_icon="💰",
-        layout="wide",
+    # No retries: a second attempt would only take the budget past its limit
+    client = openai.OpenAI(
+        api_key=st.secrets["openai_api_key"],
+        base_url=OPENAI_BASE_URL or None,
+        timeout=PROPOSAL_LATENCY_BUDGET,
+        max_retries=0,
     )
-
-    if 'db' not in st.session_state:
-        st.session_state.db = Database()
-
-    # Check if user is logged in
-    if not initialize_auth():
-        return
+    try:
+        with metrics.timed("proposal_seconds", failures="proposal_failures_total"):
+            response = client.chat.completions.create(
+                model=MODEL,
+                messages=proposal_messages(project_details),
+            )
+    except openai.APITimeoutError:
+        notice = f"OpenAI took longer than {PROPOSAL_LATENCY_BUDGET:g}s, so the proposal was written from the standard template."
+    except openai.OpenAIError as e:
+        notice = f"OpenAI could not write the proposal ({e}), so it was written from the standard template."
+    else:
+        record_usage(response.usage)
+        return response.choices[0].message.content, None
+    finally:
+        client.close()
+
+    metrics.inc("proposal_fallbacks_total")
+    return render_proposal(project_details), notice
+
+NO_MEMBER = "Select a team member"
+QUOTE_FIELDS = ["client_name", "client_email", "pages", "complexity", "timeline", "tech_stack", "selected_strategy"]
+PROPOSAL_SOURCES = ["AI-written", "Standard template"]
+
+
+# Catalog lookups are identical for every user and rarely change, so they
+# are shared across sessions instead of being queried on every rerun. The
+# three reads are independent and are fetched concurrently.
+@st.cache_data(ttl=60, show_spinner=False)
+def load_catalog(_db):
+    tech_stack, pricing_strategies, team_members = _db.gather(
+        lambda reader: reader.get_componenents("Technology Stack"),
+        lambda reader: reader.get_componenents("Pricing Strategy"),
+        lambda reader: reader.get_team_members(),  # Get all team members regardless of role
+    )
+    return {
+        "tech_options": [tech["name"] for tech in tech_stack],
+        "pricing_strategies": [pricing["name"] for pricing in pricing_strategies],
+        "team_members": team_members,
+    }
 
 
-    st.title("Website Quote Generator")
+def format_team_option(member):
+    return f"{member['name']} | {member['role']} | {member['role_type']} | ${member['default_rate']:.2f}"
 
-    # Initialize database
-    db = Database()
 
-    # Add team member button (outside form)
+def on_team_member_selected(i):
+    selection = st.session_state[f"team_selection_{i}"]
+    if selection == NO_MEMBER:
+        st.session_state.team_selections[i] = {"name": None, "role": None, "role_type": None}
+    else:
+        # Split and take only the first three parts (name, role, role_type)
+        parts = selection.split(" | ")
+        st.session_state.team_selections[i] = {
+            "name": parts[0],
+            "role": parts[1],
+            "role_type": parts[2]
+        }
+    # The team changes the price, so the preview reruns with it
+    st.rerun(["team_selection", "price_preview"])
+
+
+def on_team_member_removed(i):
+    selections = st.session_state.team_selections
+    selections.pop(i)
+    # Shift the selectbox states down so each row keeps its member
+    for j in range(i, len(selections)):
+        st.session_state[f"team_selection_{j}"] = st.session_state.get(f"team_selection_{j + 1}", NO_MEMBER)
+    st.session_state.pop(f"team_selection_{len(selections)}", None)
+    st.rerun(["team_selection", "price_preview"])
+
+
+@st.fragment(key="team_selection")
+@counts_rerun("team_selection")
+@shows_outage
+def team_selection_section():
+    db = get_db()
+    st.subheader("Team Allocation")
+
+    # Adding an empty slot doesn't change the price, so only this fragment reruns
     if st.button("Add Team Member"):
         st.session_state.team_selections.append({
             "name": None,
             "role": None,
         })
-        st.rerun()
 
-    # Main form
-    with st.form("quote_form"):
-        st.header("Project Details")
+    team_options = [NO_MEMBER] + [format_team_option(m) for m in load_catalog(db)["team_members"]]
+    options_by_name = {m["name"]: format_team_option(m) for m in load_catalog(db)["team_members"]}
+    for i, member in enumerate(st.session_state.team_selections):
+        # Selectbox state is dropped when another page is shown, and the
+        # budget optimizer fills team_selections directly; show what's there
+        if f"team_selection_{i}" not in st.session_state:
+            st.session_state[f"team_selection_{i}"] = options_by_name.get(member.get("name"), NO_MEMBER)
 
-        # Client Information
-        col1, col2 = st.columns(2)
-        with col1:
-            client_name = st.text_input("Client Name")
-        with col2:
-            client_email = st.text_input("Client Email")
-
-        # Project Specifications
-        col1, col2, col3 = st.columns(3)
+    for i in range(len(st.session_state.team_selections)):
+        col1, col2 = st.columns([4, 1])
         with col1:
-            pages = st.number_input("Number of Pages", min_value=1, value=1)
-        with col2:
-            complexity = st.selectbox("Project Complexity", [
-                                    "Website", "Project", "Product"])
-        with col3:
-            timeline = st.number_input(
-                "Project Timeline (weeks)", min_value=1, value=4)
-
-        # Get technology stack options from database
-        tech_options = [tech["name"] for tech in db.get_componenents("Technology Stack")]
-        tech_stack = st.multiselect("Select Technology Stack", tech_options)
-
-
-        # Marketing Strategy
-        pricing_strategies = [pricing["name"] for pricing in db.get_componenents("Pricing Strategy")]
-        selected_strategy = st.selectbox(
-            "Select Marketing Strategy", 
-            pricing_strategies
-        )
-
-        # Team Selection
-        st.subheader("Team Allocation")
-        
-        # Get team members from database
-        team_members = db.get_team_members()  # Get all team members regardless of role
-
-        # Team Member Selections
-        st.subheader("Team Members")
-        for i in range(len(st.session_state.team_selections)):
-            # Create options list with all team members
-            team_options = ["Select a team member"] + [
-                f"{m['name']} | {m['role']} | {m['role_type']} | ${m['default_rate']:.2f}" 
-                for m in team_members
-            ]
-            
-            member_key = f"team_selection_{i}"
-            member_selection = st.selectbox(
+            st.selectbox(
                 "Select Team Member",
                 team_options,
-                key=member_key
+                key=f"team_selection_{i}",
+                on_change=on_team_member_selected,
+                args=(i,)
             )
-    
-            # Check if selection changed
-            prev_selection = st.session_state.previous_selections.get(member_key)
-            if member_selection != prev_selection:
-                st.session_state.previous_selections[member_key] = member_selection
-                if i < len(st.session_state.team_selections):
-                    if member_selection != "Select a team member":
-                        # Split and take only the first three parts (name, role, role_type)
-                        parts = member_selection.split(" | ")
-                        st.session_state.team_selections[i] = {
-                            "name": parts[0],
-                            "role": parts[1],
-                            "role_type": parts[2]
-                    }
-                    else:
-                        st.session_state.team_selections[i] = {
-                            "name": None,
-                            "role": None,
-                            "role_type": None
-                        }
-
-
-        # Calculate base cost and total cost with margin
-        base_cost, total_cost_with_margin, profit, profit_margin_percentage = calculate_quote(
-            st.session_state.team_selections, 
-            timeline, 
-            tech_stack, 
-            complexity, 
-            selected_strategy,
-            db)
-
-
-        st.write(f"Base Development Cost: ${base_cost:,.2f}")
-        st.write(f"Total Cost (with margin): ${total_cost_with_margin:,.2f}")
-        st.write(f"Profit: ${profit:,.2f}")
-
-        # Form submit button
-        submitted = st.form_submit_button("Generate Quote")
-        if submitted:
-            if not st.session_state.team_selections:
-                st.error("Please add at least one team member.")
-                return
-
-            # Prepare team selections with rates from database
-            team_selections_with_rates = []
-            for member in st.session_state.team_selections:
-                if member["name"] is not None:
-                    team_member_data = db.get_team_member_by_name(member["name"])
-                    if team_member_data:
-                        team_selections_with_rates.append({
-                            "name": member["name"],
-                            "role": member["role"],
-                            "role_type": member["role_type"],
-                            "default_rate": float(team_member_data["default_rate"])
-                        })
-
-            project_details = {
-                "client_name": client_name,
-                "client_email": client_email,
-                "pages": pages,
-                "complexity": complexity,
-                "tech_stack": tech_stack,
-                "timeline": timeline,
-                "margin_percentage": profit_margin_percentage,
-                "marketing_strategy": selected_strategy,
-                "marketing_cost": 0.00,
-                "team_selections": team_selections_with_rates,  # Use the enriched team data
-                "total_cost": total_cost_with_margin,
-                "base_cost": base_cost,
-                "profit": profit,
-                "date": datetime.now().strftime("%Y-%m-%d"),
-            }
-
-            with st.spinner("Generating proposal..."):
-                proposal = generate_proposal(project_details)
-                project_details["proposal"] = proposal
-
-            st.success(f"Quote Generated: ${total_cost_with_margin:,.2f}")
-            st.subheader("Generated Proposal")
-            st.text_area("Proposal", proposal, height=300)
-
-            st.subheader("Cost Breakdown")
-            breakdown_data = [
-                {
-                    "Team Member": member["name"],
-                    "Weekly Rate ($)": member["default_rate"],
-                    "Total Cost": float(member["default_rate"]) * timeline,
-                }
-                for member in team_selections_with_rates  # Use the enriched team data
-            ]
-            if breakdown_data:
-                st.table(pd.DataFrame(breakdown_data))
-
-            quote_id = db.save_quote(project_details)
-            if quote_id:
-                st.success(f"Quote #{quote_id} saved successfully!")
-            else:
-                st.error("Failed to save quote to database.")
-
-    # Remove team members (outside form)
-    st.subheader("Remove Team Members")
-    for i in range(len(st.session_state.team_selections)):
-        if st.button(f"Remove Team Member {i + 1}"):
-            st.session_state.team_selections.pop(i)
-            st.rerun()
+        with col2:
+            st.button(
+                f"Remove Team Member {i + 1}",
+                key=f"remove_team_member_{i}",
+                on_click=on_team_member_removed,
+                args=(i,)
+            )
+
+
+def current_quote_inputs():
+    return {field: st.session_state.get(field) for field in QUOTE_FIELDS}
+
+
+def price_quote(db, inputs):
+    """Run calculate_quote, reusing the last result while the priced inputs are unchanged"""
+    team_names = tuple(m.get("name") for m in st.session_state.team_selections)
+    price_key = (team_names, inputs["timeline"], tuple(inputs["tech_stack"]), inputs["complexity"], inputs["selected_strategy"])
+    cached = st.session_state.get("price_preview_cache")
+    if cached and cached[0] == price_key:
+        return cached[1]
+
+    result = calculate_quote(
+        st.session_state.team_selections,
+        inputs["timeline"],
+        inputs["tech_stack"],
+        inputs["complexity"],
+        inputs["selected_strategy"],
+        db)
+    st.session_state.price_preview_cache = (price_key, result)
+    return result
+
+
+def on_generate_quote():
+    db = get_db()
+    inputs = current_quote_inputs()
+    st.session_state.generated_quote = None
+
+    if not st.session_state.team_selections:
+        st.session_state.quote_error = "Please add at least one team member."
+        st.rerun(["price_preview"])
+    st.session_state.quote_error = None
+
+    base_cost, total_cost_with_margin, profit, profit_margin_percentage = price_quote(db, inputs)
+
+    # Prepare team selections with rates from database
+    team_selections_with_rates = []
+    for member in st.session_state.team_selections:
+        if member["name"] is not None:
+            team_member_data = db.get_team_member_by_name(member["name"])
+            if team_member_data:
+                team_selections_with_rates.append({
+                    "name": member["name"],
+                    "role": member["role"],
+                    "role_type": member["role_type"],
+                    "default_rate": float(team_member_data["default_rate"])
+                })
+
+    project_details = {
+        "client_name": inputs["client_name"],
+        "client_email": inputs["client_email"],
+        "pages": inputs["pages"],
+        "complexity": inputs["complexity"],
+        "tech_stack": inputs["tech_stack"],
+        "timeline": inputs["timeline"],
+        "margin_percentage": profit_margin_percentage,
+        "marketing_strategy": inputs["selected_strategy"],
+        "marketing_cost": 0.00,
+        "team_selections": team_selections_with_rates,  # Use the enriched team data
+        "total_cost": total_cost_with_margin,
+        "base_cost": base_cost,
+        "profit": profit,
+        "date": datetime.now().strftime("%Y-%m-%d"),
+    }
+
+    use_template = st.session_state.get("proposal_source") == "Standard template"
+    with st.spinner("Generating proposal..."):
+        project_details["proposal"], notice = generate_proposal(project_details, use_template)
+
+    quote_id = db.save_quote(project_details)
+    if quote_id:
+        audit.record(db, quote_id, "created", None, "Pending", st.session_state.get("user", {}).get("username"))
+    st.session_state.generated_quote = {"quote_id": quote_id, "details": project_details, "notice": notice}
+    # Only the form and the saved quote list need to show the new quote
+    st.rerun(["price_preview", "saved_quotes"])
+
+
+def show_generated_quote(generated):
+    project_details = generated["details"]
+    timeline = project_details["timeline"]
+
+    st.success(f"Quote Generated: ${project_details['total_cost']:,.2f}")
+    st.subheader("Generated Proposal")
+    if generated.get("notice"):
+        st.info(generated["notice"])
+    st.text_area("Proposal", project_details["proposal"], height=300)
+
+    st.subheader("Cost Breakdown")
+    breakdown_data = [
+        {
+            "Team Member": member["name"],
+            "Weekly Rate ($)": member["default_rate"],
+            "Total Cost": float(member["default_rate"]) * timeline,
+        }
+        for member in project_details["team_selections"]  # Use the enriched team data
+    ]
+    if breakdown_data:
+        import pandas as pd
+
+        st.table(pd.DataFrame(breakdown_data))
+
+    if generated["quote_id"]:
+        st.success(f"Quote #{generated['quote_id']} saved successfully!")
+    else:
+        st.error("Failed to save quote to database.")
+
+
+@st.fragment(key="price_preview")
+@counts_rerun("price_preview")
+@shows_outage
+def quote_form_section():
+    db = get_db()
+    st.header("Project Details")
+
+    # Client Information
+    col1, col2 = st.columns(2)
+    with col1:
+        st.text_input("Client Name", key="client_name")
+    with col2:
+        st.text_input("Client Email", key="client_email")
+
+    # Project Specifications
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.number_input("Number of Pages", min_value=1, value=1, key="pages")
+    with col2:
+        st.selectbox("Project Complexity", [
+                     "Website", "Project", "Product"], key="complexity")
+    with col3:
+        st.number_input(
+            "Project Timeline (weeks)", min_value=1, value=4, key="timeline")
+
+    st.multiselect("Select Technology Stack", load_catalog(db)["tech_options"], key="tech_stack")
+
+    # Marketing Strategy
+    st.selectbox(
+        "Select Marketing Strategy",
+        load_catalog(db)["pricing_strategies"],
+        key="selected_strategy"
+    )
+
+    # Live price preview
+    base_cost, total_cost_with_margin, profit, _ = price_quote(db, current_quote_inputs())
+    st.write(f"Base Development Cost: ${base_cost:,.2f}")
+    st.write(f"Total Cost (with margin): ${total_cost_with_margin:,.2f}")
+    st.write(f"Profit: ${profit:,.2f}")
+
+    st.radio(
+        "Proposal",
+        PROPOSAL_SOURCES,
+        key="proposal_source",
+        horizontal=True,
+        help="The standard template is instant and is also used if OpenAI is slow or unavailable.",
+    )
+    st.button("Generate Quote", on_click=on_generate_quote)
+    if st.session_state.get("quote_error"):
+        st.error(st.session_state.quote_error)
+    if st.session_state.get("generated_quote"):
+        show_generated_quote(st.session_state.generated_quote)
+
+
+@st.fragment(key="quote_actions")
+@counts_rerun("quote_actions")
+@shows_outage
+def quote_actions_section():
+    db = get_db()
+    client_email = st.session_state.get("client_email")
+
+    def pdf_tools():
+        # Pulls in fpdf, smtplib and email.mime only once an action is used
+        from pages.project_management import render_pdf, send_email
+        return render_pdf, send_email
 
     # Additional actions such as Save PDF and Send to Client
     if st.button("Save as PDF"):
-        saved_quotes = db.get_all_quotes()
-        if not saved_quotes:
+        latest_quote = db.get_latest_quote()
+        if not latest_quote:
             st.error("No quote to save! Please generate a quote first.")
         else:
-            latest_quote = saved_quotes[0]
-            pdf = generate_pdf(latest_quote)
-            pdf_output = pdf.output(dest='S').encode('latin-1')
+            render_pdf, _ = pdf_tools()
+            pdf_output = render_pdf(latest_quote)
             st.download_button(
                 label="Download PDF",
                 data=pdf_output,
@@ -434,15 +341,14 @@ def main():
 
     if st.button("Send to Client"):
         if client_email:
-            saved_quotes = db.get_all_quotes()
-            if saved_quotes:
-                latest_quote = saved_quotes[0]
-                pdf = generate_pdf(latest_quote)
-                pdf_bytes = pdf.output(dest='S').encode('latin-1')
+            latest_quote = db.get_latest_quote()
+            if latest_quote:
+                render_pdf, send_email = pdf_tools()
+                pdf_bytes = render_pdf(latest_quote)
                 send_email(
                     client_email,
                     f"Project Proposal for {latest_quote['client_name']}",
-                    latest_quote.get('proposal', ''),
+                    latest_quote['proposal_text'],
                     latest_quote,
                     pdf_bytes
                 )
@@ -450,29 +356,60 @@ def main():
             st.error("Please enter a client email address.")
 
 
-    # Sidebar with saved quotes
-    with st.sidebar:
-        st.header("Saved Quotes")
-        saved_quotes = db.get_all_quotes()
-        for quote in saved_quotes:
-            with st.expander(f"Quote #{quote['id']}: {quote['client_name']}"):
-                st.write(f"Date: {quote['created_at'].strftime('%Y-%m-%d')}")
-                st.write(f"Amount: ${float(quote['total_cost']):,.2f}")
-                st.write(f"Timeline: {quote['timeline']} weeks")
-                if st.button("Delete Quote", key=f"delete_quote_{quote['id']}"):
-                    if db.delete_quote(quote['id']):
-                        st.success("Quote deleted!")
-                        st.rerun()
-                    else:
-                        st.error("Failed to delete quote!")
+@st.fragment(key="saved_quotes")
+@counts_rerun("saved_quotes")
+@shows_outage
+def saved_quotes_section():
+    db = get_db()
+    st.header("Saved Quotes")
+    saved_quotes = db.get_all_quotes()
+    for quote in saved_quotes:
+        with st.expander(f"Quote #{quote['id']}: {quote['client_name']}"):
+            st.write(f"Date: {quote['created_at'].strftime('%Y-%m-%d')}")
+            st.write(f"Amount: ${float(quote['total_cost']):,.2f}")
+            st.write(f"Timeline: {quote['timeline']} weeks")
+            if st.button("Delete Quote", key=f"delete_quote_{quote['id']}"):
+                if audit.delete_quote(db, quote['id'], quote['status'], st.session_state.get("user", {}).get("username")):
+                    st.success("Quote deleted!")
+                    st.rerun(scope="fragment")
+                else:
+                    st.error("Failed to delete quote!")
+
+
+@counts_rerun("app")
+@shows_outage
+def main():
+
+    st.set_page_config(
+        page_title="Website Quote Generator",
+        page_icon="💰",
+        layout="wide",
+    )
 
+    get_db()
 
+    # Check if user is logged in
+    if not initialize_auth():
+        return
+
+
+    st.title("Website Quote Generator")
+
+    # Each section is a fragment that reruns on its own interactions and
+    # fetches only its own data, instead of rerunning the whole page.
+    team_selection_section()
+    quote_form_section()
+    quote_actions_section()
+
+    # Sidebar with saved quotes
+    with st.sidebar:
+        saved_quotes_section()
 
     # Logout button
     with st.sidebar:
         if st.button("Logout"):
-            st.session_state.authenticated = False
+            logout()
             st.rerun()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
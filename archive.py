@@ -0,0 +1,47 @@
+"""Move old completed and rejected quotes out of the live tables.
+
+    python archive.py --dry-run
+    python archive.py --older-than-days 365 --status Completed
+
+Quotes created more than --older-than-days ago with one of the statuses
+(Completed and Rejected by default) are copied with their team members to
+quotes_archive and quote_team_members_archive and deleted from quotes,
+--batch-size at a time, each batch in its own short transaction. The job
+can be interrupted and re-run; run it from cron during quiet hours.
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+from config import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, ARCHIVE_PAUSE_SECONDS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old completed and rejected quotes.")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--status", action="append", help="archive quotes with this status (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE, help="quotes per transaction")
+    parser.add_argument("--pause", type=float, default=ARCHIVE_PAUSE_SECONDS, help="seconds between batches")
+    parser.add_argument("--dry-run", action="store_true", help="count the quotes without moving them")
+    args = parser.parse_args()
+
+    from db import Database
+
+    db = Database()
+    before = datetime.now() - timedelta(days=args.older_than_days)
+    statuses = args.status or list(Database.ARCHIVE_STATUSES)
+    count = db.archivable_quote_count(before, statuses)
+    print(f"{count} {'/'.join(statuses)} quotes created before {before:%Y-%m-%d}")
+    if args.dry_run or not count:
+        return 0
+
+    start = time.perf_counter()
+    moved = db.archive_quotes(before, statuses, args.batch_size, args.pause)
+    print(f"Archived {moved} quotes in {time.perf_counter() - start:.1f}s "
+          f"({db.archived_quote_count()} in the archive)")
+    return 0 if moved == count else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
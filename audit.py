@@ -0,0 +1,169 @@
+import atexit
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from config import AUDIT_FLUSH_SIZE, AUDIT_FLUSH_SECONDS, AUDIT_MAX_PENDING
+
+# Write-behind audit log of quote changes. record() only appends to an
+# in-memory buffer shared by every session in the process; a background
+# thread writes the buffer to quote_events in one transaction once
+# AUDIT_FLUSH_SIZE events are waiting or the oldest is AUDIT_FLUSH_SECONDS
+# old. What is still buffered is written at exit, and shown by
+# quote_history as if it were already saved. The flusher writes on its own
+# connection rather than borrowing from the pool gather() fans out over, so
+# a busy page can't starve it of one.
+
+# event: how the history view describes it
+EVENT_LABELS = {
+    "created": "Created",
+    "status": "Status changed",
+    "deleted": "Deleted",
+}
+
+
+class EventBuffer:
+    def __init__(self, flush_size, flush_seconds, max_pending):
+        self.flush_size = flush_size
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.pending = deque()  # rows not yet handed to a flush, oldest first
+        self.in_flight = []  # the rows a flush is writing
+        self.oldest_at = None  # monotonic time the oldest pending row was recorded
+        self.database = None
+        self.connection = None  # the flusher's own, opened on first use
+        self.condition = threading.Condition()
+        self.flush_lock = threading.Lock()
+        self.thread = None
+        self.stats = {"recorded": 0, "written": 0, "flushes": 0, "failed_flushes": 0, "dropped": 0}
+
+    def record(self, db, row):
+        with self.condition:
+            # Any session's Database will do to borrow a pooled connection
+            self.database = db
+            if not self.pending:
+                self.oldest_at = time.monotonic()
+            self.pending.append(row)
+            self.stats["recorded"] += 1
+            self._trim()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="audit-flush", daemon=True)
+                self.thread.start()
+                atexit.register(self.flush)
+            # Wake the flusher to start the clock, or to write a full batch
+            if len(self.pending) in (1, self.flush_size):
+                self.condition.notify()
+
+    def _trim(self):
+        while len(self.pending) > self.max_pending:
+            self.pending.popleft()
+            self.stats["dropped"] += 1
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                while len(self.pending) < self.flush_size:
+                    remaining = self.oldest_at + self.flush_seconds - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+            if not self.flush():
+                # The database is unreachable; try again after another interval
+                time.sleep(self.flush_seconds)
+
+    def flush(self):
+        """Write every buffered event now. Returns False if the write failed."""
+        with self.flush_lock:
+            with self.condition:
+                if not self.pending:
+                    return True
+                self.in_flight = list(self.pending)
+                self.pending.clear()
+                database = self.database
+
+            written = self._write(database, self.in_flight)
+            with self.condition:
+                if written:
+                    self.stats["written"] += len(self.in_flight)
+                    self.stats["flushes"] += 1
+                else:
+                    # Back to the front of the queue, in order, for the next flush
+                    self.pending.extendleft(reversed(self.in_flight))
+                    self.oldest_at = time.monotonic()
+                    self.stats["failed_flushes"] += 1
+                    self._trim()
+                self.in_flight = []
+            return written
+
+    def buffered(self, quote_id):
+        with self.condition:
+            return [row for row in [*self.in_flight, *self.pending] if row[0] == quote_id]
+
+    def _write(self, database, rows):
+        """Insert rows on the buffer's dedicated connection (flush_lock is held)"""
+        try:
+            if self.connection is None:
+                # Any session's Database will do to open one of the right backend
+                self.connection = database.open_connection()
+            written = type(database)(connection=self.connection).add_quote_events(rows)
+        except Exception as e:
+            print(f"Error writing quote events: {e}")
+            written = False
+        if not written:
+            # The connection may be what failed; open a fresh one next time
+            self._close_connection()
+        return written
+
+    def _close_connection(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+
+_buffer = EventBuffer(AUDIT_FLUSH_SIZE, AUDIT_FLUSH_SECONDS, AUDIT_MAX_PENDING)
+
+
+def record(db, quote_id, event, old_value=None, new_value=None, username=None):
+    """Log an event on a quote; returns at once and is written by the next flush"""
+    row = (quote_id, event, old_value, new_value, username, datetime.now().replace(microsecond=0))
+    _buffer.record(db, row)
+
+
+def delete_quote(db, quote_id, status, username=None):
+    """Delete a quote and log the deletion; every delete button goes through here"""
+    if not db.delete_quote(quote_id):
+        return False
+    record(db, quote_id, "deleted", status, None, username)
+    return True
+
+
+def flush():
+    return _buffer.flush()
+
+
+def stats():
+    with _buffer.condition:
+        return dict(_buffer.stats, pending=len(_buffer.pending) + len(_buffer.in_flight))
+
+
+def quote_history(db, quote_id):
+    """The quote's events, oldest first, including those not yet flushed"""
+    # Buffer first, so rows a flush writes in between are read twice (and
+    # deduplicated below) rather than not at all
+    buffered = _buffer.buffered(quote_id)
+    saved = db.get_quote_events(quote_id)
+    seen = {
+        (quote_id, event["event"], event["old_value"], event["new_value"], event["username"], event["created_at"])
+        for event in saved
+    }
+    buffered = [row for row in buffered if row not in seen]
+    return saved + [
+        {"event": event, "old_value": old_value, "new_value": new_value, "username": username, "created_at": created_at}
+        for _, event, old_value, new_value, username, created_at in buffered
+    ]
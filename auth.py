@@ -1,13 +1,94 @@
 import streamlit as st
+import streamlit.components.v1 as components
 from mysql.connector import Error
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import functools
 import hashlib
 import secrets
+import threading
+import time
+
+import passwords
+from config import SESSION_COOKIE_NAME, SESSION_TTL_HOURS, SESSION_CACHE_SIZE, SESSION_SWEEP_SECONDS
+from db import Database
+from db_health import DatabaseUnavailable
+import query_stats
+
+# Columns that are safe to keep in st.session_state (no password_hash)
+USER_COLUMNS = "u.id, u.username, u.email, u.role, u.is_active, u.created_at"
+
+
+class SessionCache:
+    """Process-wide LRU of session token -> user, shared by every browser session"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, expires_at = entry
+            if expires_at <= datetime.now():
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return user
+
+    def put(self, token, user, expires_at):
+        with self._lock:
+            self._entries[token] = (user, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, token):
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def sweep(self):
+        """Drop expired entries and return how many were removed"""
+        now = datetime.now()
+        with self._lock:
+            expired = [token for token, (_, expires_at) in self._entries.items() if expires_at <= now]
+            for token in expired:
+                del self._entries[token]
+        return len(expired)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+session_cache = SessionCache(SESSION_CACHE_SIZE)
+query_stats.register_cache("Login sessions", lambda: (session_cache.hits, session_cache.misses))
+_last_sweep = 0.0
+_sweep_lock = threading.Lock()
+
+
+def _token_hash(token):
+    # Only a digest of the token is stored, so a leaked table can't be replayed
+    return hashlib.sha256(token.encode()).hexdigest()
+
 
 class Auth:
+    # The DDL only needs to run once per server process, not once per click
+    _schema_ready = False
+
     def __init__(self, database):
         self.db = database
-        self.setup_database()
-    
+        if not Auth._schema_ready:
+            self.setup_database()
+            Auth._schema_ready = True
+
     def setup_database(self):
         create_users_table = """
         CREATE TABLE IF NOT EXISTS users (
@@ -20,19 +101,55 @@ class Auth:
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         """
-        
+
+        create_user_sessions_table = """
+        CREATE TABLE IF NOT EXISTS user_sessions (
+            token_hash CHAR(64) PRIMARY KEY,
+            user_id INT NOT NULL,
+            expires_at DATETIME NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_user_sessions_expires (expires_at),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+        """
+
+        if self.db.dialect == 'sqlite':
+            create_users_table = """
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username VARCHAR(100) UNIQUE NOT NULL,
+                password_hash VARCHAR(255) NOT NULL,
+                email VARCHAR(100) UNIQUE NOT NULL,
+                role VARCHAR(10) NOT NULL DEFAULT 'user' CHECK (role IN ('admin', 'user')),
+                is_active BOOLEAN DEFAULT TRUE,
+                created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+            )
+            """
+
+            create_user_sessions_table = """
+            CREATE TABLE IF NOT EXISTS user_sessions (
+                token_hash CHAR(64) PRIMARY KEY,
+                user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                expires_at DATETIME NOT NULL,
+                created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+            )
+            """
+
         cursor = self.db.connection.cursor()
         cursor.execute(create_users_table)
+        cursor.execute(create_user_sessions_table)
+        if self.db.dialect == 'sqlite':
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_sessions_expires ON user_sessions (expires_at)")
         self.db.connection.commit()
         cursor.close()
 
     def hash_password(self, password):
-        """Hash a password using SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
-    
+        """Hash a password with the configured KDF, off the script thread"""
+        return passwords.submit_hash(password).result()
+
     def create_user(self, username, password, email, role='user'):
+        cursor = self.db.connection.cursor()
         try:
-            cursor = self.db.connection.cursor()
             query = """
             INSERT INTO users (username, password_hash, email, role)
             VALUES (%s, %s, %s, %s)
@@ -45,77 +162,266 @@ class Auth:
             return False
         finally:
             cursor.close()
-    
+
     def verify_user(self, username, password):
+        query = f"""
+        SELECT {USER_COLUMNS}, u.password_hash FROM users u
+        WHERE u.username = %s AND u.is_active = TRUE
+        """
+        cursor = self.db.prepared_cursor(query)
         try:
-            cursor = self.db.connection.cursor(dictionary=True)
-            query = "SELECT * FROM users WHERE username = %s AND password_hash = %s AND is_active = TRUE"
-            cursor.execute(query, (username, self.hash_password(password)))
-            user = cursor.fetchone()
-            return user
+            cursor.execute(query, (username,))
+            rows = cursor.fetchall()
         except Error as e:
             print(f"Error verifying user: {e}")
             return None
+        user = rows[0] if rows else None
+
+        stored_hash = user.pop('password_hash') if user else passwords.dummy_hash()
+        if not passwords.submit_verify(password, stored_hash).result() or not user:
+            return None
+
+        if passwords.needs_rehash(stored_hash):
+            self.update_password_hash(user['id'], self.hash_password(password))
+        return user
+
+    def update_password_hash(self, user_id, password_hash):
+        """Store an upgraded hash, e.g. after a legacy SHA-256 login"""
+        cursor = self.db.connection.cursor()
+        try:
+            cursor.execute(
+                "UPDATE users SET password_hash = %s WHERE id = %s",
+                (password_hash, user_id)
+            )
+            self.db.connection.commit()
+        except Error as e:
+            print(f"Error upgrading password hash: {e}")
+        finally:
+            cursor.close()
+
+    def create_session(self, user):
+        """Persist a new login session for user and return its opaque token"""
+        token = secrets.token_urlsafe(32)
+        expires_at = datetime.now().replace(microsecond=0) + timedelta(hours=SESSION_TTL_HOURS)
+        cursor = self.db.connection.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO user_sessions (token_hash, user_id, expires_at)
+                VALUES (%s, %s, %s)
+            """, (_token_hash(token), user['id'], expires_at))
+            self.db.connection.commit()
+        except Error as e:
+            print(f"Error creating session: {e}")
+            return None
+        finally:
+            cursor.close()
+
+        session_cache.put(token, user, expires_at)
+        return token
+
+    def get_session_user(self, token):
+        """Resolve a session token to its user, or None if unknown, expired or inactive"""
+        user = session_cache.get(token)
+        if user is not None:
+            return user
+
+        cursor = self.db.connection.cursor(dictionary=True)
+        try:
+            cursor.execute(f"""
+                SELECT {USER_COLUMNS}, s.expires_at AS session_expires_at
+                FROM user_sessions s
+                JOIN users u ON u.id = s.user_id
+                WHERE s.token_hash = %s AND s.expires_at > %s AND u.is_active = TRUE
+            """, (_token_hash(token), datetime.now()))
+            user = cursor.fetchone()
+        except Error as e:
+            print(f"Error restoring session: {e}")
+            return None
         finally:
             cursor.close()
 
+        if user:
+            expires_at = user.pop('session_expires_at')
+            session_cache.put(token, user, expires_at)
+        return user
+
+    def revoke_session(self, token):
+        session_cache.discard(token)
+        cursor = self.db.connection.cursor()
+        try:
+            cursor.execute("DELETE FROM user_sessions WHERE token_hash = %s", (_token_hash(token),))
+            self.db.connection.commit()
+        except Error as e:
+            print(f"Error revoking session: {e}")
+        finally:
+            cursor.close()
+
+    def sweep_expired_sessions(self):
+        """Delete expired sessions, at most once every SESSION_SWEEP_SECONDS per process"""
+        global _last_sweep
+        with _sweep_lock:
+            if time.monotonic() - _last_sweep < SESSION_SWEEP_SECONDS:
+                return
+            _last_sweep = time.monotonic()
+
+        session_cache.sweep()
+        cursor = self.db.connection.cursor()
+        try:
+            cursor.execute("DELETE FROM user_sessions WHERE expires_at <= %s", (datetime.now(),))
+            self.db.connection.commit()
+        except Error as e:
+            print(f"Error sweeping sessions: {e}")
+        finally:
+            cursor.close()
+
+
+def _show_outage(error):
+    st.error(f"The database is unavailable right now, please try again shortly. ({error.msg})")
+    st.stop()
+
+
+def get_db():
+    """Return the Database bound to this browser session, creating it on first use"""
+    if 'db' not in st.session_state:
+        try:
+            st.session_state.db = Database()
+        except DatabaseUnavailable as e:
+            _show_outage(e)
+    return st.session_state.db
+
+
+def shows_outage(fn):
+    """Stop a page or fragment with a message when its connection can't be reopened.
+
+    A session's connection is reopened on demand (Database.connection), so
+    any query can raise DatabaseUnavailable once the server has gone away.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except DatabaseUnavailable as e:
+            _show_outage(e)
+    return wrapper
+
+
+def get_auth():
+    if 'auth' not in st.session_state:
+        st.session_state.auth = Auth(get_db())
+    return st.session_state.auth
+
+
+def _write_session_cookie(token, max_age):
+    # Streamlit can read cookies (st.context.cookies) but not set them, so the
+    # cookie is written from a zero-height component in the parent document.
+    components.html(
+        f"""<script>
+        window.parent.document.cookie = "{SESSION_COOKIE_NAME}={token}; max-age={max_age}; path=/; SameSite=Strict";
+        </script>""",
+        height=0,
+    )
+
+
+def _flush_pending_cookie():
+    # Cookie changes are queued because login/logout call st.rerun() right away
+    pending = st.session_state.pop('pending_session_cookie', None)
+    if pending is not None:
+        token, max_age = pending
+        _write_session_cookie(token, max_age)
+
+
+def restore_session():
+    """Log the browser back in from its session cookie, once per Streamlit session"""
+    if st.session_state.get('session_restore_attempted'):
+        return False
+    st.session_state.session_restore_attempted = True
+
+    token = st.context.cookies.get(SESSION_COOKIE_NAME)
+    if not isinstance(token, str) or not token:
+        return False
+
+    auth = get_auth()
+    auth.sweep_expired_sessions()
+    user = auth.get_session_user(token)
+    if not user:
+        return False
+
+    st.session_state.authenticated = True
+    st.session_state.user = user
+    st.session_state.session_token = token
+    return True
+
+
+def logout():
+    token = st.session_state.pop('session_token', None)
+    if token:
+        get_auth().revoke_session(token)
+        st.session_state.pending_session_cookie = ("", 0)
+    st.session_state.authenticated = False
+    st.session_state.pop('user', None)
+
+
 def login_page():
     st.title("Login")
-    
+
     if 'authenticated' not in st.session_state:
         st.session_state.authenticated = False
-    
+
     if not st.session_state.authenticated:
         with st.container():
             username = st.text_input("Username", key="login_username")
             password = st.text_input("Password", type="password", key="login_password")
-            
+
             col = st.columns(1)[0]
             with col:
                 if st.button("Login", use_container_width=True):
-                    auth = Auth(st.session_state.db)
+                    auth = get_auth()
                     user = auth.verify_user(username, password)
-                    
+
                     if user:
+                        token = auth.create_session(user)
+                        if token:
+                            st.session_state.session_token = token
+                            st.session_state.pending_session_cookie = (token, SESSION_TTL_HOURS * 3600)
                         st.session_state.authenticated = True
                         st.session_state.user = user
                         st.success("Successfully logged in!")
                         st.rerun()
                     else:
                         st.error("Invalid username or password")
-            
+
             if st.button("Register", use_container_width=True):
                 st.session_state.show_register = True
                 st.rerun()
-        
+
         return False
-    
+
     return True
 
 def register_page():
     st.title("Register")
-    
+
     with st.container():
         reg_username = st.text_input("Username", key="reg_username")
         reg_password = st.text_input("Password", type="password", key="reg_password")
         reg_confirm_password = st.text_input("Confirm Password", type="password", key="reg_confirm_password")
         reg_email = st.text_input("Email", key="reg_email")
-        
+
         col1, col2 = st.columns(2)
         with col1:
             if st.button("Create Account", use_container_width=True):
                 if reg_password != reg_confirm_password:
                     st.error("Passwords do not match")
                     return
-                
-                auth = Auth(st.session_state.db)
+
+                auth = get_auth()
                 if auth.create_user(reg_username, reg_password, reg_email):
                     st.success("Registration successful! Please login.")
                     st.session_state.show_register = False
                     st.rerun()
                 else:
                     st.error("Registration failed. Username or email might already exist.")
-        
+
         with col2:
             if st.button("Back to Login", use_container_width=True):
                 st.session_state.show_register = False
@@ -124,8 +430,15 @@ def register_page():
 def initialize_auth():
     if 'show_register' not in st.session_state:
         st.session_state.show_register = False
-        
+
+    _flush_pending_cookie()
+
+    if not st.session_state.get('authenticated'):
+        restore_session()
+    if st.session_state.get('authenticated'):
+        return True
+
     if st.session_state.show_register:
         return register_page()
     else:
-        return login_page()
\ No newline at end of file
+        return login_page()
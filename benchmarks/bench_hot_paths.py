@@ -0,0 +1,220 @@
+"""pytest-benchmark suite for the functions every quote and page render goes through.
+
+    pytest benchmarks --bench-scale small
+    pytest benchmarks --bench-scale medium --benchmark-json bench.json
+    pytest benchmarks --benchmark-compare        # against the last autosaved run
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+import audit
+import capacity
+import charts
+import optimizer
+import proposals
+import seed
+from auth import Auth
+from db import BaseDatabase
+from fake_openai_server import FakeOpenAI
+from pages.project_management import render_pdf
+from pricing import calculate_quote
+
+
+def _team(scale, size=4):
+    return [
+        {"name": name, "role": "Engineer", "role_type": "Developer"}
+        for name in random.Random(1).sample(seed.member_names(scale), size)
+    ]
+
+
+@pytest.mark.benchmark(group="pricing")
+def test_calculate_quote(benchmark, bench_db, bench_scale):
+    team = _team(bench_scale)
+    techs = seed.tech_names(bench_scale)[:3]
+    benchmark(calculate_quote, team, 8, techs, "Project", "Premium Pricing", bench_db)
+
+
+@pytest.fixture(params=["prepared", "unprepared"])
+def statements(request, monkeypatch):
+    """Run with the prepared-statement cache, and with a plain cursor per lookup"""
+    if request.param == "unprepared":
+        monkeypatch.setattr(BaseDatabase, "prepared_cursor", lambda db, sql: db.connection.cursor(dictionary=True))
+    return request.param
+
+
+@pytest.mark.benchmark(group="prepared statements")
+def test_calculate_quote_statements(benchmark, bench_db, bench_scale, statements):
+    # The difference between the two runs is the parse/plan time that
+    # prepared statements save per quote calculation
+    team = _team(bench_scale)
+    techs = seed.tech_names(bench_scale)[:3]
+    benchmark(calculate_quote, team, 8, techs, "Project", "Premium Pricing", bench_db)
+
+
+@pytest.mark.benchmark(group="prepared statements")
+def test_get_component_price_statements(benchmark, bench_db, bench_scale, statements):
+    tech = seed.tech_names(bench_scale)[0]
+    benchmark(bench_db.get_component_price, tech, "Technology Stack")
+
+
+@pytest.mark.benchmark(group="quotes")
+def test_get_all_quotes(benchmark, bench_db, bench_scale):
+    # One call loads the whole table, so a few rounds are enough at large scales
+    rounds = 5 if bench_scale["quotes"] <= 10_000 else 1
+    benchmark.pedantic(bench_db.get_all_quotes, rounds=rounds, iterations=1)
+
+
+@pytest.mark.benchmark(group="quotes")
+def test_get_quote(benchmark, bench_db, bench_scale):
+    ids = iter(random.Random(2).choices(range(1, bench_scale["quotes"] + 1), k=1_000_000))
+    benchmark(lambda: bench_db.get_quote(next(ids)))
+
+
+@pytest.mark.benchmark(group="quotes")
+def test_search_quotes(benchmark, bench_db, bench_scale):
+    # A client-number prefix narrows "client" (in every row) to a handful
+    ids = iter(random.Random(3).choices(range(1, bench_scale["quotes"] + 1), k=1_000_000))
+    benchmark(lambda: bench_db.search_quotes(f"client {next(ids)}", limit=20))
+
+
+@pytest.mark.benchmark(group="quotes")
+def test_quote_summary(benchmark, bench_db):
+    # The KPI tiles' query: per-status totals over the last year
+    start = datetime.now() - timedelta(days=365)
+    benchmark(bench_db.quote_summary, ["status"], start=start)
+
+
+@pytest.mark.benchmark(group="quotes")
+def test_component_usage(benchmark, bench_db):
+    # "Which technologies did approved quotes use this year", via quote_components
+    start = datetime.now().replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    benchmark(bench_db.component_usage, start=start, statuses=["Approved"])
+
+
+@pytest.mark.benchmark(group="capacity")
+def test_team_capacity(benchmark, bench_db):
+    # What the capacity page does for a 12-week window: one query, one sweep
+    first_week = capacity.week_start(datetime.now())
+    start = datetime.combine(first_week, datetime.min.time())
+
+    def plan():
+        allocations = bench_db.get_team_allocations(capacity.BOOKED_STATUSES, start, start + timedelta(weeks=12))
+        return capacity.weekly_load(allocations, first_week, 12)
+    benchmark(plan)
+
+
+@pytest.mark.benchmark(group="charts")
+def test_downsample(benchmark):
+    # Five years of daily figures, cut down to what the overview draws
+    rng = random.Random(0)
+    days = [datetime(2020, 1, 1) + timedelta(days=day) for day in range(5 * 365)]
+    revenue = [rng.randint(5_000, 20_000) for _ in days]
+    x, y = benchmark(charts.downsample, days, revenue, 500)
+    assert len(x) == 500 and x[0] == days[0] and x[-1] == days[-1]
+    assert x == sorted(x)
+
+
+@pytest.mark.benchmark(group="optimizer")
+def test_budget_optimizer(benchmark, bench_db, bench_scale):
+    # One search on the budget page, with the price list already loaded
+    price_list = optimizer.load_price_list(bench_db)
+    required = seed.tech_names(bench_scale)[:1]
+    result = benchmark(optimizer.optimize, price_list, 48000, 8, "Project", "Premium Pricing", required_techs=required)
+    assert result["configurations"]
+
+
+@pytest.mark.benchmark(group="proposals")
+def test_generate_proposals(benchmark, bench_db):
+    # A batch of 32 against a fake API taking 100 ms per completion; one at
+    # a time would take over 3.2 s
+    quotes = [bench_db.get_quote(quote_id) for quote_id in bench_db.get_quote_ids()[:32]]
+    with FakeOpenAI(latency=0.1) as fake:
+        stats = benchmark.pedantic(
+            proposals.generate_proposals, args=(bench_db, quotes, "fake", fake.base_url),
+            kwargs={"concurrency": 8, "tokens_per_minute": 10**7}, rounds=3,
+        )
+    assert stats["generated"] == len(quotes) and not stats["failed"]
+    assert fake.stats["peak_in_flight"] <= 8
+
+
+@pytest.mark.benchmark(group="proposals")
+def test_render_proposal(benchmark, bench_db):
+    # The template fast path, from a saved quote as the batch passes it
+    quote = bench_db.get_quote(bench_db.get_quote_ids()[0])
+    proposal = benchmark(proposals.render_proposal, quote)
+    assert "6. Cost Breakdown" in proposal
+
+
+@pytest.mark.benchmark(group="quotes")
+def test_save_quote(benchmark, bench_db, bench_scale):
+    team = [dict(member, default_rate=1000.0) for member in _team(bench_scale)]
+    quote = {
+        "client_name": "Benchmark Client",
+        "client_email": "benchmark@example.com",
+        "pages": 12,
+        "complexity": "Project",
+        "timeline": 8,
+        "margin_percentage": 50.0,
+        "marketing_strategy": "Premium Pricing",
+        "marketing_cost": 0.0,
+        "base_cost": 32000.0,
+        "total_cost": 48000.0,
+        "profit": 16000.0,
+        "tech_stack": seed.tech_names(bench_scale)[:3],
+        "team_selections": team,
+        "proposal": seed.PROPOSAL_PARAGRAPH * 12,
+    }
+    saved_ids = []
+    benchmark(lambda: saved_ids.append(bench_db.save_quote(quote)))
+
+    # Keep the dataset at its seeded size for the next run
+    for quote_id in saved_ids:
+        bench_db.delete_quote(quote_id)
+
+
+def _delete_test_events(db):
+    # Quote 0 doesn't exist; the audit benchmarks log against it
+    cursor = db.connection.cursor()
+    cursor.execute("DELETE FROM quote_events WHERE quote_id = 0")
+    db.connection.commit()
+    cursor.close()
+
+
+@pytest.mark.benchmark(group="audit")
+def test_audit_flush(benchmark, bench_db):
+    # A batch of 50 status changes written in one transaction, as the
+    # audit buffer does instead of a commit per click
+    events = [(0, "status", "Pending", "Approved", seed.BENCH_USER, datetime.now().replace(microsecond=0))] * 50
+    assert benchmark(bench_db.add_quote_events, events)
+    _delete_test_events(bench_db)
+
+
+@pytest.mark.benchmark(group="audit")
+def test_quote_history(benchmark, bench_db):
+    # The saved events plus one still in the buffer
+    bench_db.add_quote_events([(0, "created", None, "Pending", seed.BENCH_USER, datetime.now().replace(microsecond=0))])
+    audit.record(bench_db, 0, "status", "Pending", "Approved", seed.BENCH_USER)
+    history = benchmark(audit.quote_history, bench_db, 0)
+    assert len(history) == 2
+    audit.flush()
+    _delete_test_events(bench_db)
+
+
+@pytest.mark.benchmark(group="pricing")
+def test_get_pricing_components(benchmark, bench_db):
+    benchmark(bench_db.get_pricing_components)
+
+
+@pytest.mark.benchmark(group="pdf")
+def test_generate_pdf(benchmark, bench_db):
+    quote = bench_db.get_quote(1, with_proposal=True)
+    benchmark(render_pdf, quote)
+
+
+@pytest.mark.benchmark(group="auth")
+def test_verify_user(benchmark, bench_db):
+    auth = Auth(bench_db)
+    user = benchmark(auth.verify_user, seed.BENCH_USER, seed.BENCH_PASSWORD)
+    assert user is not None
@@ -0,0 +1,133 @@
+"""Cold import time of the app and its pages, measured with python -X importtime.
+
+Each module is imported in a fresh interpreter (best of --runs) and the
+cumulative time is compared against benchmarks/import_time_baseline.json.
+The run fails when a module gets slower than the baseline by more than
+--tolerance, or when one of the lazily loaded dependencies is imported at
+startup again.
+
+    python benchmarks/bench_import_time.py                 # check
+    python benchmarks/bench_import_time.py --update-baseline
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "import_time_baseline.json")
+
+MODULES = [
+    "app",
+    "pages.project_management",
+    "pages.finance_planner",
+    "pages.financial_management",
+    "pages.pricing_management",
+    "pages.team_management",
+    "pages.capacity_planner",
+    "pages.budget_optimizer",
+]
+
+# Loaded on first use only; none of these may show up at import time.
+# (streamlit itself pulls in a thin plotly shim, hence plotly.express.)
+LAZY_MODULES = {"openai", "jinja2", "fpdf", "plotly.express", "smtplib", "pandas"}
+LAZY_MODULES_ALLOWED = {
+    # These pages render their main tables with pandas on every run
+    "pages.project_management": {"pandas"},
+    "pages.pricing_management": {"pandas"},
+    "pages.team_management": {"pandas"},
+}
+
+
+def import_profile(module):
+    """Return (cumulative_us, {direct import: cumulative_us}, loaded modules) for one cold import"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    packages = {}
+    loaded = set()
+    total = None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        cumulative = cumulative.strip()
+        if not cumulative.isdigit():
+            continue  # header line
+        # Nested imports are indented by two spaces per level under the module
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        root = name.strip().split(".")[0]
+        loaded.add(name.strip())
+        if depth == 1:
+            packages[root] = packages.get(root, 0) + int(cumulative)
+        elif depth == 0 and name.strip() == module:
+            total = int(cumulative)
+    return total, packages, loaded
+
+
+def measure(runs):
+    results = {}
+    for module in MODULES:
+        best_total, best_packages, loaded = None, None, set()
+        for _ in range(runs):
+            total, packages, loaded = import_profile(module)
+            if best_total is None or total < best_total:
+                best_total, best_packages = total, packages
+        results[module] = {
+            "cumulative_ms": round(best_total / 1000, 1),
+            "packages": best_packages,
+            "loaded": sorted(loaded),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--json", help="also write the measurements to this path")
+    args = parser.parse_args()
+
+    results = measure(args.runs)
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+
+    failures = []
+    print(f"{'module':<30}{'ms':>10}{'baseline':>10}   heaviest imports")
+    for module, data in results.items():
+        heaviest = sorted(data["packages"].items(), key=lambda item: -item[1])[:3]
+        base = baseline.get(module, {}).get("cumulative_ms")
+        print(f"{module:<30}{data['cumulative_ms']:>10.1f}{base if base else '-':>10}   "
+              + ", ".join(f"{name} {us / 1000:.0f}ms" for name, us in heaviest))
+
+        eager = (LAZY_MODULES - LAZY_MODULES_ALLOWED.get(module, set())) & set(data["loaded"])
+        if eager:
+            failures.append(f"{module} imports {', '.join(sorted(eager))} at startup")
+        if base and data["cumulative_ms"] > base * (1 + args.tolerance):
+            failures.append(f"{module} import took {data['cumulative_ms']}ms (baseline {base}ms)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({m: {"cumulative_ms": d["cumulative_ms"]} for m, d in results.items()}, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {BASELINE_PATH}")
+        return 0
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""Logins per second for each password KDF cost setting.
+
+Simulates a burst of concurrent logins going through the bounded
+verification pool, the way the 9am rush hits Auth.verify_user.
+
+    python benchmarks/bench_password_kdf.py --logins 64 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import passwords
+
+SETTINGS = [
+    ("legacy sha256", None),
+    ("scrypt n=2^12", ("scrypt", {"n": 2 ** 12, "r": 8, "p": 1})),
+    ("scrypt n=2^14", ("scrypt", {"n": 2 ** 14, "r": 8, "p": 1})),
+    ("scrypt n=2^15", ("scrypt", {"n": 2 ** 15, "r": 8, "p": 1})),
+    ("pbkdf2 100k", ("pbkdf2_sha256", {"iterations": 100_000})),
+    ("pbkdf2 300k", ("pbkdf2_sha256", {"iterations": 300_000})),
+    ("pbkdf2 600k", ("pbkdf2_sha256", {"iterations": 600_000})),
+]
+
+
+def run(logins, workers):
+    print(f"{logins} concurrent logins, {workers} KDF workers\n")
+    print(f"{'setting':<16}{'ms/login':>10}{'logins/s':>10}")
+    pool = ThreadPoolExecutor(max_workers=workers)
+    for label, setting in SETTINGS:
+        if setting is None:
+            stored = passwords.legacy_hash("correct horse")
+        else:
+            kdf, params = setting
+            stored = passwords.hash_password("correct horse", kdf, **params)
+
+        single_start = time.perf_counter()
+        passwords.verify_password("correct horse", stored)
+        single_ms = (time.perf_counter() - single_start) * 1000
+
+        start = time.perf_counter()
+        futures = [pool.submit(passwords.verify_password, "correct horse", stored) for _ in range(logins)]
+        assert all(f.result() for f in futures)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<16}{single_ms:>10.1f}{logins / elapsed:>10.1f}")
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=passwords.PASSWORD_WORKERS)
+    args = parser.parse_args()
+    run(args.logins, args.workers)
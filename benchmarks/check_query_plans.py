@@ -0,0 +1,241 @@
+"""Check the query plan of every statement in db.py against a seeded database.
+
+Each Database method below is called against the benchmark database (see
+conftest.open_bench_database). SELECTs run normally so follow-up queries are
+reached; UPDATE and DELETE statements are only EXPLAINed, never executed.
+Every distinct statement is EXPLAINed and the check fails when a plan reads a
+table with more than --max-scan-rows rows without using an index.
+
+Methods that return a whole table by design are listed in WHOLE_TABLE and
+reported instead of failing.
+
+    DB_BACKEND=sqlite python benchmarks/check_query_plans.py --scale medium
+"""
+import argparse
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import seed
+from conftest import open_bench_database
+
+# Listing pages: they read every (active) row, so a scan is expected
+WHOLE_TABLE = {
+    "BaseDatabase.get_all_quotes",
+    "BaseDatabase.get_team_members",
+    "BaseDatabase.get_pricing_categories",
+    "BaseDatabase.get_pricing_components",
+    "BaseDatabase.get_all_previous_month_revenue",
+    "BaseDatabase.get_financial_forecast",
+    # All-time totals for the KPI tiles
+    "BaseDatabase.quote_summary",
+    # A fingerprint of the whole table, keying the overview's cached figures
+    "BaseDatabase.monthly_financials_version",
+}
+
+SQL_KEYWORDS = {"WHERE", "ON", "SET", "ORDER", "GROUP", "JOIN", "LEFT", "INNER", "LIMIT", "VALUES", "AS"}
+
+
+def method_calls(scale):
+    member = seed.member_names(scale)[0]
+    tech = seed.tech_names(scale)[0]
+    month = datetime.now().strftime("%B %Y")
+    first_of_month = datetime.now().date().replace(day=1)
+    return [
+        lambda db: db.get_team_members(),
+        lambda db: db.get_team_members("Developer"),
+        lambda db: db.get_team_member_by_name(member),
+        lambda db: db.get_all_quotes(),
+        lambda db: db.get_quote(1),
+        lambda db: db.get_quote(1, with_proposal=True),
+        lambda db: db.get_latest_quote(),
+        lambda db: db.get_proposal(1),
+        lambda db: db.get_quote_ids(["Pending"], start=first_of_month),
+        lambda db: db.get_quote_events(1),
+        lambda db: db.archivable_quote_count(datetime.now() - timedelta(days=730)),
+        # Nothing is that old, so the batch loop stops after its first SELECT
+        lambda db: db.archive_quotes(datetime(2000, 1, 1)),
+        lambda db: db.search_quotes("client 42 example"),
+        lambda db: db.quote_summary(["status"]),
+        lambda db: db.quote_summary(["month", "status"], start=first_of_month),
+        lambda db: db.component_usage(start=first_of_month, statuses=["Approved"]),
+        lambda db: db.quotes_with_component(7),
+        lambda db: db.get_team_allocations(("Approved", "In Progress"), datetime.now(), datetime.now() + timedelta(weeks=12)),
+        lambda db: db.quotes_with_component(7, start=first_of_month, statuses=["Approved"]),
+        lambda db: db.get_pricing_categories(),
+        lambda db: db.get_componenents("Technology Stack"),
+        lambda db: db.get_pricing_components(),
+        lambda db: db.get_pricing_components(category_id=1),
+        lambda db: db.get_component_price(tech, "Technology Stack"),
+        lambda db: db.get_component_price(tech),
+        lambda db: db.get_previous_month_revenue(month),
+        lambda db: db.get_all_previous_month_revenue(),
+        lambda db: db.get_monthly_financials(first_of_month.replace(year=first_of_month.year - 1), first_of_month),
+        lambda db: db.monthly_financials_version(),
+        lambda db: db.get_financial_forecast(first_of_month),
+        lambda db: db.update_team_member(1, member, "Engineer", "Developer", 500),
+        lambda db: db.delete_team_member(1),
+        lambda db: db.update_quote_status(1, "Approved"),
+        lambda db: db.save_proposal(1, "Proposal"),
+        lambda db: db.save_proposals([(1, "Proposal"), (2, "Proposal")]),
+        lambda db: db.delete_quote(1),
+        lambda db: db.update_pricing_category(1, "Technology Stack"),
+        lambda db: db.update_pricing_component(1, tech, 100),
+        lambda db: db.update_previous_month_revenue(month, 1000, 50),
+        lambda db: db.add_monthly_financial(first_of_month, 1000, 500, 100),
+    ]
+
+
+class CaptureCursor:
+    """Records (method, sql, params); runs SELECTs and swallows writes"""
+
+    def __init__(self, connection, captured, **kwargs):
+        self._cursor = connection.cursor(**kwargs)
+        self._captured = captured
+        self._read = False
+
+    def execute(self, sql, params=None):
+        frame = sys._getframe(1)
+        while frame.f_globals.get("__name__") in ("query_stats", __name__):
+            frame = frame.f_back
+        method = getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+        self._captured.append((method, sql, params))
+        self._read = sql.lstrip().upper().startswith(("SELECT", "WITH"))
+        if self._read:
+            self._cursor.execute(sql, params or ())
+
+    def executemany(self, sql, seq_params):
+        # Every row runs the same plan, so the first stands for the rest
+        for params in list(seq_params)[:1]:
+            self.execute(sql, params)
+
+    def fetchone(self):
+        return self._cursor.fetchone() if self._read else None
+
+    def fetchall(self):
+        return self._cursor.fetchall() if self._read else []
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount if self._read else 0
+
+    @property
+    def lastrowid(self):
+        return 0
+
+    def close(self):
+        self._cursor.close()
+
+
+class CaptureConnection:
+    def __init__(self, connection):
+        self._connection = connection
+        self.captured = []
+
+    def cursor(self, **kwargs):
+        return CaptureCursor(self._connection, self.captured, **kwargs)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def table_aliases(sql):
+    aliases = {}
+    for table, alias in re.findall(r"\b(?:FROM|JOIN|UPDATE)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", sql, re.I):
+        aliases[table] = table
+        if alias and alias.upper() not in SQL_KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def row_count(db, table, counts):
+    if table not in counts:
+        cursor = db.connection.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        counts[table] = cursor.fetchone()[0]
+        cursor.close()
+    return counts[table]
+
+
+def full_scans(db, sql, params, counts):
+    """Return (plan lines, [(table, rows)] read without an index)"""
+    cursor = db.connection.cursor(dictionary=True)
+    if db.dialect == "sqlite":
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params or ())
+        plan = [row["detail"] for row in cursor.fetchall()]
+        cursor.close()
+        aliases = table_aliases(sql)
+        scans = []
+        for detail in plan:
+            match = re.match(r"SCAN (\w+)$", detail)
+            if match:
+                table = aliases.get(match.group(1), match.group(1))
+                scans.append((table, row_count(db, table, counts)))
+        return plan, scans
+
+    cursor.execute("EXPLAIN " + sql, params or ())
+    rows = cursor.fetchall()
+    cursor.close()
+    plan = [f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']} {row.get('Extra') or ''}" for row in rows]
+    scans = [(row["table"], int(row["rows"] or 0)) for row in rows if row["type"] == "ALL"]
+    return plan, scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", default="medium", choices=sorted(seed.SCALES))
+    parser.add_argument("--max-scan-rows", type=int, default=1000,
+                        help="fail when a plan scans a table bigger than this without an index")
+    parser.add_argument("--reseed", action="store_true")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    from auth import Auth
+
+    scale = seed.SCALES[args.scale]
+    db = open_bench_database()
+    Auth(db)
+    if args.reseed or not seed.is_seeded(db, scale):
+        print(f"Seeding the benchmark database ({args.scale})...")
+        seed.seed_database(db, scale)
+
+    capture = CaptureConnection(db.connection)
+    reader = type(db)(connection=capture)
+    for call in method_calls(scale):
+        call(reader)
+
+    seen, counts, failures = set(), {}, 0
+    for method, sql, params in capture.captured:
+        if sql in seen or not sql.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+            continue
+        seen.add(sql)
+        plan, scans = full_scans(db, sql, params, counts)
+        big = [(table, rows) for table, rows in scans if rows > args.max_scan_rows]
+
+        if not big:
+            verdict = "ok"
+        elif method in WHOLE_TABLE:
+            verdict = "whole table"
+        else:
+            verdict = "FULL SCAN"
+            failures += 1
+        print(f"{verdict:12} {method}")
+        for table, rows in big:
+            print(f"{'':12}   scans {table} ({rows} rows)")
+        if args.verbose or verdict == "FULL SCAN":
+            for line in plan:
+                print(f"{'':12}   | {line}")
+
+    print(f"\n{len(seen)} statements checked, {failures} unindexed scans over {args.max_scan_rows} rows")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
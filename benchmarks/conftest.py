@@ -0,0 +1,70 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import seed
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-scale", default="small", choices=sorted(seed.SCALES),
+        help="size of the synthetic dataset (small: 100 quotes, medium: 10k, large: 1M)",
+    )
+    parser.addoption(
+        "--bench-reseed", action="store_true",
+        help="reseed the benchmark database even if it already holds this scale",
+    )
+
+
+def pytest_benchmark_update_json(config, benchmarks, output_json):
+    # Keep the dataset size next to the timings so runs are comparable
+    scale = config.getoption("--bench-scale")
+    output_json["bench_scale"] = {"name": scale, **seed.SCALES[scale]}
+
+
+def open_bench_database():
+    """Open the benchmark database, separate from the app's own data.
+
+    With DB_BACKEND=sqlite this is the file BENCH_SQLITE_PATH (default
+    bench.sqlite3); with MySQL it is the schema BENCH_DB_NAME (default
+    project_details_bench), created if needed.
+    """
+    import mysql.connector
+    from config import DB_BACKEND, DB_CONFIG, SQLITE_CONFIG
+
+    if DB_BACKEND == "sqlite":
+        SQLITE_CONFIG["path"] = os.getenv("BENCH_SQLITE_PATH", "bench.sqlite3")
+        from db import Database
+        return Database()
+
+    name = os.getenv("BENCH_DB_NAME", "project_details_bench")
+    server = mysql.connector.connect(**{k: v for k, v in DB_CONFIG.items() if k != "database"})
+    cursor = server.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{name}`")
+    cursor.close()
+    server.close()
+
+    # db.py reads this dict when connecting, so point it at the benchmark schema
+    DB_CONFIG["database"] = name
+    from db import Database
+    return Database()
+
+
+@pytest.fixture(scope="session")
+def bench_scale(request):
+    return seed.SCALES[request.config.getoption("--bench-scale")]
+
+
+@pytest.fixture(scope="session")
+def bench_db(request, bench_scale):
+    from auth import Auth
+
+    db = open_bench_database()
+    Auth(db)  # creates the users tables
+    if request.config.getoption("--bench-reseed") or not seed.is_seeded(db, bench_scale):
+        seed.seed_database(db, bench_scale)
+    return db
@@ -0,0 +1,159 @@
+"""A local stand-in for the OpenAI chat completions API, for testing proposal batches.
+
+    python benchmarks/fake_openai_server.py --port 8089 --latency 0.5 --tokens-per-minute 20000
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=fake python proposals.py --status Pending
+
+Every request waits --latency seconds and gets a canned proposal with
+realistic usage. Like the real API, requests over --tokens-per-minute in
+the last minute get a 429 with retry-after-ms. Stats are printed on exit.
+"""
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPLETION = """# Project Overview
+A website for the client, built by the team below.
+
+# Scope of Work
+Design, development, testing and launch.
+
+# Technical Approach
+The agreed technology stack.
+
+# Timeline
+As quoted.
+
+# Team Composition
+As allocated.
+
+# Cost Breakdown
+As quoted.
+"""
+COMPLETION_TOKENS = 600
+
+
+class FakeOpenAI:
+    """The server in a background thread; use as a context manager.
+
+    base_url is the value for OPENAI_BASE_URL. stats counts requests,
+    rate_limited (429s sent) and peak_in_flight.
+    """
+
+    def __init__(self, port=0, latency=0.0, tokens_per_minute=0):
+        self.latency = latency
+        self.tokens_per_minute = tokens_per_minute
+        self.stats = {"requests": 0, "rate_limited": 0, "peak_in_flight": 0}
+        self.in_flight = 0
+        self.window = deque()  # (time, tokens) served in the last minute
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/v1"
+
+    def _admit(self, tokens):
+        """Count a request; None if admitted, else seconds until it would be"""
+        with self.lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            while self.window and self.window[0][0] <= now - 60:
+                self.window.popleft()
+            used = sum(spent for _, spent in self.window)
+            if self.tokens_per_minute and used + tokens > self.tokens_per_minute:
+                self.stats["rate_limited"] += 1
+                # When enough of the window will have expired
+                for served_at, spent in self.window:
+                    used -= spent
+                    if used + tokens <= self.tokens_per_minute:
+                        return max(served_at + 60 - now, 0.001)
+                return 60.0
+            self.window.append((now, tokens))
+            self.in_flight += 1
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.in_flight)
+            return None
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status, body, headers=()):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path.rstrip("/") != "/v1/chat/completions":
+                    self._reply(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+                    return
+
+                prompt_tokens = sum(len(message.get("content", "")) for message in request.get("messages", [])) // 4
+                wait = fake._admit(prompt_tokens + COMPLETION_TOKENS)
+                if wait is not None:
+                    self._reply(429, {"error": {
+                        "message": "Rate limit reached for tokens per min (TPM)",
+                        "type": "tokens", "code": "rate_limit_exceeded",
+                    }}, [("retry-after-ms", str(int(wait * 1000)))])
+                    return
+
+                try:
+                    time.sleep(fake.latency)
+                    self._reply(200, {
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": request.get("model", "gpt-3.5-turbo"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": COMPLETION},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": COMPLETION_TOKENS,
+                            "total_tokens": prompt_tokens + COMPLETION_TOKENS,
+                        },
+                    })
+                finally:
+                    with fake.lock:
+                        fake.in_flight -= 1
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, name="fake-openai", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fake OpenAI chat completions.")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per completion")
+    parser.add_argument("--tokens-per-minute", type=int, default=0, help="rate limit (0: none)")
+    args = parser.parse_args()
+
+    with FakeOpenAI(args.port, args.latency, args.tokens_per_minute) as fake:
+        print(f"Serving on {fake.base_url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+    print(fake.stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""Drive concurrent simulated users through the app against the benchmark database.
+
+    DB_BACKEND=sqlite python benchmarks/load_test.py --sessions 10
+    python benchmarks/load_test.py --sessions 50 --iterations 3 --scale medium --json load.json
+
+Each session logs in, then repeatedly builds a quote in app.py (client
+details, two team members, a tech stack, a template proposal), opens it on
+the project page and changes its status, and adds a team member on the team
+page. Every interaction is one rerun, timed from the widget change to the
+finished script, with the database queries it made (query_stats).
+
+Sessions are streamlit.testing AppTests. AppTest keeps its runtime in
+globals, so each session runs in its own worker process; the processes
+share the database but not the reader pool or st.cache_data, so results
+are somewhat pessimistic compared with one server process.
+
+Reports p50/p95/p99 rerun latency and queries per rerun, per step and
+overall, and with MySQL the peak number of server connections
+(Threads_connected, sampled every 50 ms). Quotes and team members the run
+created are deleted afterwards unless --keep is given.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import seed
+from conftest import open_bench_database
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLIENT_PREFIX = "Load Test Client"
+MEMBER_PREFIX = "Load Test Member"
+STATUSES = ["Approved", "In Progress", "Completed"]
+TIMEOUT_SECONDS = 120
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile, as query_stats reports them"""
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+
+def _init_worker(backend_config, start_barrier, verbose):
+    from config import DB_CONFIG, SQLITE_CONFIG
+
+    if not verbose:
+        # The app prints pricing logs and streamlit deprecation warnings
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1)
+        os.dup2(devnull, 2)
+
+    # Point db.py at the benchmark database, as open_bench_database did here
+    SQLITE_CONFIG.update(backend_config["sqlite"])
+    DB_CONFIG.update(backend_config["mysql"])
+    os.chdir(APP_DIR)
+    global _start_barrier
+    _start_barrier = start_barrier
+
+
+class Session:
+    """One simulated user; each step is one rerun"""
+
+    def __init__(self, number):
+        from streamlit.testing.v1 import AppTest
+
+        self.number = number
+        self.app = AppTest.from_file(os.path.join(APP_DIR, "app.py"), default_timeout=TIMEOUT_SECONDS)
+        self.steps = []  # (step, ms, queries)
+
+    def step(self, name, action):
+        import query_stats
+
+        before = sum(stats.calls for stats in list(query_stats.methods.values()))
+        start = time.perf_counter()
+        action()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        queries = sum(stats.calls for stats in list(query_stats.methods.values())) - before
+        self.steps.append((name, elapsed_ms, queries))
+        if self.app.exception:
+            raise RuntimeError(f"{name}: {self.app.exception[0].value}")
+
+    def button(self, label):
+        return next(button for button in self.app.button if button.label == label)
+
+    def log_in(self):
+        app = self.app
+        self.step("open app", app.run)
+        app.text_input(key="login_username").input(seed.BENCH_USER)
+        app.text_input(key="login_password").input(seed.BENCH_PASSWORD)
+        self.step("log in", self.button("Login").click().run)
+
+    def build_quote(self, iteration, members, techs):
+        app = self.app
+        if app.session_state["team_selections"]:
+            app.switch_page("app.py")
+            self.step("open quote form", app.run)
+            # Start from an empty team, as after a page reload
+            while app.session_state["team_selections"]:
+                self.step("remove team member", self.button("Remove Team Member 1").click().run)
+
+        client = f"{CLIENT_PREFIX} {self.number}-{iteration}"
+        app.text_input(key="client_name").input(client)
+        app.text_input(key="client_email").input(f"load{self.number}@example.com")
+        app.number_input(key="pages").set_value(5 + iteration % 10)
+        self.step("client details", app.run)
+
+        for i, member in enumerate(members):
+            self.step("add team member", self.button("Add Team Member").click().run)
+            select = app.selectbox(key=f"team_selection_{i}")
+            option = next(option for option in select.options if option.startswith(member + " |"))
+            self.step("choose team member", select.set_value(option).run)
+        self.step("tech stack", app.multiselect(key="tech_stack").set_value(techs).run)
+        self.step("proposal source", app.radio(key="proposal_source").set_value("Standard template").run)
+        self.step("generate quote", self.button("Generate Quote").click().run)
+        return client
+
+    def review_quote(self, client, iteration):
+        app = self.app
+        app.switch_page("pages/project_management.py")
+        self.step("open project page", app.run)
+        select = app.selectbox(key="selected_quote")
+        label = next((option for option in select.options if option.endswith(f": {client}")), None)
+        if label is None:
+            raise RuntimeError(f"view quote: {client} is not listed")
+        self.step("view quote", select.set_value(label).run)
+        status = next(select for select in app.selectbox if select.label == "Update Status")
+        self.step("update status", status.set_value(STATUSES[iteration % len(STATUSES)]).run)
+
+    def add_team_member(self, iteration):
+        app = self.app
+        app.switch_page("pages/team_management.py")
+        self.step("open team page", app.run)
+        app.text_input(key="name_input").input(f"{MEMBER_PREFIX} {self.number}-{iteration}")
+        app.text_input(key="role_input").input("Engineer")
+        self.step("add member", self.button("Add Team Member").click().run)
+
+
+def run_session(number, iterations, ramp_up, members, techs):
+    """Run one session in this worker; returns its steps and any error"""
+    import audit
+    import db
+
+    _start_barrier.wait()
+    time.sleep(ramp_up * number)
+    session, error = None, None
+    try:
+        session = Session(number)
+        session.log_in()
+        for iteration in range(iterations):
+            client = session.build_quote(iteration, members, techs)
+            session.review_quote(client, iteration)
+            session.add_team_member(iteration)
+    except Exception as e:
+        error = f"session {number}: {e}"
+        traceback.print_exc()
+    # Worker processes exit without running atexit handlers
+    audit.flush()
+    return {"steps": session.steps if session else [], "error": error, "pool_peak": db.pool_stats()["peak"]}
+
+
+def watch_connections(stop, peak):
+    """Sample MySQL's Threads_connected until stop is set"""
+    import mysql.connector
+    from config import DB_CONFIG
+
+    connection = mysql.connector.connect(**DB_CONFIG)
+    cursor = connection.cursor()
+    while not stop.wait(0.05):
+        cursor.execute("SHOW GLOBAL STATUS LIKE 'Threads_connected'")
+        # Less this monitoring connection
+        peak[0] = max(peak[0], int(cursor.fetchone()[1]) - 1)
+    cursor.close()
+    connection.close()
+
+
+def clean_up(db):
+    cursor = db.connection.cursor()
+    cursor.execute("SELECT id FROM quotes WHERE client_name LIKE %s", (CLIENT_PREFIX + " %",))
+    quote_ids = [row[0] for row in cursor.fetchall()]
+    for quote_id in quote_ids:
+        db.delete_quote(quote_id)
+        cursor.execute("DELETE FROM quote_events WHERE quote_id = %s", (quote_id,))
+    cursor.execute("DELETE FROM team_members WHERE name LIKE %s", (MEMBER_PREFIX + " %",))
+    db.connection.commit()
+    cursor.close()
+    return len(quote_ids)
+
+
+def summarize(results):
+    by_step = {}
+    for result in results:
+        for step, ms, queries in result["steps"]:
+            by_step.setdefault(step, []).append((ms, queries))
+    rows = []
+    for step, samples in [*by_step.items(), ("all reruns", [s for samples in by_step.values() for s in samples])]:
+        latencies = [ms for ms, _ in samples]
+        queries = [count for _, count in samples]
+        rows.append({
+            "step": step,
+            "reruns": len(samples),
+            "p50_ms": round(percentile(latencies, 0.5), 1),
+            "p95_ms": round(percentile(latencies, 0.95), 1),
+            "p99_ms": round(percentile(latencies, 0.99), 1),
+            "mean_queries": round(sum(queries) / len(queries), 1) if queries else 0.0,
+            "max_queries": max(queries, default=0),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent simulated users")
+    parser.add_argument("--iterations", type=int, default=2, help="quotes each user builds")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds between session starts")
+    parser.add_argument("--scale", default="small", choices=sorted(seed.SCALES))
+    parser.add_argument("--reseed", action="store_true")
+    parser.add_argument("--keep", action="store_true", help="keep the quotes and team members created")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show the sessions' output")
+    args = parser.parse_args()
+
+    import multiprocessing
+    from auth import Auth
+    from config import DB_CONFIG, SQLITE_CONFIG
+
+    scale = seed.SCALES[args.scale]
+    db = open_bench_database()
+    Auth(db)
+    if args.reseed or not seed.is_seeded(db, scale):
+        print(f"Seeding the benchmark database ({args.scale})...")
+        seed.seed_database(db, scale)
+
+    stop, peak, watcher = threading.Event(), [0], None
+    if db.dialect == "mysql":
+        watcher = threading.Thread(target=watch_connections, args=(stop, peak), daemon=True)
+        watcher.start()
+
+    members = seed.member_names(scale)[:2]
+    techs = seed.tech_names(scale)[:2]
+    backend_config = {"sqlite": dict(SQLITE_CONFIG), "mysql": dict(DB_CONFIG)}
+    barrier = multiprocessing.Barrier(args.sessions)
+    print(f"Running {args.sessions} sessions x {args.iterations} quotes...")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(args.sessions, initializer=_init_worker, initargs=(backend_config, barrier, args.verbose)) as pool:
+        futures = [
+            pool.submit(run_session, number, args.iterations, args.ramp_up, members, techs)
+            for number in range(args.sessions)
+        ]
+        results = [future.result() for future in futures]
+    seconds = time.perf_counter() - start
+    stop.set()
+    if watcher:
+        watcher.join()
+
+    rows = summarize(results)
+    errors = [result["error"] for result in results if result["error"]]
+    print(f"\n{'step':20} {'reruns':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'max':>5}")
+    for row in rows:
+        print(f"{row['step']:20} {row['reruns']:7} {row['p50_ms']:8.1f} {row['p95_ms']:8.1f} "
+              f"{row['p99_ms']:8.1f} {row['mean_queries']:8.1f} {row['max_queries']:5}")
+    print(f"\n{args.sessions} sessions in {seconds:.1f}s, {len(errors)} failed")
+    if db.dialect == "mysql":
+        print(f"Peak MySQL connections: {peak[0]}")
+    print(f"Peak reader pool checkouts per process: {max(result['pool_peak'] for result in results)}")
+    for error in errors:
+        print(f"  {error}")
+
+    if not args.keep:
+        print(f"Removed {clean_up(db)} load-test quotes")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "sessions": args.sessions,
+                "iterations": args.iterations,
+                "scale": {"name": args.scale, **scale},
+                "backend": db.dialect,
+                "seconds": seconds,
+                "steps": rows,
+                "peak_connections": peak[0] if db.dialect == "mysql" else None,
+                "errors": errors,
+            }, f, indent=2)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Synthetic data for the benchmark database.
+
+Scales follow the sizes we care about: from a small office up to a
+multi-year archive. Rows get explicit ids so team members can be linked to
+their quotes without reading ids back.
+"""
+import json
+import random
+from datetime import datetime, timedelta
+
+import passwords
+
+SCALES = {
+    "small": {"quotes": 100, "team_members": 10, "components": 50},
+    "medium": {"quotes": 10_000, "team_members": 1_000, "components": 5_000},
+    "large": {"quotes": 1_000_000, "team_members": 1_000, "components": 5_000},
+}
+
+BENCH_USER = "bench"
+BENCH_PASSWORD = "bench-password"
+
+COMPLEXITIES = [("Website", 500, 1.0), ("Project", 1500, 1.5), ("Product", 4000, 2.0)]
+STRATEGIES = [("Psychological Pricing", 0, 1.0), ("Premium Pricing", 0, 1.2), ("Penetration Pricing", 0, 0.9)]
+STATUSES = ["Pending", "Approved", "Rejected", "In Progress", "Completed"]
+BATCH_SIZE = 2000
+
+PROPOSAL_PARAGRAPH = (
+    "We will deliver a responsive, accessible website built on a modern stack, "
+    "with a content model agreed in discovery, automated deployment and a "
+    "two-week stabilisation period after launch. "
+)
+
+
+def tech_names(scale):
+    count = scale["components"] - len(COMPLEXITIES) - len(STRATEGIES)
+    return [f"Tech {i:05d}" for i in range(count)]
+
+
+def member_names(scale):
+    return [f"Member {i:05d}" for i in range(scale["team_members"])]
+
+
+def _insert_batches(db, sql, rows):
+    cursor = db.connection.cursor()
+    for start in range(0, len(rows), BATCH_SIZE):
+        cursor.executemany(sql, rows[start:start + BATCH_SIZE])
+        db.connection.commit()
+    cursor.close()
+
+
+def _count(db, table):
+    cursor = db.connection.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+    count = cursor.fetchone()[0]
+    cursor.close()
+    return count
+
+
+def is_seeded(db, scale):
+    return (
+        _count(db, "quotes") == scale["quotes"]
+        and _count(db, "team_members") == scale["team_members"]
+        and _count(db, "pricing_components") == scale["components"]
+    )
+
+
+def clear(db):
+    cursor = db.connection.cursor()
+    for table in ["quote_events", "quote_team_members_archive", "quotes_archive", "quote_components",
+                  "quote_team_members", "quotes", "team_members", "pricing_components",
+                  "pricing_categories", "monthly_revenue", "user_sessions", "users"]:
+        cursor.execute(f"DELETE FROM {table}")
+    db.connection.commit()
+    cursor.close()
+
+
+def seed_database(db, scale, rng=None):
+    """Replace the contents of db with synthetic data of the given scale"""
+    rng = rng or random.Random(42)
+    clear(db)
+
+    _insert_batches(db, "INSERT INTO pricing_categories (id, name, description) VALUES (%s, %s, %s)", [
+        (1, "Technology Stack", None), (2, "Pricing Strategy", None), (3, "Complexity", None),
+    ])
+
+    components = [(3, name, price, mult) for name, price, mult in COMPLEXITIES]
+    components += [(2, name, price, mult) for name, price, mult in STRATEGIES]
+    components += [(1, name, rng.randint(2, 40) * 50, 1.0) for name in tech_names(scale)]
+    _insert_batches(
+        db,
+        "INSERT INTO pricing_components (category_id, name, base_price, multiplier) VALUES (%s, %s, %s, %s)",
+        components,
+    )
+
+    members = [
+        (name, "Engineer" if i % 2 == 0 else "Designer", "Developer" if i % 2 == 0 else "Designer", rng.randint(8, 30) * 50)
+        for i, name in enumerate(member_names(scale))
+    ]
+    _insert_batches(
+        db,
+        "INSERT INTO team_members (name, role, role_type, default_rate) VALUES (%s, %s, %s, %s)",
+        members,
+    )
+
+    techs = tech_names(scale)
+    start = datetime.now() - timedelta(days=3 * 365)
+    quote_sql = """
+        INSERT INTO quotes (
+            id, client_name, client_email, pages, complexity, timeline, margin_percentage,
+            marketing_strategy, marketing_cost, base_cost, total_cost, profit,
+            tech_stack, proposal_text, status, created_at
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """
+    team_sql = "INSERT INTO quote_team_members (quote_id, name, role, rate) VALUES (%s, %s, %s, %s)"
+
+    for first_id in range(1, scale["quotes"] + 1, BATCH_SIZE):
+        quote_rows, team_rows = [], []
+        for quote_id in range(first_id, min(first_id + BATCH_SIZE, scale["quotes"] + 1)):
+            base_cost = rng.randint(20, 400) * 100
+            total_cost = base_cost * 1.5
+            quote_rows.append((
+                quote_id, f"Client {quote_id}", f"client{quote_id}@example.com",
+                rng.randint(1, 40), rng.choice(COMPLEXITIES)[0], rng.randint(1, 26), 50,
+                rng.choice(STRATEGIES)[0], 0, base_cost, total_cost, total_cost - base_cost,
+                json.dumps(rng.sample(techs, 3)), PROPOSAL_PARAGRAPH * 12, rng.choice(STATUSES),
+                start + timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60)),
+            ))
+            for member in rng.sample(members, min(3, len(members))):
+                team_rows.append((quote_id, member[0], member[1], member[3]))
+        _insert_batches(db, quote_sql, quote_rows)
+        _insert_batches(db, team_sql, team_rows)
+    db.backfill_quote_components(batch_size=BATCH_SIZE)
+
+    _insert_batches(db, "INSERT INTO users (username, password_hash, email) VALUES (%s, %s, %s)", [
+        (BENCH_USER, passwords.hash_password(BENCH_PASSWORD), "bench@example.com"),
+    ])
@@ -0,0 +1,77 @@
+from collections import defaultdict
+from datetime import timedelta
+
+# Team capacity from the quotes that are going ahead. A quote's team is
+# assumed to work on it from the week it was created for `timeline` weeks;
+# a member's load in a week is the number of such quotes they are on.
+
+# Quote statuses that occupy the team
+BOOKED_STATUSES = ("Approved", "In Progress")
+
+
+def week_start(day):
+    """The Monday of day's week, as a date"""
+    if hasattr(day, "date"):
+        day = day.date()
+    return day - timedelta(days=day.weekday())
+
+
+def member_events(allocations, first_week, weeks):
+    """Per member, the (week, change, quote_id) events of their allocations.
+
+    Weeks are counted from first_week. Allocations outside the window are
+    dropped and the rest clipped to it.
+    """
+    events = defaultdict(list)
+    for allocation in allocations:
+        begin = (week_start(allocation["created_at"]) - first_week).days // 7
+        end = begin + allocation["timeline"]
+        if end <= 0 or begin >= weeks:
+            continue
+        events[allocation["name"]].append((max(begin, 0), 1, allocation["quote_id"]))
+        events[allocation["name"]].append((min(end, weeks), -1, allocation["quote_id"]))
+    return events
+
+
+def weekly_load(allocations, first_week, weeks, capacity=1):
+    """Sweep each member's allocations into weekly loads and overbooked periods.
+
+    allocations are rows with name, quote_id, created_at and timeline, as
+    returned by Database.get_team_allocations. Each member's start/end
+    events are sorted once and walked in order (O(n log n) for n
+    allocations), keeping the load and the set of quotes in progress.
+
+    Returns (loads, overbooked). loads maps each member with work in the
+    window to a list of `weeks` loads. overbooked lists each run of weeks
+    in which a member is on more than `capacity` quotes, as dicts with
+    name, start and end (week indexes, end exclusive), peak and quote_ids.
+    """
+    loads, overbooked = {}, []
+    for name, events in member_events(allocations, first_week, weeks).items():
+        # Ends sort before starts in the same week: the weeks are half-open
+        events.sort()
+        row = [0] * weeks
+        load, week, active, run = 0, 0, set(), None
+        for position, change, quote_id in events:
+            if position > week:
+                row[week:position] = [load] * (position - week)
+                if load > capacity:
+                    if run is None:
+                        run = {"name": name, "start": week, "end": position, "peak": load, "quote_ids": set(active)}
+                        overbooked.append(run)
+                    run["end"] = position
+                    run["peak"] = max(run["peak"], load)
+                    run["quote_ids"] |= active
+                else:
+                    run = None
+                week = position
+            load += change
+            if change > 0:
+                active.add(quote_id)
+            else:
+                active.discard(quote_id)
+        loads[name] = row
+
+    for run in overbooked:
+        run["quote_ids"] = sorted(run["quote_ids"])
+    return loads, overbooked
@@ -0,0 +1,60 @@
+from datetime import date, datetime
+
+# Downsampling for long chart series. Largest-Triangle-Three-Buckets keeps
+# the first and last points and, from each of max_points - 2 equal buckets
+# in between, the point that makes the largest triangle with the point kept
+# before it and the average of the next bucket. Peaks and troughs survive,
+# so a multi-year line looks the same with a few hundred points.
+
+
+def _number(x):
+    """x as a float; dates become seconds, so their spacing is kept"""
+    if isinstance(x, datetime):
+        return x.timestamp()
+    if isinstance(x, date):
+        return float(x.toordinal() * 86400)
+    return float(x)
+
+
+def lttb_indices(xs, ys, max_points):
+    """Indices of the points LTTB keeps, in order; all of them if there are few enough"""
+    count = len(xs)
+    if max_points >= count or count <= 2:
+        return list(range(count))
+    if max_points < 3:
+        return [0, count - 1][:max(max_points, 0)]
+
+    xs = [_number(x) for x in xs]
+    ys = [float(y) for y in ys]
+    bucket_size = (count - 2) / (max_points - 2)
+    kept = [0]
+    previous = 0
+    for bucket in range(max_points - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        # The average of the next bucket (the last point for the last bucket)
+        next_start, next_end = end, min(int((bucket + 2) * bucket_size) + 1, count)
+        if next_start >= next_end:
+            next_start, next_end = count - 1, count
+        span = next_end - next_start
+        average_x = sum(xs[next_start:next_end]) / span
+        average_y = sum(ys[next_start:next_end]) / span
+
+        ax, ay = xs[previous], ys[previous]
+        best, best_area = start, -1.0
+        for i in range(start, end):
+            # Twice the triangle's area; only the comparison matters
+            area = abs((ax - average_x) * (ys[i] - ay) - (ax - xs[i]) * (average_y - ay))
+            if area > best_area:
+                best, best_area = i, area
+        kept.append(best)
+        previous = best
+    kept.append(count - 1)
+    return kept
+
+
+def downsample(xs, ys, max_points):
+    """(xs, ys) reduced to at most max_points points with LTTB"""
+    indices = lttb_indices(xs, ys, max_points)
+    return [xs[i] for i in indices], [ys[i] for i in indices]
@@ -8,4 +8,111 @@ DB_CONFIG = {
     'user': os.getenv('DB_USER', 'root'),
     'password': os.getenv('DB_PASSWORD', ''),
     'database': os.getenv('DB_NAME', 'project_details')
-}
\ No newline at end of file
+}
+
+# Read replicas as comma-separated host[:port] entries, e.g.
+# DB_REPLICAS=replica1:3306,replica2:3306. They share DB_CONFIG's user,
+# password and database. Reporting reads go to a replica that is at most
+# DB_REPLICA_MAX_LAG_SECONDS behind; a session reads from the primary for
+# DB_READ_YOUR_WRITES_SECONDS after it saves a quote or changes its status.
+DB_REPLICAS = [
+    {'host': host, 'port': int(port or 3306)}
+    for host, _, port in (
+        entry.strip().partition(':') for entry in os.getenv('DB_REPLICAS', '').split(',') if entry.strip()
+    )
+]
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', '5'))
+DB_REPLICA_CHECK_SECONDS = float(os.getenv('DB_REPLICA_CHECK_SECONDS', '2'))
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv('DB_READ_YOUR_WRITES_SECONDS', '10'))
+
+# 'mysql' (default) or 'sqlite' for an embedded single-file database that
+# needs no server, e.g. for development, CI and single-node installs.
+DB_BACKEND = os.getenv('DB_BACKEND', 'mysql')
+SQLITE_CONFIG = {
+    'path': os.getenv('SQLITE_PATH', 'project_details.sqlite3')
+}
+
+# Pooled connections (and worker threads) used to run a page's independent
+# reads concurrently through Database.gather. 0 runs them one after another.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '4'))
+
+# Connection health. A session's connection is pinged when it has been idle
+# for DB_PING_INTERVAL_SECONDS and reopened if dead. Connecting is retried
+# DB_CONNECT_RETRIES times with jittered exponential backoff; after
+# DB_BREAKER_THRESHOLD consecutive failures, connects fail fast for
+# DB_BREAKER_RESET_SECONDS before one trial connect is let through.
+DB_PING_INTERVAL_SECONDS = float(os.getenv('DB_PING_INTERVAL_SECONDS', '10'))
+DB_CONNECT_RETRIES = int(os.getenv('DB_CONNECT_RETRIES', '4'))
+DB_RETRY_BASE_SECONDS = float(os.getenv('DB_RETRY_BASE_SECONDS', '0.2'))
+DB_RETRY_MAX_SECONDS = float(os.getenv('DB_RETRY_MAX_SECONDS', '5'))
+DB_BREAKER_THRESHOLD = int(os.getenv('DB_BREAKER_THRESHOLD', '5'))
+DB_BREAKER_RESET_SECONDS = float(os.getenv('DB_BREAKER_RESET_SECONDS', '30'))
+
+# Login sessions: an opaque token is kept in a browser cookie and resolved
+# through a server-side LRU cache backed by the user_sessions table.
+SESSION_COOKIE_NAME = os.getenv('SESSION_COOKIE_NAME', 'pm_session')
+SESSION_TTL_HOURS = int(os.getenv('SESSION_TTL_HOURS', '168'))
+SESSION_CACHE_SIZE = int(os.getenv('SESSION_CACHE_SIZE', '1024'))
+SESSION_SWEEP_SECONDS = int(os.getenv('SESSION_SWEEP_SECONDS', '300'))
+
+# Password hashing. PASSWORD_KDF is 'scrypt' or 'pbkdf2_sha256'; raising the
+# work factors upgrades existing hashes the next time each user logs in.
+PASSWORD_KDF = os.getenv('PASSWORD_KDF', 'scrypt')
+SCRYPT_N = int(os.getenv('SCRYPT_N', '16384'))
+SCRYPT_R = int(os.getenv('SCRYPT_R', '8'))
+SCRYPT_P = int(os.getenv('SCRYPT_P', '1'))
+PBKDF2_ITERATIONS = int(os.getenv('PBKDF2_ITERATIONS', '600000'))
+PASSWORD_WORKERS = int(os.getenv('PASSWORD_WORKERS', '4'))
+
+# Queries slower than this (execute plus fetch) go to the slow-query log
+# on the diagnostics page.
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))
+
+# Prometheus metrics, off unless one is set: METRICS_PORT serves /metrics
+# over HTTP, METRICS_TEXTFILE is rewritten every METRICS_TEXTFILE_SECONDS
+# for node_exporter's textfile collector.
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+METRICS_TEXTFILE = os.getenv('METRICS_TEXTFILE', '')
+METRICS_TEXTFILE_SECONDS = float(os.getenv('METRICS_TEXTFILE_SECONDS', '15'))
+
+# Store new proposal texts zlib-compressed in quotes.proposal_compressed
+# instead of quotes.proposal_text. Both are read back transparently, but
+# full-text search only sees proposals stored uncompressed.
+PROPOSAL_COMPRESSION = os.getenv('PROPOSAL_COMPRESSION', '').lower() in ('1', 'true', 'yes')
+
+# Batch proposal generation (python proposals.py). At most
+# PROPOSAL_CONCURRENCY requests are in flight and PROPOSAL_TOKENS_PER_MINUTE
+# is kept under the account's limit; a 429 is retried up to
+# PROPOSAL_MAX_RETRIES times. Proposals are saved PROPOSAL_WRITE_BATCH at a
+# time. OPENAI_BASE_URL points the app and the batch at another
+# OpenAI-compatible server, such as benchmarks/fake_openai_server.py.
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL', '')
+PROPOSAL_CONCURRENCY = int(os.getenv('PROPOSAL_CONCURRENCY', '8'))
+PROPOSAL_TOKENS_PER_MINUTE = int(os.getenv('PROPOSAL_TOKENS_PER_MINUTE', '90000'))
+PROPOSAL_MAX_RETRIES = int(os.getenv('PROPOSAL_MAX_RETRIES', '6'))
+PROPOSAL_WRITE_BATCH = int(os.getenv('PROPOSAL_WRITE_BATCH', '20'))
+
+# Seconds the quote form waits for OpenAI before it renders the proposal
+# from templates/proposal.txt.j2 instead. The template is also used when
+# the API fails.
+PROPOSAL_LATENCY_BUDGET = float(os.getenv('PROPOSAL_LATENCY_BUDGET', '20'))
+
+# Quote audit events (status changes, creation, deletion) are buffered in
+# memory and written to quote_events in one batch once AUDIT_FLUSH_SIZE are
+# waiting or AUDIT_FLUSH_SECONDS after the oldest was recorded. Up to
+# AUDIT_MAX_PENDING are kept while the database is unreachable; beyond that
+# the oldest are dropped.
+AUDIT_FLUSH_SIZE = int(os.getenv('AUDIT_FLUSH_SIZE', '50'))
+AUDIT_FLUSH_SECONDS = float(os.getenv('AUDIT_FLUSH_SECONDS', '2'))
+AUDIT_MAX_PENDING = int(os.getenv('AUDIT_MAX_PENDING', '10000'))
+
+# python archive.py moves completed and rejected quotes older than
+# ARCHIVE_AFTER_DAYS to quotes_archive, ARCHIVE_BATCH_SIZE quotes per
+# transaction with a ARCHIVE_PAUSE_SECONDS break between them.
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '730'))
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '500'))
+ARCHIVE_PAUSE_SECONDS = float(os.getenv('ARCHIVE_PAUSE_SECONDS', '0.1'))
+
+# Longer chart series are downsampled to this many points (LTTB, see
+# charts.py); a narrower date range is drawn in full once it fits.
+CHART_MAX_POINTS = int(os.getenv('CHART_MAX_POINTS', '500'))
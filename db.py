@@ -1,147 +1,423 @@
 import mysql.connector
+import mysql.connector.pooling
 from mysql.connector import Error
-from config import DB_CONFIG
+from config import DB_BACKEND, DB_CONFIG, SQLITE_CONFIG, DB_POOL_SIZE
+from config import DB_PING_INTERVAL_SECONDS, PROPOSAL_COMPRESSION, ARCHIVE_BATCH_SIZE, ARCHIVE_PAUSE_SECONDS
+from config import DB_REPLICAS, DB_REPLICA_MAX_LAG_SECONDS, DB_REPLICA_CHECK_SECONDS, DB_READ_YOUR_WRITES_SECONDS
+from concurrent.futures import ThreadPoolExecutor
+import db_health
+import db_sqlite
+import query_stats
 import json
 import datetime
+import functools
+import itertools
+import queue
+import re
+import threading
+import time
+import zlib
 
-class Database:
-    def __init__(self):
-        self.connection = None
+# Worker threads for Database.gather, shared by every session in the process
+_read_executor = ThreadPoolExecutor(max_workers=max(DB_POOL_SIZE, 1), thread_name_prefix="db-read")
+
+# Reader connections currently checked out by gather(), for the diagnostics page
+pool_usage = {'in_use': 0, 'peak': 0, 'checkouts': 0}
+_pool_usage_lock = threading.Lock()
+
+
+def pool_stats():
+    with _pool_usage_lock:
+        return dict(pool_usage, size=DB_POOL_SIZE)
+
+
+# Lookups served by an already prepared cursor vs. ones that had to prepare;
+# updated from every session and gather() worker, so only under the lock
+prepared_usage = {'hits': 0, 'misses': 0}
+_prepared_usage_lock = threading.Lock()
+
+
+def _prepared_usage_stats():
+    with _prepared_usage_lock:
+        return prepared_usage['hits'], prepared_usage['misses']
+
+
+query_stats.register_cache("Prepared statements", _prepared_usage_stats)
+
+
+def store_proposal(text):
+    """(proposal_text, proposal_compressed) column values for a proposal"""
+    if PROPOSAL_COMPRESSION and text:
+        return None, zlib.compress(text.encode('utf-8'))
+    return text, None
+
+
+def load_proposal(row):
+    """The proposal text of a row holding both proposal columns; removes them"""
+    compressed = row.pop('proposal_compressed')
+    text = row.pop('proposal_text')
+    if compressed is not None:
+        return zlib.decompress(compressed).decode('utf-8')
+    return text
+
+
+def quote_filters(start=None, end=None, statuses=None, table='quotes'):
+    """WHERE conditions and params for quotes created in [start, end) with one of statuses"""
+    conditions, params = [], []
+    if start is not None:
+        conditions.append(f"{table}.created_at >= %s")
+        params.append(start)
+    if end is not None:
+        conditions.append(f"{table}.created_at < %s")
+        params.append(end)
+    if statuses:
+        conditions.append(f"{table}.status IN ({', '.join(['%s'] * len(statuses))})")
+        params.extend(statuses)
+    return conditions, params
+
+
+def read_only(method):
+    """Run a reporting read on a replica when one is configured and fresh enough.
+
+    Falls back to this Database's own connection when there are no replicas,
+    none is within DB_REPLICA_MAX_LAG_SECONDS, or this session wrote recently.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._on_replica or time.monotonic() < self._primary_until:
+            return method(self, *args, **kwargs)
+        connection = self.checkout_replica()
+        if connection is None:
+            return method(self, *args, **kwargs)
+        try:
+            reader = type(self)(connection=connection)
+            reader._on_replica = True
+            return method(reader, *args, **kwargs)
+        finally:
+            connection.close()
+    return wrapper
+
+
+def sticky_write(method):
+    """Read this session's data from the primary for a while after the write"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._primary_until = time.monotonic() + DB_READ_YOUR_WRITES_SECONDS
+    return wrapper
+
+
+class BaseDatabase:
+    """Backend-neutral queries. Subclasses open self.connection and create the schema.
+
+    Queries use mysql.connector conventions (%s placeholders, dictionary
+    cursors); the SQLite backend adapts its connection to the same API.
+    """
+    dialect = None
+
+    # Secondary indexes as (name, table, columns). They are kept out of the
+    # CREATE TABLE statements so databases created before an index was added
+    # get it too; ensure_indexes() creates whichever ones are missing.
+    INDEXES = [
+        # get_component_price / get_componenents / get_pricing_components
+        ('idx_pricing_components_category', 'pricing_components', ['category_id', 'name', 'active']),
+        ('idx_pricing_components_name', 'pricing_components', ['name', 'active']),
+        # get_team_members (by role) and get_team_member_by_name
+        ('idx_team_members_role', 'team_members', ['active', 'role_type', 'name']),
+        ('idx_team_members_name', 'team_members', ['name', 'active']),
+        # Quote listing newest first, and status filters/totals
+        ('idx_quotes_created', 'quotes', ['created_at', 'id']),
+        ('idx_quotes_status', 'quotes', ['status', 'created_at']),
+        # quotes_with_component: a component's quotes (the primary key covers by-quote)
+        ('idx_quote_components_component', 'quote_components', ['component_id', 'quote_id']),
+        # get_quote_events: one quote's history in order
+        ('idx_quote_events_quote', 'quote_events', ['quote_id', 'id']),
+        # Browsing and purging the archive by age
+        ('idx_quotes_archive_created', 'quotes_archive', ['created_at']),
+        # Month lookups behind pricing and the finance pages
+        ('idx_monthly_financials_month', 'monthly_financials', ['month']),
+        ('idx_monthly_revenue_month', 'monthly_revenue', ['month']),
+    ]
+    _indexes_ready = False
+
+    # Columns added to existing tables after their CREATE TABLE was first
+    # shipped, as (table, column, definition); see ensure_columns()
+    ADDED_COLUMNS = []
+
+    # The pricing category whose components a quote's tech_stack names
+    TECH_CATEGORY = 'Technology Stack'
+
+    # What the quote list shows, and what get_quote loads without the
+    # (possibly multi-KB) proposal
+    QUOTE_LIST_COLUMNS = "id, client_name, client_email, total_cost, timeline, status, created_at"
+    QUOTE_DETAIL_COLUMNS = (
+        "id, client_name, client_email, pages, complexity, timeline, margin_percentage, "
+        "marketing_strategy, marketing_cost, base_cost, total_cost, profit, tech_stack, "
+        "status, created_at"
+    )
+    # Every column of quotes, all copied to quotes_archive
+    QUOTE_COLUMNS = QUOTE_DETAIL_COLUMNS + ", proposal_text, proposal_compressed"
+
+    # Quotes archive_quotes moves out of the hot tables once they are old
+    ARCHIVE_STATUSES = ('Completed', 'Rejected')
+    # Read-your-writes: read_only methods use the primary until this time
+    _primary_until = 0.0
+    _on_replica = False
+
+    def __init__(self, connection=None):
+        self._last_used = time.monotonic()
+        if connection is not None:
+            # A pooled reader for gather(); the schema already exists and the
+            # pool validates the connection when it is checked out
+            self._owns_connection = False
+            self.connection = connection
+            return
+        self._owns_connection = True
+        self._connection = None
         self.connect()
         self.create_tables()
+        self.ensure_columns()
+        self.ensure_indexes()
         print("Database connection established")
 
-    def connect(self):
-        try:
-            self.connection = mysql.connector.connect(**DB_CONFIG)
-        except Error as e:
-            print(f"Error connecting to MySQL Database: {e}")
+    @property
+    def connection(self):
+        """The open connection, checked again after it has sat idle.
 
-    def create_tables(self):
+        A session keeps its Database across reruns, so MySQL's wait_timeout
+        or a network blip can close the connection in between. After
+        DB_PING_INTERVAL_SECONDS without use it is pinged and reopened if dead.
+        """
+        now = time.monotonic()
+        if self._owns_connection and (
+            self._connection is None
+            or (now - self._last_used > DB_PING_INTERVAL_SECONDS and not self._is_alive())
+        ):
+            print("Database connection lost, reconnecting")
+            self.connect()
+        self._last_used = now
+        return self._connection
 
+    @connection.setter
+    def connection(self, connection):
+        self._connection = query_stats.instrument(connection)
 
-        create_team_members = """
-        CREATE TABLE IF NOT EXISTS team_members (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            name VARCHAR(100) NOT NULL,
-            role VARCHAR(100) NOT NULL,
-            role_type ENUM('Developer', 'Designer') NOT NULL,
-            default_rate DECIMAL(10, 2) NOT NULL,
-            active BOOLEAN DEFAULT TRUE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """
+    def _is_alive(self):
+        try:
+            return self._connection.is_connected()
+        except Error:
+            return False
 
-        create_quotes = """
-        CREATE TABLE IF NOT EXISTS quotes (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            client_name VARCHAR(100) NOT NULL,
-            client_email VARCHAR(100) NOT NULL,
-            pages INT NOT NULL,
-            complexity VARCHAR(50) NOT NULL,
-            timeline INT NOT NULL,
-            margin_percentage DECIMAL(5, 2),
-            marketing_strategy VARCHAR(100),
-            marketing_cost DECIMAL(10, 2),
-            base_cost DECIMAL(10, 2),
-            total_cost DECIMAL(10, 2) NOT NULL,
-            profit DECIMAL(10, 2),
-            tech_stack JSON,
-            proposal_text TEXT,
-            status VARCHAR(20) DEFAULT 'Pending',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """
+    def rollback(self):
+        """Roll back the open transaction, for except branches.
 
-        create_quote_team_members = """
-        CREATE TABLE IF NOT EXISTS quote_team_members (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            quote_id INT NOT NULL,
-            name VARCHAR(100) NOT NULL,
-            role VARCHAR(100) NOT NULL,
-            rate DECIMAL(10, 2) NOT NULL,
-            FOREIGN KEY (quote_id) REFERENCES quotes(id) ON DELETE CASCADE
-        )
+        Goes around the connection property, so a failed reconnect (or an
+        open circuit breaker) isn't raised a second time from the handler.
         """
+        if self._connection is None:
+            return
+        try:
+            self._connection.rollback()
+        except Error as e:
+            print(f"Error rolling back: {e}")
 
-        create_pricing_categories = """
-        CREATE TABLE IF NOT EXISTS pricing_components (
-        id INT AUTO_INCREMENT PRIMARY KEY,
-        component_type VARCHAR(50) NOT NULL,  -- 'tech_stack', 'marketing_strategy', 'complexity'
-        name VARCHAR(100) NOT NULL,
-        base_price DECIMAL(10, 2) NOT NULL,
-        multiplier DECIMAL(5, 2) DEFAULT 1.0,  -- For complexity levels
-        description TEXT,
-        active BOOLEAN DEFAULT TRUE,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-        )
-        """
+    def connect(self):
+        """(Re)open the connection, backing off between attempts.
 
-        create_pricing_components = """
-        CREATE TABLE IF NOT EXISTS pricing_components (
-        id INT AUTO_INCREMENT PRIMARY KEY,
-        category_id INT NOT NULL,
-        name VARCHAR(100) NOT NULL,
-        base_price DECIMAL(10, 2) NOT NULL,
-        multiplier DECIMAL(5, 2) DEFAULT 1.0,
-        description TEXT,
-        active BOOLEAN DEFAULT TRUE,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-        FOREIGN KEY (category_id) REFERENCES pricing_categories(id)
-        )
+        Raises db_health.DatabaseUnavailable when every attempt fails, or at
+        once while the circuit breaker is open after repeated failures.
         """
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Error:
+                pass
+        self._connection = None
+        self.connection = db_health.connect_with_retry(self.open_connection, f"{self.dialect} database")
 
-        create_monthly_financials = """
-        CREATE TABLE IF NOT EXISTS monthly_financials (
-        id INT AUTO_INCREMENT PRIMARY KEY,
-        month DATE NOT NULL,  -- Store as YYYY-MM-01 for consistent monthly tracking
-        revenue DECIMAL(10, 2) NOT NULL DEFAULT 0,
-        expenses DECIMAL(10, 2) NOT NULL DEFAULT 0,
-        overhead_costs DECIMAL(10, 2) NOT NULL DEFAULT 0,  -- Fixed monthly costs
-        profit_loss DECIMAL(10, 2) GENERATED ALWAYS AS (revenue - expenses - overhead_costs) STORED,
-        notes TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-        );
-        """
+    def open_connection(self):
+        """Open a new connection, raising a mysql.connector Error on failure"""
+        raise NotImplementedError
 
-        create_fixed_costs= """
-        CREATE TABLE IF NOT EXISTS fixed_costs (
-        id INT AUTO_INCREMENT PRIMARY KEY,
-        name VARCHAR(100) NOT NULL,
-        amount DECIMAL(10, 2) NOT NULL,
-        frequency ENUM('Monthly', 'Quarterly', 'Annually') NOT NULL,
-        description TEXT,
-        active BOOLEAN DEFAULT TRUE,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-        );
-        """
+    def create_tables(self):
+        raise NotImplementedError
 
-        create_monthly_revenue = """
-        CREATE TABLE IF NOT EXISTS monthly_revenue (
-        id INT AUTO_INCREMENT PRIMARY KEY,
-        month VARCHAR(9) NOT NULL,
-        revenue DECIMAL(10, 2) NOT NULL,
-        profit_margin_percentage DECIMAL(5, 2) NOT NULL DEFAULT 50,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """
+    def existing_indexes(self):
+        """Names of the indexes already in the database"""
+        raise NotImplementedError
+
+    def existing_columns(self, table):
+        """Names of the columns table already has"""
+        raise NotImplementedError
 
+    def ensure_columns(self):
+        # Runs just before ensure_indexes, so the same once-per-process flag applies
+        if type(self)._indexes_ready:
+            return
         cursor = self.connection.cursor()
-        cursor.execute(create_team_members)
-        cursor.execute(create_quotes)
-        cursor.execute(create_quote_team_members)
-        cursor.execute(create_pricing_categories)
-        cursor.execute(create_pricing_components)
-        cursor.execute(create_monthly_financials)
-        cursor.execute(create_fixed_costs)
-        cursor.execute(create_monthly_revenue)
+        for table, column, definition in self.ADDED_COLUMNS:
+            if column not in self.existing_columns(table):
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                print(f"Added column {column} to {table}")
         self.connection.commit()
         cursor.close()
 
+    def ensure_indexes(self):
+        # Checked once per process, like Auth's schema setup
+        if type(self)._indexes_ready:
+            return
+        self.ensure_quote_components()
+        existing = self.existing_indexes()
+        cursor = self.connection.cursor()
+        for name, table, columns in self.INDEXES:
+            if name not in existing:
+                cursor.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+                print(f"Created index {name} on {table}")
+        self.connection.commit()
+        cursor.close()
+        self.ensure_search_index()
+        type(self)._indexes_ready = True
+
+    def ensure_search_index(self):
+        """Create the full-text index behind search_quotes if it is missing"""
+        raise NotImplementedError
+
+    def existing_tables(self):
+        """Names of the tables already in the database"""
+        raise NotImplementedError
+
+    def create_quote_components(self):
+        raise NotImplementedError
+
+    def ensure_quote_components(self):
+        """Create the quote_components link table if it is missing, filled from existing quotes"""
+        if 'quote_components' in self.existing_tables():
+            return
+        self.create_quote_components()
+        linked = self.backfill_quote_components()
+        print(f"Created quote_components and linked {linked} existing quotes")
+
+    def backfill_quote_components(self, batch_size=1000):
+        """Link quotes that have no quote_components rows to their tech stack's components.
+
+        Works through the quotes in id order, batch_size at a time, and
+        commits each batch, so it can be stopped and re-run. Names without a
+        Technology Stack component are skipped. Returns the number of quotes
+        linked.
+        """
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("""
+                SELECT pc.name, MIN(pc.id) FROM pricing_components pc
+                JOIN pricing_categories cat ON pc.category_id = cat.id
+                WHERE cat.name = %s
+                GROUP BY pc.name
+            """, (self.TECH_CATEGORY,))
+            component_ids = dict(cursor.fetchall())
+
+            last_id, linked = 0, 0
+            while True:
+                cursor.execute("""
+                    SELECT q.id, q.tech_stack FROM quotes q
+                    WHERE q.id > %s AND NOT EXISTS (
+                        SELECT 1 FROM quote_components qc WHERE qc.quote_id = q.id
+                    )
+                    ORDER BY q.id
+                    LIMIT %s
+                """, (last_id, batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    return linked
+                links = []
+                for quote_id, tech_stack in rows:
+                    names = dict.fromkeys(json.loads(tech_stack) if tech_stack else [])
+                    quote_links = [(quote_id, component_ids[name]) for name in names if name in component_ids]
+                    links += quote_links
+                    linked += bool(quote_links)
+                if links:
+                    cursor.executemany("INSERT INTO quote_components (quote_id, component_id) VALUES (%s, %s)", links)
+                self.connection.commit()
+                last_id = rows[-1][0]
+        finally:
+            cursor.close()
+
+    def search_statement(self, words, limit):
+        """Return (sql, params) matching quotes with every word, the last as a prefix"""
+        raise NotImplementedError
+
+    def checkout_connection(self):
+        """Borrow a connection from the backend's shared pool"""
+        raise NotImplementedError
+
+    def checkout_replica(self):
+        """Borrow a connection to a fresh replica, or None; close() returns it"""
+        return None
+
+    def prepared_cursor(self, sql):
+        """Return a dictionary cursor that keeps sql prepared on this connection.
+
+        Cursors are cached per physical connection, so MySQL parses and plans
+        each hot lookup once per connection rather than on every call, and
+        sends the rows over the binary protocol. Execute only sql on it, read
+        with fetchall() so it is drained before its next use, and don't close it.
+        """
+        raw = getattr(self.connection, 'raw', self.connection)
+        # Pooled connections come wrapped in a new PooledMySQLConnection per checkout
+        raw = getattr(raw, '_cnx', None) or raw
+        # A reconnect gets a new server session without the old statements
+        session = getattr(raw, 'connection_id', None)
+        cached_session, cursors = getattr(raw, 'prepared_cursors', (None, None))
+        if cursors is None or cached_session != session:
+            cursors = {}
+            raw.prepared_cursors = (session, cursors)
+        cursor = cursors.get(sql)
+        with _prepared_usage_lock:
+            prepared_usage['misses' if cursor is None else 'hits'] += 1
+        if cursor is None:
+            cursor = cursors[sql] = self.connection.cursor(prepared=True, dictionary=True)
+        return cursor
+
+    def release_connection(self, connection):
+        raise NotImplementedError
+
+    def _run_on_reader(self, call, run=None):
+        connection = self.checkout_connection()
+        with _pool_usage_lock:
+            pool_usage['in_use'] += 1
+            pool_usage['checkouts'] += 1
+            pool_usage['peak'] = max(pool_usage['peak'], pool_usage['in_use'])
+        try:
+            reader = type(self)(connection=connection)
+            reader._primary_until = self._primary_until
+            with query_stats.attached(run):
+                return call(reader)
+        finally:
+            with _pool_usage_lock:
+                pool_usage['in_use'] -= 1
+            self.release_connection(connection)
+
+    def gather(self, *calls):
+        """Run independent reads concurrently and return their results in order.
+
+        Each call receives its own Database bound to a pooled connection, e.g.
+
+            quotes, quote = db.gather(
+                lambda reader: reader.get_all_quotes(),
+                lambda reader: reader.get_quote(quote_id),
+            )
+
+        so a page waits for its slowest read instead of the sum of all of
+        them. Calls must only use the reader they are given and must not
+        write; exceptions are re-raised here.
+        """
+        if DB_POOL_SIZE < 1 or len(calls) < 2:
+            return [call(self) for call in calls]
+        run = query_stats.current_run()
+        futures = [_read_executor.submit(self._run_on_reader, call, run) for call in calls]
+        return [future.result() for future in futures]
+
     def get_team_members(self, role_type=None):
         cursor = self.connection.cursor(dictionary=True)
         if role_type:
@@ -174,21 +450,22 @@ class Database:
         cursor.close()
 
     def delete_team_member(self, id):
+        cursor = self.connection.cursor()
         try:
-            cursor = self.connection.cursor()
             sql = "UPDATE team_members SET active = FALSE WHERE id = %s"
             cursor.execute(sql, (id,))
             self.connection.commit()
         except Error as e:
             print(f"Error deleting team member: {e}")
-            self.connection.rollback()
+            self.rollback()
         finally:
             cursor.close()
 
+    @sticky_write
     def save_quote(self, quote_details):
         """Save quote details to the database"""
+        cursor = self.connection.cursor()
         try:
-            cursor = self.connection.cursor()
             
             # Insert quote
             quote_sql = """
@@ -196,8 +473,8 @@ class Database:
                 client_name, client_email, pages, complexity, 
                 timeline, margin_percentage, marketing_strategy,
                 marketing_cost, base_cost, total_cost, profit,
-                tech_stack, proposal_text
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                tech_stack, proposal_text, proposal_compressed
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             """
             
             cursor.execute(quote_sql, (
@@ -213,10 +490,21 @@ class Database:
                 quote_details['total_cost'],
                 quote_details['profit'],
                 json.dumps(quote_details['tech_stack']),
-                quote_details.get('proposal', '')  # Store the proposal text if available
+                *store_proposal(quote_details.get('proposal', ''))  # Store the proposal text if available
             ))
             
             quote_id = cursor.lastrowid
+
+            # Link the tech stack's components, for component_usage and quotes_with_component
+            tech_stack = list(dict.fromkeys(quote_details['tech_stack']))
+            if tech_stack:
+                cursor.execute(f"""
+                    INSERT INTO quote_components (quote_id, component_id)
+                    SELECT %s, MIN(pc.id) FROM pricing_components pc
+                    JOIN pricing_categories cat ON pc.category_id = cat.id
+                    WHERE cat.name = %s AND pc.name IN ({', '.join(['%s'] * len(tech_stack))})
+                    GROUP BY pc.name
+                """, (quote_id, self.TECH_CATEGORY, *tech_stack))
             
             # Insert team members for this quote
             team_sql = """
@@ -239,37 +527,24 @@ class Database:
             
         except Error as e:
             print(f"Error saving quote: {e}")
-            self.connection.rollback()
+            self.rollback()
             return None
         finally:
             cursor.close()
 
+    @read_only
     def get_all_quotes(self):
-            """Retrieve all quotes with their team members"""
+            """Retrieve all quotes, newest first, with the QUOTE_LIST_COLUMNS only.
+
+            Use get_quote for a quote's team members, tech stack and proposal.
+            """
+            cursor = self.connection.cursor(dictionary=True)
             try:
-                cursor = self.connection.cursor(dictionary=True)
-                
-                # Get all quotes
-                cursor.execute("""
-                    SELECT * FROM quotes 
+                cursor.execute(f"""
+                    SELECT {self.QUOTE_LIST_COLUMNS} FROM quotes 
                     ORDER BY created_at DESC
                 """)
-                quotes = cursor.fetchall()
-                
-                # For each quote, get its team members
-                for quote in quotes:
-                    cursor.execute("""
-                        SELECT name, role, rate 
-                        FROM quote_team_members 
-                        WHERE quote_id = %s
-                    """, (quote['id'],))
-                    quote['team_selections'] = cursor.fetchall()
-                    
-                    # Convert tech_stack back to list if it exists
-                    if quote['tech_stack']:
-                        quote['tech_stack'] = json.loads(quote['tech_stack'])
-                        
-                return quotes
+                return cursor.fetchall()
                 
             except Error as e:
                 print(f"Error retrieving quotes: {e}")
@@ -277,59 +552,291 @@ class Database:
             finally:
                 cursor.close()
 
-    def get_quote(self, quote_id):
-        """Retrieve a specific quote with its team members"""
+    @read_only
+    def get_latest_quote(self, with_proposal=True):
+        """The most recently created quote, as get_quote returns it, or None"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SELECT id FROM quotes ORDER BY created_at DESC, id DESC LIMIT 1")
+            row = cursor.fetchone()
+        except Error as e:
+            print(f"Error retrieving latest quote: {e}")
+            return None
+        finally:
+            cursor.close()
+        return self.get_quote(row[0], with_proposal=with_proposal) if row else None
+
+    @read_only
+    def get_quote(self, quote_id, with_proposal=False):
+        """Retrieve a specific quote with its team members.
+
+        The proposal text is only loaded, as 'proposal_text', when
+        with_proposal is set; otherwise use get_proposal when it is needed.
+        """
+        columns = self.QUOTE_DETAIL_COLUMNS
+        if with_proposal:
+            columns += ", proposal_text, proposal_compressed"
+        quote_query = f"""
+            SELECT {columns} FROM quotes 
+            WHERE id = %s
+        """
+        team_query = """
+            SELECT name, role, rate 
+            FROM quote_team_members 
+            WHERE quote_id = %s
+        """
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            
             # Get the quote
-            cursor.execute("""
-                SELECT * FROM quotes 
-                WHERE id = %s
-            """, (quote_id,))
-            quote = cursor.fetchone()
+            cursor = self.prepared_cursor(quote_query)
+            cursor.execute(quote_query, (quote_id,))
+            rows = cursor.fetchall()
+            quote = rows[0] if rows else None
             
             if quote:
                 # Get team members for this quote
-                cursor.execute("""
-                    SELECT name, role, rate 
-                    FROM quote_team_members 
-                    WHERE quote_id = %s
-                """, (quote_id,))
+                cursor = self.prepared_cursor(team_query)
+                cursor.execute(team_query, (quote_id,))
                 quote['team_selections'] = cursor.fetchall()
                 
                 # Convert tech_stack back to list
                 if quote['tech_stack']:
                     quote['tech_stack'] = json.loads(quote['tech_stack'])
+                if with_proposal:
+                    quote['proposal_text'] = load_proposal(quote)
                     
             return quote
             
         except Error as e:
             print(f"Error retrieving quote: {e}")
             return None
+
+    # quote_summary dimensions; 'month' uses the backend's month_expression
+    SUMMARY_DIMENSIONS = ['status', 'month', 'complexity', 'marketing_strategy']
+
+    @read_only
+    def quote_summary(self, group_by=(), start=None, end=None):
+        """Count and value of quotes created in [start, end), aggregated in SQL.
+
+        group_by is a list from SUMMARY_DIMENSIONS; each returned row holds
+        those columns plus quote_count, total_value, average_value and
+        total_profit. With no group_by there is a single row of totals.
+        """
+        unknown = set(group_by) - set(self.SUMMARY_DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Cannot group quotes by {', '.join(sorted(unknown))}")
+        columns = [
+            f"{self.month_expression} AS month" if dimension == 'month' else dimension
+            for dimension in group_by
+        ]
+        conditions, params = quote_filters(start, end)
+
+        query = f"""
+            SELECT {''.join(column + ', ' for column in columns)}
+                   COUNT(*) AS quote_count,
+                   COALESCE(SUM(total_cost), 0) AS total_value,
+                   COALESCE(AVG(total_cost), 0) AS average_value,
+                   COALESCE(SUM(profit), 0) AS total_profit
+            FROM quotes
+        """
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        if group_by:
+            query += f" GROUP BY {', '.join(group_by)} ORDER BY {', '.join(group_by)}"
+
+        cursor = self.connection.cursor(dictionary=True)
+        try:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        except Error as e:
+            print(f"Error summarising quotes: {e}")
+            return []
+        finally:
+            cursor.close()
+
+    @read_only
+    def component_usage(self, start=None, end=None, statuses=None, limit=None):
+        """Tech-stack components by the number of quotes created in [start, end) using them.
+
+        statuses limits the count to quotes with one of those statuses. Rows
+        hold component_id, component, quote_count and total_value, most used
+        first.
+        """
+        conditions, params = quote_filters(start, end, statuses, table='q')
+        query = f"""
+            SELECT pc.id AS component_id, pc.name AS component,
+                   COUNT(*) AS quote_count,
+                   COALESCE(SUM(q.total_cost), 0) AS total_value
+            FROM quotes q
+            JOIN quote_components qc ON qc.quote_id = q.id
+            JOIN pricing_components pc ON pc.id = qc.component_id
+            {"WHERE " + " AND ".join(conditions) if conditions else ""}
+            GROUP BY pc.id, pc.name
+            ORDER BY quote_count DESC, pc.name
+        """
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+        cursor = self.connection.cursor(dictionary=True)
+        try:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        except Error as e:
+            print(f"Error counting component usage: {e}")
+            return []
+        finally:
+            cursor.close()
+
+    @read_only
+    def quotes_with_component(self, component_id, start=None, end=None, statuses=None, limit=100):
+        """The newest quotes, created in [start, end), whose tech stack includes the component"""
+        conditions, params = quote_filters(start, end, statuses, table='q')
+        query = f"""
+            SELECT {', '.join('q.' + column for column in self.QUOTE_LIST_COLUMNS.split(', '))}
+            FROM quote_components qc
+            JOIN quotes q ON q.id = qc.quote_id
+            WHERE {" AND ".join(["qc.component_id = %s", *conditions])}
+            ORDER BY q.created_at DESC
+            LIMIT %s
+        """
+        cursor = self.connection.cursor(dictionary=True)
+        try:
+            cursor.execute(query, [component_id, *params, limit])
+            return cursor.fetchall()
+        except Error as e:
+            print(f"Error retrieving quotes for component: {e}")
+            return []
+        finally:
+            cursor.close()
+
+    @read_only
+    def get_team_allocations(self, statuses, start, end):
+        """Team members of quotes with one of statuses that run during [start, end).
+
+        A quote runs from created_at for timeline weeks. Rows hold name,
+        quote_id, client_name, created_at and timeline.
+        """
+        conditions, params = quote_filters(end=end, statuses=statuses, table='q')
+        query = f"""
+            SELECT qtm.name, qtm.quote_id, q.client_name, q.created_at, q.timeline
+            FROM quotes q
+            JOIN quote_team_members qtm ON qtm.quote_id = q.id
+            WHERE {" AND ".join(conditions)} AND {self.quote_end_expression} > %s
+        """
+        cursor = self.connection.cursor(dictionary=True)
+        try:
+            cursor.execute(query, [*params, start])
+            return cursor.fetchall()
+        except Error as e:
+            print(f"Error retrieving team allocations: {e}")
+            return []
+        finally:
+            cursor.close()
+
+    @read_only
+    def search_quotes(self, query, limit=20):
+        """Find quotes by client name, email or proposal text, most relevant first.
+
+        Every word in query must match a word in one of those columns; the
+        last one may be just its start, so "acme lo" finds "Acme Logistics"
+        while it is being typed. Returns the columns the quote list shows
+        plus a relevance score.
+        """
+        words = re.findall(r"\w+", query)
+        if not words:
+            return []
+        sql, params = self.search_statement(words, limit)
+        cursor = self.connection.cursor(dictionary=True)
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        except Error as e:
+            print(f"Error searching quotes: {e}")
+            return []
         finally:
             cursor.close()
 
+    @sticky_write
     def delete_quote(self, quote_id):
-        """Delete a quote and its team members"""
+        """Delete a quote and its team members, whether it is live or archived"""
+        cursor = self.connection.cursor()
         try:
-            cursor = self.connection.cursor()
             
             # Delete the quote (team members will be deleted automatically due to ON DELETE CASCADE)
             cursor.execute("DELETE FROM quotes WHERE id = %s", (quote_id,))
+            if cursor.rowcount == 0:
+                cursor.execute("DELETE FROM quotes_archive WHERE id = %s", (quote_id,))
             self.connection.commit()
             return True
             
         except Error as e:
             print(f"Error deleting quote: {e}")
-            self.connection.rollback()
+            self.rollback()
             return False
         finally:
             cursor.close()
     
-    def update_quote_status(self, quote_id, status):
+    def archivable_quote_count(self, before, statuses=None):
+        """How many quotes archive_quotes(before, statuses) would move"""
+        conditions, params = quote_filters(end=before, statuses=statuses or self.ARCHIVE_STATUSES)
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM quotes WHERE " + " AND ".join(conditions), params)
+        count = cursor.fetchone()[0]
+        cursor.close()
+        return count
+
+    def archived_quote_count(self):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM quotes_archive")
+        count = cursor.fetchone()[0]
+        cursor.close()
+        return count
+
+    def archive_quotes(self, before, statuses=None, batch_size=ARCHIVE_BATCH_SIZE, pause=ARCHIVE_PAUSE_SECONDS):
+        """Move quotes created before `before` with one of statuses to quotes_archive.
+
+        Each batch of batch_size quotes is copied, with its team members, to
+        the archive tables and deleted from the live ones (quote_components
+        rows go with it) in one short transaction, then the job sleeps for
+        pause seconds so other writers get the tables. It can be stopped and
+        re-run. Returns the number of quotes moved.
+        """
+        conditions, params = quote_filters(end=before, statuses=statuses or self.ARCHIVE_STATUSES)
+        # No ORDER BY: each batch is deleted, so the next LIMIT finds the next
+        # one straight from idx_quotes_status without sorting the backlog
+        select = "SELECT id FROM quotes WHERE " + " AND ".join(conditions) + " LIMIT %s"
+        moved = 0
+        cursor = self.connection.cursor()
+        try:
+            while True:
+                cursor.execute(select, (*params, batch_size))
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    return moved
+                in_ids = ", ".join(["%s"] * len(ids))
+                cursor.execute(f"""
+                    INSERT INTO quotes_archive ({self.QUOTE_COLUMNS})
+                    SELECT {self.QUOTE_COLUMNS} FROM quotes WHERE id IN ({in_ids})
+                """, ids)
+                cursor.execute(f"""
+                    INSERT INTO quote_team_members_archive (id, quote_id, name, role, rate)
+                    SELECT id, quote_id, name, role, rate FROM quote_team_members WHERE quote_id IN ({in_ids})
+                """, ids)
+                cursor.execute(f"DELETE FROM quotes WHERE id IN ({in_ids})", ids)
+                self.connection.commit()
+                moved += len(ids)
+                if pause:
+                    time.sleep(pause)
+        except Error as e:
+            print(f"Error archiving quotes: {e}")
+            self.rollback()
+            return moved
+        finally:
+            cursor.close()
+
+    @sticky_write
+    def update_quote_status(self, quote_id, status):
+        cursor = self.connection.cursor()
         try:
-            cursor = self.connection.cursor()
             cursor.execute("""
                 UPDATE quotes 
                 SET status = %s 
@@ -339,31 +846,113 @@ class Database:
             return True
         except Error as e:
             print(f"Error updating quote status: {e}")
-            self.connection.rollback()
+            self.rollback()
             return False
         finally:
             cursor.close()
 
-    def save_proposal(self, quote_id, proposal_text, proposal_pdf):
+    def add_quote_events(self, events):
+        """Append (quote_id, event, old_value, new_value, username, created_at) rows in one transaction"""
+        if not events:
+            return True
         cursor = self.connection.cursor()
-        sql = """
-        UPDATE quotes 
-        SET proposal = %s, proposal_pdf = %s
-        WHERE id = %s
-        """
-        cursor.execute(sql, (proposal_text, proposal_pdf, quote_id))
-        self.connection.commit()
-        cursor.close()
+        try:
+            cursor.executemany("""
+                INSERT INTO quote_events (quote_id, event, old_value, new_value, username, created_at)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, events)
+            self.connection.commit()
+            return True
+        except Error as e:
+            print(f"Error saving quote events: {e}")
+            self.rollback()
+            return False
+        finally:
+            cursor.close()
 
-    def get_proposal(self, quote_id):
+    # Not read_only: events are flushed in the background, so reading your
+    # own writes can't be tracked per session
+    def get_quote_events(self, quote_id):
+        """The quote's audit events, oldest first"""
         cursor = self.connection.cursor(dictionary=True)
-        cursor.execute(
-            "SELECT proposal, proposal_pdf FROM quotes WHERE id = %s",
-            (quote_id,)
-        )
-        result = cursor.fetchone()
+        cursor.execute("""
+            SELECT event, old_value, new_value, username, created_at
+            FROM quote_events
+            WHERE quote_id = %s
+            ORDER BY id
+        """, (quote_id,))
+        events = cursor.fetchall()
         cursor.close()
-        return result
+        return events
+
+    @sticky_write
+    def save_proposal(self, quote_id, proposal_text):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("""
+                UPDATE quotes 
+                SET proposal_text = %s, proposal_compressed = %s
+                WHERE id = %s
+            """, (*store_proposal(proposal_text), quote_id))
+            self.connection.commit()
+            return True
+        except Error as e:
+            print(f"Error saving proposal: {e}")
+            self.rollback()
+            return False
+        finally:
+            cursor.close()
+
+    @sticky_write
+    def save_proposals(self, proposals):
+        """Save (quote_id, proposal_text) pairs in one transaction"""
+        if not proposals:
+            return True
+        cursor = self.connection.cursor()
+        try:
+            cursor.executemany("""
+                UPDATE quotes 
+                SET proposal_text = %s, proposal_compressed = %s
+                WHERE id = %s
+            """, [(*store_proposal(text), quote_id) for quote_id, text in proposals])
+            self.connection.commit()
+            return True
+        except Error as e:
+            print(f"Error saving proposals: {e}")
+            self.rollback()
+            return False
+        finally:
+            cursor.close()
+
+    @read_only
+    def get_quote_ids(self, statuses=None, start=None, end=None):
+        """Ids of the quotes created in [start, end) with one of statuses, oldest first"""
+        conditions, params = quote_filters(start, end, statuses)
+        query = "SELECT id FROM quotes"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(query + " ORDER BY id", params)
+            return [row[0] for row in cursor.fetchall()]
+        except Error as e:
+            print(f"Error retrieving quote ids: {e}")
+            return []
+        finally:
+            cursor.close()
+
+    @read_only
+    def get_proposal(self, quote_id):
+        """The quote's proposal text, decompressed if needed, or None"""
+        query = "SELECT proposal_text, proposal_compressed FROM quotes WHERE id = %s"
+        cursor = self.prepared_cursor(query)
+        try:
+            cursor.execute(query, (quote_id,))
+            rows = cursor.fetchall()
+            return load_proposal(rows[0]) if rows else None
+        except Error as e:
+            print(f"Error retrieving proposal: {e}")
+            return None
 
     def get_pricing_categories(self, active_only=True):
         cursor = self.connection.cursor(dictionary=True)
@@ -458,7 +1047,6 @@ class Database:
         cursor.close()
 
     def get_component_price(self, component_name, category_name=None):
-        cursor = self.connection.cursor(dictionary=True)
         query = """
             SELECT pc.base_price, pc.multiplier, (pc.base_price * pc.multiplier) as price
             FROM pricing_components pc
@@ -466,16 +1054,14 @@ class Database:
             WHERE pc.name = %s AND pc.active = TRUE
         """
         params = [component_name]
-        #print("Params: "+params)
         if category_name:
             query += " AND cat.name = %s"
             params.append(category_name)
 
-        #print(query, params)
+        cursor = self.prepared_cursor(query)
         cursor.execute(query, params)
-        result = cursor.fetchone()
-        print(result)
-        cursor.close()
+        rows = cursor.fetchall()
+        result = rows[0] if rows else None
         return result if result else {"base_price": 0.0, "multiplier": 1.0, "price": 0.0}
 
     def save_previous_month_revenue(self, month, revenue, profit_margin_percentage):
@@ -491,7 +1077,7 @@ class Database:
             return True
         except Exception as e:
             print(f"Error saving previous month's revenue: {e}")
-            self.connection.rollback()
+            self.rollback()
             cursor.close()
             return False
 
@@ -509,7 +1095,7 @@ class Database:
             return cursor.rowcount > 0
         except Exception as e:
             print(f"Error updating previous month's revenue: {e}")
-            self.connection.rollback()
+            self.rollback()
             cursor.close()
             return False
 
@@ -545,17 +1131,709 @@ class Database:
         Returns:
         dict: Team member information if found, None otherwise
         """
+        query = """
+            SELECT * FROM team_members 
+            WHERE name = %s AND active = TRUE
+            LIMIT 1
+        """
+        cursor = self.prepared_cursor(query)
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT * FROM team_members 
-                WHERE name = %s AND active = TRUE
-                LIMIT 1
-            """, (name,))
-            result = cursor.fetchone()
-            return result
+            cursor.execute(query, (name,))
+            rows = cursor.fetchall()
+            return rows[0] if rows else None
         except Error as e:
             print(f"Error retrieving team member: {e}")
             return None
+
+    @read_only
+    def monthly_financials_version(self):
+        """(first month, last month, rows, last update, checksum) of monthly_financials.
+
+        Changes whenever a month is added or edited, so it can key caches of
+        what is drawn from the table.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            SELECT MIN(month), MAX(month), COUNT(*), MAX(updated_at),
+                   SUM(revenue), SUM(expenses), SUM(overhead_costs)
+            FROM monthly_financials
+        """)
+        first, last, rows, updated_at, *sums = cursor.fetchone()
+        cursor.close()
+        if isinstance(first, str):  # SQLite returns dates as text
+            first, last = datetime.date.fromisoformat(first), datetime.date.fromisoformat(last)
+        return first, last, rows, str(updated_at), tuple(float(total or 0) for total in sums)
+
+    @read_only
+    def get_monthly_financials(self, start_date, end_date):
+        """Monthly financial rows with start_date <= month < end_date, oldest first"""
+        cursor = self.connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT month, revenue, expenses, overhead_costs, profit_loss, notes
+            FROM monthly_financials
+            WHERE month >= %s AND month < %s
+            ORDER BY month
+        """, (start_date, end_date))
+        result = cursor.fetchall()
+        cursor.close()
+        return result
+
+    @sticky_write
+    def add_monthly_financial(self, month, revenue, expenses, overhead_costs, notes=None):
+        """Save a month's figures, replacing any already entered for that month"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("""
+                UPDATE monthly_financials
+                SET revenue = %s, expenses = %s, overhead_costs = %s, notes = %s
+                WHERE month = %s
+            """, (revenue, expenses, overhead_costs, notes, month))
+            if cursor.rowcount == 0:
+                cursor.execute("""
+                    INSERT INTO monthly_financials (month, revenue, expenses, overhead_costs, notes)
+                    VALUES (%s, %s, %s, %s, %s)
+                """, (month, revenue, expenses, overhead_costs, notes))
+            self.connection.commit()
+        except Error:
+            self.rollback()
+            raise
         finally:
-            cursor.close()
\ No newline at end of file
+            cursor.close()
+
+    @read_only
+    def get_financial_forecast(self, month):
+        """Conservative/optimistic projections and breakeven figures for month.
+
+        Projections are based on the average of the three months before it;
+        fixed costs are normalised to a monthly amount.
+        """
+        cursor = self.connection.cursor(dictionary=True)
+        history_start = (month - datetime.timedelta(days=92)).replace(day=1)
+        cursor.execute("""
+            SELECT AVG(revenue) AS revenue, AVG(expenses) AS expenses
+            FROM monthly_financials
+            WHERE month >= %s AND month < %s
+        """, (history_start, month))
+        history = cursor.fetchone()
+
+        cursor.execute("""
+            SELECT SUM(CASE frequency
+                       WHEN 'Monthly' THEN amount
+                       WHEN 'Quarterly' THEN amount / 3
+                       ELSE amount / 12 END) AS monthly_fixed
+            FROM fixed_costs
+            WHERE active = TRUE
+        """)
+        fixed = cursor.fetchone()
+
+        cursor.execute("SELECT revenue FROM monthly_financials WHERE month = %s", (month,))
+        current = cursor.fetchone()
+
+        cursor.execute("SELECT SUM(total_cost) AS pending_value FROM quotes WHERE status = 'Pending'")
+        pending = cursor.fetchone()
+        cursor.close()
+
+        average_revenue = float(history['revenue'] or 0)
+        average_expenses = float(history['expenses'] or 0)
+        monthly_fixed = float(fixed['monthly_fixed'] or 0)
+
+        def projection(revenue):
+            return {
+                'revenue': revenue,
+                'expenses': average_expenses,
+                'overhead_costs': monthly_fixed,
+                'profit_loss': revenue - average_expenses - monthly_fixed,
+            }
+
+        current_revenue = float(current['revenue']) if current else 0.0
+        needed_revenue = average_expenses + monthly_fixed
+        return {
+            'conservative': projection(average_revenue * 0.9),
+            'optimistic': projection(average_revenue * 1.1),
+            'breakeven': {
+                'current_revenue': current_revenue,
+                'needed_revenue': needed_revenue,
+                'revenue_gap': max(needed_revenue - current_revenue, 0.0),
+                'potential_projects_value': float(pending['pending_value'] or 0),
+            },
+        }
+
+
+class MySQLDatabase(BaseDatabase):
+    dialect = 'mysql'
+    ADDED_COLUMNS = [('quotes', 'proposal_compressed', 'MEDIUMBLOB')]
+    month_expression = "DATE_FORMAT(created_at, '%Y-%m')"
+    quote_end_expression = "DATE_ADD(q.created_at, INTERVAL q.timeline WEEK)"
+    _pool = None
+    _pool_lock = threading.Lock()
+    # Per DB_REPLICAS entry: its connection pool and (checked_at, lag seconds)
+    _replica_pools = {}
+    _replica_lag = {}
+    _replica_turn = itertools.count()
+
+    def open_connection(self):
+        return mysql.connector.connect(**DB_CONFIG)
+
+    def checkout_connection(self):
+        with MySQLDatabase._pool_lock:
+            if MySQLDatabase._pool is None:
+                MySQLDatabase._pool = mysql.connector.pooling.MySQLConnectionPool(
+                    pool_name="project_management",
+                    pool_size=max(DB_POOL_SIZE, 1),
+                    # Resetting the session on return would drop prepared_cursor's statements
+                    pool_reset_session=False,
+                    **DB_CONFIG
+                )
+        return MySQLDatabase._pool.get_connection()
+
+    def release_connection(self, connection):
+        # Closing a pooled connection hands it back to the pool
+        connection.close()
+
+    def _replica_pool(self, index):
+        with MySQLDatabase._pool_lock:
+            if index not in MySQLDatabase._replica_pools:
+                MySQLDatabase._replica_pools[index] = mysql.connector.pooling.MySQLConnectionPool(
+                    pool_name=f"project_management_replica_{index}",
+                    pool_size=max(DB_POOL_SIZE, 1),
+                    pool_reset_session=False,
+                    **dict(DB_CONFIG, **DB_REPLICAS[index])
+                )
+        return MySQLDatabase._replica_pools[index]
+
+    def replica_lag(self, index):
+        """Seconds replica index is behind the primary, or None if it is down or not replicating"""
+        checked_at, lag = MySQLDatabase._replica_lag.get(index, (0.0, None))
+        if time.monotonic() - checked_at < DB_REPLICA_CHECK_SECONDS:
+            return lag
+
+        lag = None
+        try:
+            connection = self._replica_pool(index).get_connection()
+            try:
+                cursor = connection.cursor(dictionary=True)
+                try:
+                    cursor.execute("SHOW REPLICA STATUS")
+                except Error:
+                    cursor.execute("SHOW SLAVE STATUS")  # MySQL before 8.0.22
+                status = cursor.fetchone()
+                cursor.close()
+            finally:
+                connection.close()
+            if status is None:
+                # Not configured as a replica: a standalone copy, e.g. for local testing
+                lag = 0.0
+            else:
+                behind = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+                lag = None if behind is None else float(behind)
+        except Error as e:
+            print(f"Replica {DB_REPLICAS[index]['host']} unavailable: {e}")
+        MySQLDatabase._replica_lag[index] = (time.monotonic(), lag)
+        return lag
+
+    def checkout_replica(self):
+        if not DB_REPLICAS:
+            return None
+        # Round-robin over the replicas that are up and within the lag tolerance
+        start = next(MySQLDatabase._replica_turn)
+        for offset in range(len(DB_REPLICAS)):
+            index = (start + offset) % len(DB_REPLICAS)
+            lag = self.replica_lag(index)
+            if lag is None or lag > DB_REPLICA_MAX_LAG_SECONDS:
+                continue
+            try:
+                return self._replica_pool(index).get_connection()
+            except Error as e:
+                print(f"No connection to replica {DB_REPLICAS[index]['host']}: {e}")
+        return None
+
+    def existing_indexes(self):
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            SELECT DISTINCT INDEX_NAME FROM information_schema.statistics
+            WHERE TABLE_SCHEMA = DATABASE()
+        """)
+        names = {row[0] for row in cursor.fetchall()}
+        cursor.close()
+        return names
+
+    def existing_columns(self, table):
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            SELECT COLUMN_NAME FROM information_schema.columns
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (table,))
+        names = {row[0] for row in cursor.fetchall()}
+        cursor.close()
+        return names
+
+    def existing_tables(self):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT TABLE_NAME FROM information_schema.tables WHERE TABLE_SCHEMA = DATABASE()")
+        names = {row[0] for row in cursor.fetchall()}
+        cursor.close()
+        return names
+
+    def create_quote_components(self):
+        # The (component_id, quote_id) index is declared here so that the
+        # foreign key uses it instead of MySQL adding one of its own
+        cursor = self.connection.cursor()
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS quote_components (
+            quote_id INT NOT NULL,
+            component_id INT NOT NULL,
+            PRIMARY KEY (quote_id, component_id),
+            INDEX idx_quote_components_component (component_id, quote_id),
+            FOREIGN KEY (quote_id) REFERENCES quotes(id) ON DELETE CASCADE,
+            FOREIGN KEY (component_id) REFERENCES pricing_components(id)
+        )
+        """)
+        cursor.close()
+
+    def ensure_search_index(self):
+        if 'ft_quotes_search' in self.existing_indexes():
+            return
+        # Building it reads every quote once; later writes keep it current
+        cursor = self.connection.cursor()
+        cursor.execute("CREATE FULLTEXT INDEX ft_quotes_search ON quotes (client_name, client_email, proposal_text)")
+        cursor.close()
+        print("Created full-text index ft_quotes_search on quotes")
+
+    def search_statement(self, words, limit):
+        # Boolean mode: +word requires the word, +word* a word starting with
+        # it. InnoDB skips words shorter than innodb_ft_min_token_size (3)
+        # and its stopwords. Only the last word is a prefix: expanding every
+        # word matches far more index entries for little benefit.
+        terms = " ".join(f"+{word}" for word in words) + "*"
+        sql = """
+            SELECT id, client_name, client_email, total_cost, timeline, status, created_at,
+                   MATCH (client_name, client_email, proposal_text) AGAINST (%s IN BOOLEAN MODE) AS relevance
+            FROM quotes
+            WHERE MATCH (client_name, client_email, proposal_text) AGAINST (%s IN BOOLEAN MODE)
+            ORDER BY relevance DESC, created_at DESC
+            LIMIT %s
+        """
+        return sql, (terms, terms, limit)
+
+    def create_tables(self):
+
+
+        create_team_members = """
+        CREATE TABLE IF NOT EXISTS team_members (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            role VARCHAR(100) NOT NULL,
+            role_type ENUM('Developer', 'Designer') NOT NULL,
+            default_rate DECIMAL(10, 2) NOT NULL,
+            active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+
+        create_quotes = """
+        CREATE TABLE IF NOT EXISTS quotes (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            client_name VARCHAR(100) NOT NULL,
+            client_email VARCHAR(100) NOT NULL,
+            pages INT NOT NULL,
+            complexity VARCHAR(50) NOT NULL,
+            timeline INT NOT NULL,
+            margin_percentage DECIMAL(5, 2),
+            marketing_strategy VARCHAR(100),
+            marketing_cost DECIMAL(10, 2),
+            base_cost DECIMAL(10, 2),
+            total_cost DECIMAL(10, 2) NOT NULL,
+            profit DECIMAL(10, 2),
+            tech_stack JSON,
+            proposal_text TEXT,
+            proposal_compressed MEDIUMBLOB,
+            status VARCHAR(20) DEFAULT 'Pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+
+        create_quote_team_members = """
+        CREATE TABLE IF NOT EXISTS quote_team_members (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            quote_id INT NOT NULL,
+            name VARCHAR(100) NOT NULL,
+            role VARCHAR(100) NOT NULL,
+            rate DECIMAL(10, 2) NOT NULL,
+            FOREIGN KEY (quote_id) REFERENCES quotes(id) ON DELETE CASCADE
+        )
+        """
+
+        # Old quotes moved out of quotes and quote_team_members by archive_quotes;
+        # ids are kept, so delete_quote and the audit log work across both
+        create_quotes_archive = """
+        CREATE TABLE IF NOT EXISTS quotes_archive (
+            id INT PRIMARY KEY,
+            client_name VARCHAR(100) NOT NULL,
+            client_email VARCHAR(100) NOT NULL,
+            pages INT NOT NULL,
+            complexity VARCHAR(50) NOT NULL,
+            timeline INT NOT NULL,
+            margin_percentage DECIMAL(5, 2),
+            marketing_strategy VARCHAR(100),
+            marketing_cost DECIMAL(10, 2),
+            base_cost DECIMAL(10, 2),
+            total_cost DECIMAL(10, 2) NOT NULL,
+            profit DECIMAL(10, 2),
+            tech_stack JSON,
+            proposal_text TEXT,
+            proposal_compressed MEDIUMBLOB,
+            status VARCHAR(20),
+            created_at TIMESTAMP NULL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+
+        create_quote_team_members_archive = """
+        CREATE TABLE IF NOT EXISTS quote_team_members_archive (
+            id INT PRIMARY KEY,
+            quote_id INT NOT NULL,
+            name VARCHAR(100) NOT NULL,
+            role VARCHAR(100) NOT NULL,
+            rate DECIMAL(10, 2) NOT NULL,
+            FOREIGN KEY (quote_id) REFERENCES quotes_archive(id) ON DELETE CASCADE
+        )
+        """
+
+        # Append-only audit log; no foreign key, so a deleted quote keeps its history
+        create_quote_events = """
+        CREATE TABLE IF NOT EXISTS quote_events (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            quote_id INT NOT NULL,
+            event VARCHAR(20) NOT NULL,
+            old_value VARCHAR(100),
+            new_value VARCHAR(100),
+            username VARCHAR(50),
+            created_at DATETIME NOT NULL
+        )
+        """
+
+        create_pricing_categories = """
+        CREATE TABLE IF NOT EXISTS pricing_categories (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,  -- 'Technology Stack', 'Pricing Strategy', 'Complexity'
+        description TEXT,
+        active BOOLEAN DEFAULT TRUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+
+        create_pricing_components = """
+        CREATE TABLE IF NOT EXISTS pricing_components (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        category_id INT NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        base_price DECIMAL(10, 2) NOT NULL,
+        multiplier DECIMAL(5, 2) DEFAULT 1.0,
+        description TEXT,
+        active BOOLEAN DEFAULT TRUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        FOREIGN KEY (category_id) REFERENCES pricing_categories(id)
+        )
+        """
+
+        create_monthly_financials = """
+        CREATE TABLE IF NOT EXISTS monthly_financials (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        month DATE NOT NULL,  -- Store as YYYY-MM-01 for consistent monthly tracking
+        revenue DECIMAL(10, 2) NOT NULL DEFAULT 0,
+        expenses DECIMAL(10, 2) NOT NULL DEFAULT 0,
+        overhead_costs DECIMAL(10, 2) NOT NULL DEFAULT 0,  -- Fixed monthly costs
+        profit_loss DECIMAL(10, 2) GENERATED ALWAYS AS (revenue - expenses - overhead_costs) STORED,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        );
+        """
+
+        create_fixed_costs= """
+        CREATE TABLE IF NOT EXISTS fixed_costs (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        amount DECIMAL(10, 2) NOT NULL,
+        frequency ENUM('Monthly', 'Quarterly', 'Annually') NOT NULL,
+        description TEXT,
+        active BOOLEAN DEFAULT TRUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        );
+        """
+
+        create_monthly_revenue = """
+        CREATE TABLE IF NOT EXISTS monthly_revenue (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        month VARCHAR(9) NOT NULL,
+        revenue DECIMAL(10, 2) NOT NULL,
+        profit_margin_percentage DECIMAL(5, 2) NOT NULL DEFAULT 50,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(create_team_members)
+        cursor.execute(create_quotes)
+        cursor.execute(create_quote_team_members)
+        cursor.execute(create_quote_events)
+        cursor.execute(create_quotes_archive)
+        cursor.execute(create_quote_team_members_archive)
+        cursor.execute(create_pricing_categories)
+        cursor.execute(create_pricing_components)
+        cursor.execute(create_monthly_financials)
+        cursor.execute(create_fixed_costs)
+        cursor.execute(create_monthly_revenue)
+        self.connection.commit()
+        cursor.close()
+
+
+class SQLiteDatabase(BaseDatabase):
+    """Embedded single-file backend for dev boxes, CI and single-node installs"""
+    dialect = 'sqlite'
+    ADDED_COLUMNS = [('quotes', 'proposal_compressed', 'BLOB')]
+    month_expression = "strftime('%Y-%m', created_at)"
+    quote_end_expression = "datetime(q.created_at, '+' || (q.timeline * 7) || ' days')"
+    # At most DB_POOL_SIZE readers are out at once, so this never grows past it
+    _idle_connections = queue.LifoQueue()
+
+    def open_connection(self):
+        return db_sqlite.connect(SQLITE_CONFIG['path'])
+
+    def checkout_connection(self):
+        try:
+            return SQLiteDatabase._idle_connections.get_nowait()
+        except queue.Empty:
+            return db_sqlite.connect(SQLITE_CONFIG['path'])
+
+    def release_connection(self, connection):
+        SQLiteDatabase._idle_connections.put(connection)
+
+    def existing_indexes(self):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        names = {row[0] for row in cursor.fetchall()}
+        cursor.close()
+        return names
+
+    def existing_columns(self, table):
+        cursor = self.connection.cursor()
+        cursor.execute(f"PRAGMA table_info({table})")
+        names = {row[1] for row in cursor.fetchall()}
+        cursor.close()
+        return names
+
+    def existing_tables(self):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        names = {row[0] for row in cursor.fetchall()}
+        cursor.close()
+        return names
+
+    def create_quote_components(self):
+        self.connection.executescript("""
+        CREATE TABLE IF NOT EXISTS quote_components (
+            quote_id INT NOT NULL REFERENCES quotes(id) ON DELETE CASCADE,
+            component_id INT NOT NULL REFERENCES pricing_components(id),
+            PRIMARY KEY (quote_id, component_id)
+        ) WITHOUT ROWID;
+        """)
+
+    def ensure_search_index(self):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'quotes_fts'")
+        exists = cursor.fetchone() is not None
+        cursor.close()
+        if exists:
+            return
+
+        # An FTS5 index over the quotes table's own rows, kept in step by triggers
+        self.connection.executescript("""
+        CREATE VIRTUAL TABLE quotes_fts USING fts5(
+            client_name, client_email, proposal_text,
+            content='quotes', content_rowid='id'
+        );
+        CREATE TRIGGER IF NOT EXISTS quotes_fts_insert AFTER INSERT ON quotes BEGIN
+            INSERT INTO quotes_fts (rowid, client_name, client_email, proposal_text)
+            VALUES (NEW.id, NEW.client_name, NEW.client_email, NEW.proposal_text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS quotes_fts_delete AFTER DELETE ON quotes BEGIN
+            INSERT INTO quotes_fts (quotes_fts, rowid, client_name, client_email, proposal_text)
+            VALUES ('delete', OLD.id, OLD.client_name, OLD.client_email, OLD.proposal_text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS quotes_fts_update
+        AFTER UPDATE OF client_name, client_email, proposal_text ON quotes BEGIN
+            INSERT INTO quotes_fts (quotes_fts, rowid, client_name, client_email, proposal_text)
+            VALUES ('delete', OLD.id, OLD.client_name, OLD.client_email, OLD.proposal_text);
+            INSERT INTO quotes_fts (rowid, client_name, client_email, proposal_text)
+            VALUES (NEW.id, NEW.client_name, NEW.client_email, NEW.proposal_text);
+        END;
+        INSERT INTO quotes_fts (quotes_fts) VALUES ('rebuild');
+        """)
+        print("Created full-text index quotes_fts on quotes")
+
+    def search_statement(self, words, limit):
+        # FTS5 ANDs the terms and "word"* is a prefix match, used for the
+        # last word only as in MySQL. bm25() is lower for better matches, so
+        # it is negated to rank like MySQL's relevance.
+        terms = " ".join(f'"{word}"' for word in words) + "*"
+        sql = """
+            SELECT q.id, q.client_name, q.client_email, q.total_cost, q.timeline, q.status, q.created_at,
+                   -bm25(quotes_fts) AS relevance
+            FROM quotes_fts
+            JOIN quotes q ON q.id = quotes_fts.rowid
+            WHERE quotes_fts MATCH %s
+            ORDER BY bm25(quotes_fts), q.created_at DESC
+            LIMIT %s
+        """
+        return sql, (terms, limit)
+
+    def create_tables(self):
+        # Same tables and columns as MySQLDatabase.create_tables. ENUMs become
+        # CHECK constraints and ON UPDATE CURRENT_TIMESTAMP becomes a trigger.
+        self.connection.executescript("""
+        CREATE TABLE IF NOT EXISTS team_members (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR(100) NOT NULL,
+            role VARCHAR(100) NOT NULL,
+            role_type VARCHAR(20) NOT NULL CHECK (role_type IN ('Developer', 'Designer')),
+            default_rate DECIMAL(10, 2) NOT NULL,
+            active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+        );
+
+        CREATE TABLE IF NOT EXISTS quotes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_name VARCHAR(100) NOT NULL,
+            client_email VARCHAR(100) NOT NULL,
+            pages INT NOT NULL,
+            complexity VARCHAR(50) NOT NULL,
+            timeline INT NOT NULL,
+            margin_percentage DECIMAL(5, 2),
+            marketing_strategy VARCHAR(100),
+            marketing_cost DECIMAL(10, 2),
+            base_cost DECIMAL(10, 2),
+            total_cost DECIMAL(10, 2) NOT NULL,
+            profit DECIMAL(10, 2),
+            tech_stack JSON,
+            proposal_text TEXT,
+            proposal_compressed BLOB,
+            status VARCHAR(20) DEFAULT 'Pending',
+            created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+        );
+
+        CREATE TABLE IF NOT EXISTS quote_team_members (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            quote_id INT NOT NULL REFERENCES quotes(id) ON DELETE CASCADE,
+            name VARCHAR(100) NOT NULL,
+            role VARCHAR(100) NOT NULL,
+            rate DECIMAL(10, 2) NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS quote_team_members_quote_id ON quote_team_members (quote_id);
+
+        CREATE TABLE IF NOT EXISTS quotes_archive (
+            id INTEGER PRIMARY KEY,
+            client_name VARCHAR(100) NOT NULL,
+            client_email VARCHAR(100) NOT NULL,
+            pages INT NOT NULL,
+            complexity VARCHAR(50) NOT NULL,
+            timeline INT NOT NULL,
+            margin_percentage DECIMAL(5, 2),
+            marketing_strategy VARCHAR(100),
+            marketing_cost DECIMAL(10, 2),
+            base_cost DECIMAL(10, 2),
+            total_cost DECIMAL(10, 2) NOT NULL,
+            profit DECIMAL(10, 2),
+            tech_stack JSON,
+            proposal_text TEXT,
+            proposal_compressed BLOB,
+            status VARCHAR(20),
+            created_at TIMESTAMP,
+            archived_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+        );
+
+        CREATE TABLE IF NOT EXISTS quote_team_members_archive (
+            id INTEGER PRIMARY KEY,
+            quote_id INT NOT NULL REFERENCES quotes_archive(id) ON DELETE CASCADE,
+            name VARCHAR(100) NOT NULL,
+            role VARCHAR(100) NOT NULL,
+            rate DECIMAL(10, 2) NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS quote_team_members_archive_quote_id ON quote_team_members_archive (quote_id);
+
+        CREATE TABLE IF NOT EXISTS quote_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            quote_id INT NOT NULL,
+            event VARCHAR(20) NOT NULL,
+            old_value VARCHAR(100),
+            new_value VARCHAR(100),
+            username VARCHAR(50),
+            created_at TIMESTAMP NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS pricing_categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR(100) NOT NULL,
+            description TEXT,
+            active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+        );
+
+        CREATE TABLE IF NOT EXISTS pricing_components (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category_id INT NOT NULL REFERENCES pricing_categories(id),
+            name VARCHAR(100) NOT NULL,
+            base_price DECIMAL(10, 2) NOT NULL,
+            multiplier DECIMAL(5, 2) DEFAULT 1.0,
+            description TEXT,
+            active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+            updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+        );
+
+        CREATE TABLE IF NOT EXISTS monthly_financials (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            month DATE NOT NULL,
+            revenue DECIMAL(10, 2) NOT NULL DEFAULT 0,
+            expenses DECIMAL(10, 2) NOT NULL DEFAULT 0,
+            overhead_costs DECIMAL(10, 2) NOT NULL DEFAULT 0,
+            profit_loss DECIMAL(10, 2) GENERATED ALWAYS AS (revenue - expenses - overhead_costs) STORED,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+            updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+        );
+
+        CREATE TABLE IF NOT EXISTS fixed_costs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR(100) NOT NULL,
+            amount DECIMAL(10, 2) NOT NULL,
+            frequency VARCHAR(10) NOT NULL CHECK (frequency IN ('Monthly', 'Quarterly', 'Annually')),
+            description TEXT,
+            active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+            updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+        );
+
+        CREATE TABLE IF NOT EXISTS monthly_revenue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            month VARCHAR(9) NOT NULL,
+            revenue DECIMAL(10, 2) NOT NULL,
+            profit_margin_percentage DECIMAL(5, 2) NOT NULL DEFAULT 50,
+            created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+        );
+        """)
+
+        for table in ['pricing_components', 'monthly_financials', 'fixed_costs']:
+            self.connection.executescript(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_updated_at
+            AFTER UPDATE ON {table} FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+            BEGIN
+                UPDATE {table} SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+            END;
+            """)
+
+
+# The backend is chosen once in config.py; everything else uses Database()
+Database = SQLiteDatabase if DB_BACKEND == 'sqlite' else MySQLDatabase
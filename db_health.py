@@ -0,0 +1,98 @@
+import random
+import threading
+import time
+
+from mysql.connector import Error
+
+from config import DB_CONNECT_RETRIES, DB_RETRY_BASE_SECONDS, DB_RETRY_MAX_SECONDS
+from config import DB_BREAKER_THRESHOLD, DB_BREAKER_RESET_SECONDS
+
+
+class DatabaseUnavailable(Error):
+    """Raised instead of connecting while the database is known to be down.
+
+    A mysql.connector Error, so the existing `except Error` handlers in the
+    Database methods treat it like any other database failure.
+    """
+
+
+class CircuitBreaker:
+    """Stops every session from hammering a database that is down.
+
+    After `threshold` consecutive failed connects the breaker opens and
+    connects fail immediately for `reset_seconds`. Then one caller is let
+    through as a trial: success closes the breaker, failure re-opens it.
+    """
+
+    def __init__(self, threshold, reset_seconds):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_seconds:
+            return "open"
+        return "half-open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+# One per process: all sessions share what they learn about the primary
+breaker = CircuitBreaker(DB_BREAKER_THRESHOLD, DB_BREAKER_RESET_SECONDS)
+
+
+def backoff_delays(retries=DB_CONNECT_RETRIES, base=DB_RETRY_BASE_SECONDS, cap=DB_RETRY_MAX_SECONDS):
+    """Full-jitter exponential backoff: sessions that failed together retry apart"""
+    for attempt in range(retries):
+        yield random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def connect_with_retry(open_connection, name="database"):
+    """Call open_connection() until it succeeds, backing off between attempts.
+
+    Raises DatabaseUnavailable when the breaker is open or every attempt
+    failed.
+    """
+    delays = backoff_delays()
+    while True:
+        if not breaker.allow():
+            raise DatabaseUnavailable(msg=f"{name} is unavailable after repeated failures; try again shortly")
+        try:
+            connection = open_connection()
+        except Error as e:
+            breaker.record_failure()
+            delay = next(delays, None)
+            if delay is None:
+                raise DatabaseUnavailable(msg=f"Could not connect to {name}: {e}") from e
+            print(f"Error connecting to {name}: {e}; retrying in {delay:.2f}s")
+            time.sleep(delay)
+        else:
+            breaker.record_success()
+            return connection
@@ -0,0 +1,153 @@
+import datetime
+import decimal
+import sqlite3
+
+from mysql.connector import errors
+
+# The shared queries in db.py are written for mysql.connector: %s
+# placeholders, cursor(dictionary=True), Decimal money columns and
+# mysql.connector.Error on failure. The classes here give a sqlite3
+# connection that same surface so every Database method runs unchanged.
+
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",      # readers don't block the writer
+    "PRAGMA synchronous = NORMAL",    # safe with WAL, one fsync per checkpoint
+    "PRAGMA foreign_keys = ON",       # ON DELETE CASCADE for quote_team_members
+    "PRAGMA busy_timeout = 5000",     # wait for a concurrent writer instead of failing
+    "PRAGMA cache_size = -65536",     # 64 MB page cache
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",   # 256 MB memory-mapped reads
+]
+
+
+def _parse_datetime(raw):
+    return datetime.datetime.fromisoformat(raw.decode())
+
+
+def _parse_date(raw):
+    return datetime.date.fromisoformat(raw.decode()[:10])
+
+
+sqlite3.register_adapter(decimal.Decimal, float)
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+sqlite3.register_converter("DECIMAL", lambda raw: decimal.Decimal(raw.decode()))
+sqlite3.register_converter("BOOLEAN", lambda raw: raw not in (b"0", b""))
+sqlite3.register_converter("TIMESTAMP", _parse_datetime)
+sqlite3.register_converter("DATETIME", _parse_datetime)
+sqlite3.register_converter("DATE", _parse_date)
+
+
+def translate(sql):
+    """Rewrite mysql.connector placeholders for sqlite3.
+
+    Only %s is a placeholder; like mysql.connector, a literal % is passed
+    through as is, so SQL written for one backend means the same on both.
+    """
+    return sql.replace("%s", "?")
+
+
+def _raise_as_mysql_error(e):
+    if isinstance(e, sqlite3.IntegrityError):
+        raise errors.IntegrityError(msg=str(e)) from e
+    if isinstance(e, sqlite3.OperationalError):
+        raise errors.OperationalError(msg=str(e)) from e
+    raise errors.DatabaseError(msg=str(e)) from e
+
+
+class SQLiteCursor:
+    def __init__(self, connection, dictionary=False):
+        self._cursor = connection.cursor()
+        self.dictionary = dictionary
+
+    def execute(self, sql, params=()):
+        try:
+            self._cursor.execute(translate(sql), tuple(params or ()))
+        except sqlite3.Error as e:
+            _raise_as_mysql_error(e)
+
+    def executemany(self, sql, seq_params):
+        try:
+            self._cursor.executemany(translate(sql), [tuple(p) for p in seq_params])
+        except sqlite3.Error as e:
+            _raise_as_mysql_error(e)
+
+    def _row(self, row):
+        if row is None or not self.dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def __iter__(self):
+        return (self._row(row) for row in self._cursor)
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        # rowcount/lastrowid stay readable after close, as with mysql.connector
+        pass
+
+
+class SQLiteConnection:
+    def __init__(self, path):
+        self.path = path
+        # Streamlit runs each rerun of a session on a new thread, so the
+        # connection can't be pinned to the thread that opened it.
+        self._conn = sqlite3.connect(
+            path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+        )
+        for pragma in PRAGMAS:
+            self._conn.execute(pragma)
+
+    def cursor(self, dictionary=False, **kwargs):
+        # buffered/prepared are mysql.connector options; sqlite3 keeps its
+        # own statement cache and always buffers, so they are accepted as-is
+        return SQLiteCursor(self._conn, dictionary=dictionary)
+
+    def executescript(self, script):
+        try:
+            self._conn.executescript(script)
+        except sqlite3.Error as e:
+            _raise_as_mysql_error(e)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def is_connected(self):
+        return True
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        pass
+
+    def close(self):
+        self._conn.close()
+
+
+def connect(path):
+    try:
+        return SQLiteConnection(path)
+    except sqlite3.Error as e:
+        _raise_as_mysql_error(e)
@@ -0,0 +1,124 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from config import METRICS_PORT, METRICS_TEXTFILE, METRICS_TEXTFILE_SECONDS
+
+# Prometheus metrics for the expensive non-SQL steps. Nothing is collected,
+# and prometheus_client is never imported, unless METRICS_PORT or
+# METRICS_TEXTFILE is set; every helper below is then a no-op.
+ENABLED = bool(METRICS_PORT or METRICS_TEXTFILE)
+
+# name: (type, help, options). Names are exported with a "pm_" prefix.
+DEFINITIONS = {
+    "calculate_quote_seconds": ("histogram", "Time to price a quote", {
+        "buckets": (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+    }),
+    "proposal_seconds": ("histogram", "Time for OpenAI to write a proposal", {
+        "buckets": (0.5, 1, 2, 5, 10, 20, 30, 60, 120),
+    }),
+    "proposal_failures_total": ("counter", "Proposal requests that raised", {}),
+    "proposal_fallbacks_total": ("counter", "Proposals rendered from the template after OpenAI was too slow or failed", {}),
+    "proposal_tokens_total": ("counter", "OpenAI tokens used for proposals", {
+        "labelnames": ["kind"],
+    }),
+    "pdf_render_seconds": ("histogram", "Time to build and render a quote PDF", {
+        "buckets": (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+    }),
+    "pdf_size_bytes": ("histogram", "Size of rendered quote PDFs", {
+        "buckets": (5e3, 1e4, 2.5e4, 5e4, 1e5, 2.5e5, 5e5, 1e6),
+    }),
+    "email_send_seconds": ("histogram", "Time to send a quote email over SMTP", {
+        "buckets": (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    }),
+    "email_failures_total": ("counter", "Quote emails that failed to send", {}),
+}
+
+registry = None
+_metrics = {}
+
+
+def _active_sessions():
+    # Streamlit has no public session count; if the private session manager
+    # changes in another version, report 0 rather than fail every scrape
+    try:
+        from streamlit import runtime
+        if not runtime.exists():
+            return 0
+        return runtime.get_instance()._session_mgr.num_active_sessions()
+    except Exception:
+        return 0
+
+
+def _write_textfile_forever(write_to_textfile):
+    while True:
+        try:
+            write_to_textfile(METRICS_TEXTFILE, registry)
+        except OSError as e:
+            print(f"Error writing metrics to {METRICS_TEXTFILE}: {e}")
+        time.sleep(METRICS_TEXTFILE_SECONDS)
+
+
+def _setup():
+    global registry
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+    from prometheus_client import start_http_server, write_to_textfile
+
+    registry = CollectorRegistry()
+    types = {"histogram": Histogram, "counter": Counter}
+    for name, (kind, documentation, options) in DEFINITIONS.items():
+        # Counter names get their _total suffix from the client
+        metric_name = "pm_" + (name[:-len("_total")] if kind == "counter" else name)
+        _metrics[name] = types[kind](metric_name, documentation, registry=registry, **options)
+
+    sessions = Gauge("pm_active_sessions", "Browser sessions connected to this server", registry=registry)
+    sessions.set_function(_active_sessions)
+
+    if METRICS_PORT:
+        try:
+            start_http_server(METRICS_PORT, registry=registry)
+        except OSError as e:
+            # Another server process on this host already owns the port
+            print(f"Metrics not served on port {METRICS_PORT}: {e}")
+    if METRICS_TEXTFILE:
+        threading.Thread(
+            target=_write_textfile_forever,
+            args=(write_to_textfile,),
+            name="metrics-textfile",
+            daemon=True,
+        ).start()
+
+
+if ENABLED:
+    _setup()
+
+
+def observe(name, value, **labels):
+    if not ENABLED:
+        return
+    metric = _metrics[name]
+    (metric.labels(**labels) if labels else metric).observe(value)
+
+
+def inc(name, amount=1, **labels):
+    if not ENABLED:
+        return
+    metric = _metrics[name]
+    (metric.labels(**labels) if labels else metric).inc(amount)
+
+
+@contextmanager
+def timed(name, failures=None):
+    """Observe the block's duration in histogram name; count exceptions in failures"""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        if failures:
+            inc(failures)
+        raise
+    finally:
+        observe(name, time.perf_counter() - start)
@@ -0,0 +1,219 @@
+import heapq
+import itertools
+import math
+import time
+from datetime import datetime, timedelta
+
+from pricing import apply_psychological_pricing
+
+# Reverse quote pricing: given the total a client wants to spend, find the
+# teams and tech stacks whose calculate_quote total comes closest to it.
+#
+# The total is monotonic in the base cost (team rates x timeline + tech
+# stack + complexity), so the budget turns into a base-cost target and the
+# search is a bounded subset-sum over the roster and catalogue. Members with
+# the same role type and rate, and technologies with the same price, are
+# interchangeable for the sum and are searched as one item with a count.
+
+
+def load_price_list(db):
+    """Everything calculate_quote looks up, read once for any number of searches"""
+    members, components = db.gather(
+        lambda reader: reader.get_team_members(),
+        lambda reader: reader.get_pricing_components(),
+    )
+    last_month = (datetime.now() - timedelta(days=30)).strftime("%B %Y")
+    previous_margin = db.get_previous_month_revenue(last_month)
+
+    prices = {}
+    for component in components:
+        # get_component_price takes the first active match, so keep the first
+        prices.setdefault(component["category_name"], {}).setdefault(
+            component["name"], float(component["base_price"]) * float(component["multiplier"]))
+    multipliers = {
+        component["name"]: float(component["multiplier"])
+        for component in reversed(components) if component["category_name"] == "Pricing Strategy"
+    }
+    return {
+        "members": sorted(members, key=lambda member: member["name"]),
+        "tech": prices.get("Technology Stack", {}),
+        "complexity": prices.get("Complexity", {}),
+        "strategy_multipliers": multipliers,
+        "margin": float(previous_margin) if previous_margin else 50.0,
+    }
+
+
+def quote_total(price_list, base_cost, marketing_strategy):
+    """calculate_quote's total for a base cost, without the lookups"""
+    total = base_cost * (1 + price_list["margin"] / 100)
+    if marketing_strategy == "Psychological Pricing":
+        return apply_psychological_pricing(total)
+    return total * price_list["strategy_multipliers"].get(marketing_strategy, 1.0)
+
+
+def _base_cost_target(price_list, target_total, marketing_strategy):
+    scale = 1 + price_list["margin"] / 100
+    if marketing_strategy != "Psychological Pricing":
+        scale *= price_list["strategy_multipliers"].get(marketing_strategy, 1.0)
+    return target_total / scale
+
+
+def _grouped_items(group, candidates, cost):
+    """(group, unit cost, candidates) per distinct cost, most expensive first"""
+    by_cost = {}
+    for candidate in candidates:
+        by_cost.setdefault(round(cost(candidate), 2), []).append(candidate)
+    return [(group, unit, by_cost[unit]) for unit in sorted(by_cost, reverse=True)]
+
+
+def optimize(price_list, target_total, timeline, complexity, marketing_strategy,
+             developers=(1, 3), designers=(0, 2), extra_techs=(0, 3),
+             required_techs=(), tech_options=None, top_n=5, time_limit=2.0):
+    """The top_n team and tech-stack configurations priced closest to target_total.
+
+    developers, designers and extra_techs are (min, max) counts. Every
+    configuration includes required_techs; extra technologies come from
+    tech_options (default: the whole Technology Stack catalogue).
+
+    Depth-first branch and bound: a branch is cut when even its cheapest or
+    dearest completion cannot beat the top_n-th best distance found so far.
+    The search stops after time_limit seconds with the best found.
+
+    Returns {"configurations": [...], "complete": bool, "nodes": int}; each
+    configuration has team (roster rows), tech_stack, base_cost, total_cost,
+    profit and difference (total_cost - target_total), closest first.
+    """
+    required_techs = list(dict.fromkeys(required_techs))
+    if tech_options is None:
+        tech_options = list(price_list["tech"])
+    extra_options = [name for name in dict.fromkeys(tech_options)
+                     if name in price_list["tech"] and name not in required_techs]
+
+    fixed_cost = price_list["complexity"].get(complexity, 0.0)
+    fixed_cost += sum(price_list["tech"].get(name, 0.0) for name in required_techs)
+    target = _base_cost_target(price_list, target_total, marketing_strategy) - fixed_cost
+
+    limits = [developers, designers, extra_techs]
+    items = (
+        _grouped_items(0, [m for m in price_list["members"] if m["role_type"] == "Developer"],
+                       lambda member: float(member["default_rate"]) * timeline)
+        + _grouped_items(1, [m for m in price_list["members"] if m["role_type"] == "Designer"],
+                         lambda member: float(member["default_rate"]) * timeline)
+        + _grouped_items(2, extra_options, lambda name: price_list["tech"][name])
+    )
+
+    # Unit costs of each group, expanded by count and most expensive first,
+    # with prefix sums: the dearest k units still available from item i on
+    # are units[offset[i]:offset[i] + k], the cheapest k are the last k.
+    units = {group: [] for group in range(len(limits))}
+    offsets = []
+    for group, unit, candidates in items:
+        offsets.append(len(units[group]))
+        units[group].extend([unit] * len(candidates))
+    prefix = {group: list(itertools.accumulate(costs, initial=0)) for group, costs in units.items()}
+
+    def dearest(group, start, count):
+        return prefix[group][start + count] - prefix[group][start]
+
+    def cheapest(group, count):
+        return prefix[group][-1] - prefix[group][-1 - count]
+
+    # Each group's (min, max) sum when none of its items has been decided
+    whole_group = [
+        (cheapest(group, low), dearest(group, 0, min(high, len(units[group]))))
+        if low <= len(units[group]) else None
+        for group, (low, high) in enumerate(limits)
+    ]
+    if None in whole_group:
+        return {"configurations": [], "complete": True, "nodes": 0}
+
+    # Every sum is a multiple of the costs' greatest common divisor, so no
+    # configuration gets closer than the nearest multiple; once the top_n
+    # are that close the search is done.
+    step = math.gcd(*(round(unit * 100) for _, unit, _ in items)) / 100 if items else 0
+    floor = abs(target - step * round(target / step)) if step else 0.0
+
+    def add_range(index, counts):
+        """(min, max) cost the undecided items can still add, or None if infeasible"""
+        low_add = high_add = 0.0
+        current = items[index][0] if index < len(items) else len(limits)
+        for group in range(len(limits)):
+            low, high = limits[group]
+            if group < current:
+                if counts[group] < low:
+                    return None
+            elif group == current:
+                start = offsets[index]
+                available = len(units[group]) - start
+                need, room = max(low - counts[group], 0), min(high - counts[group], available)
+                if need > available:
+                    return None
+                low_add += cheapest(group, need)
+                high_add += dearest(group, start, room)
+            else:
+                low_add += whole_group[group][0]
+                high_add += whole_group[group][1]
+        return low_add, high_add
+
+    best = []  # max-heap on distance: (-distance, tiebreak, choices)
+    tiebreak = itertools.count()
+    deadline = time.monotonic() + time_limit
+    nodes, complete = 0, True
+
+    # Iterative DFS; choices is a linked list of (item index, count, parent)
+    stack = [(0, 0.0, (0,) * len(limits), None)]
+    while stack:
+        nodes += 1
+        if nodes % 4096 == 0 and time.monotonic() > deadline:
+            complete = False
+            break
+        index, total, counts, choices = stack.pop()
+        reach = add_range(index, counts)
+        if reach is None:
+            continue
+        low, high = total + reach[0], total + reach[1]
+        bound = low - target if target < low else target - high if target > high else floor
+        if len(best) == top_n and bound >= -best[0][0]:
+            if -best[0][0] <= floor + 0.005:
+                break
+            continue
+        if index == len(items):
+            entry = (-abs(total - target), next(tiebreak), choices)
+            if len(best) < top_n:
+                heapq.heappush(best, entry)
+            else:
+                heapq.heapreplace(best, entry)
+            continue
+
+        group, unit, candidates = items[index]
+        most = min(len(candidates), limits[group][1] - counts[group])
+        for count in range(most + 1):
+            # Pushed cheapest first so the most expensive choice is tried first
+            child_counts = counts[:group] + (counts[group] + count,) + counts[group + 1:]
+            stack.append((index + 1, total + unit * count, child_counts,
+                          (index, count, choices) if count else choices))
+
+    configurations = []
+    for _, _, choices in best:
+        team, tech_stack = [], list(required_techs)
+        while choices is not None:
+            index, count, choices = choices
+            group, _, candidates = items[index]
+            (tech_stack if group == 2 else team).extend(candidates[:count])
+        team.sort(key=lambda member: (member["role_type"], member["name"]))
+        base_cost = (
+            sum(float(member["default_rate"]) * float(timeline) for member in team)
+            + sum(price_list["tech"][name] for name in tech_stack)
+            + price_list["complexity"].get(complexity, 0.0)
+        )
+        total_cost = quote_total(price_list, base_cost, marketing_strategy)
+        configurations.append({
+            "team": team,
+            "tech_stack": tech_stack,
+            "base_cost": base_cost,
+            "total_cost": total_cost,
+            "profit": total_cost - base_cost,
+            "difference": total_cost - target_total,
+        })
+    configurations.sort(key=lambda configuration: abs(configuration["difference"]))
+    return {"configurations": configurations, "complete": complete, "nodes": nodes}
@@ -0,0 +1,110 @@
+import streamlit as st
+from auth import get_db, shows_outage
+from query_stats import counts_rerun
+import optimizer
+
+COMPLEXITIES = ["Website", "Project", "Product"]
+TIME_LIMIT_SECONDS = 2.0
+
+
+# The roster and catalogue are the same for every user and every search
+@st.cache_data(ttl=60, show_spinner=False)
+def load_price_list(_db):
+    return optimizer.load_price_list(_db)
+
+
+def use_configuration(configuration, inputs):
+    """Fill the quote form on the main page with this configuration"""
+    st.session_state.team_selections = [
+        {"name": member["name"], "role": member["role"], "role_type": member["role_type"]}
+        for member in configuration["team"]
+    ]
+    # The form's team selectboxes are re-synced from team_selections
+    for key in [key for key in st.session_state if str(key).startswith("team_selection_")]:
+        del st.session_state[key]
+    st.session_state.tech_stack = configuration["tech_stack"]
+    st.session_state.timeline = inputs["timeline"]
+    st.session_state.complexity = inputs["complexity"]
+    st.session_state.selected_strategy = inputs["marketing_strategy"]
+    st.switch_page("app.py")
+
+
+def show_configuration(number, configuration, inputs):
+    difference = configuration["difference"]
+    label = f"Option {number}: ${configuration['total_cost']:,.2f} ({'+' if difference >= 0 else '-'}${abs(difference):,.2f})"
+    with st.expander(label, expanded=number == 1):
+        import pandas as pd
+
+        st.table(pd.DataFrame([{
+            "Name": member["name"],
+            "Role": member["role"],
+            "Type": member["role_type"],
+            "Weekly Rate": f"${float(member['default_rate']):,.2f}",
+        } for member in configuration["team"]]))
+        st.write("Technology Stack:", ", ".join(configuration["tech_stack"]) or "None")
+        col1, col2 = st.columns(2)
+        col1.write(f"Base Cost: ${configuration['base_cost']:,.2f}")
+        col2.write(f"Profit: ${configuration['profit']:,.2f}")
+        if st.button("Use in Quote Form", key=f"use_configuration_{number}"):
+            use_configuration(configuration, inputs)
+
+
+@counts_rerun("budget_optimizer")
+@shows_outage
+def view_budget_optimizer():
+    st.title("Budget Optimizer")
+    st.caption("Find the teams and tech stacks whose quote comes closest to a client's budget.")
+
+    db = get_db()
+    price_list = load_price_list(db)
+    strategies = list(price_list["strategy_multipliers"]) or ["Psychological Pricing"]
+    tech_names = sorted(price_list["tech"])
+
+    # A form, so adjusting the inputs doesn't rerun the page until a search
+    with st.form("budget_optimizer"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            target_total = st.number_input("Client Budget ($)", min_value=0.0, value=50000.0, step=1000.0)
+            timeline = st.number_input("Project Timeline (weeks)", min_value=1, value=8)
+        with col2:
+            complexity = st.selectbox("Project Complexity", COMPLEXITIES)
+            marketing_strategy = st.selectbox("Marketing Strategy", strategies)
+        with col3:
+            top_n = st.number_input("Options to show", min_value=1, max_value=20, value=5)
+
+        required_techs = st.multiselect("Required technologies", tech_names)
+        tech_options = st.multiselect("Optional technologies (empty: any)", tech_names)
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            developers = st.slider("Developers", 0, 10, (1, 3))
+        with col2:
+            designers = st.slider("Designers", 0, 10, (0, 2))
+        with col3:
+            extra_techs = st.slider("Optional technologies to add", 0, 10, (0, 2))
+
+        submitted = st.form_submit_button("Find Configurations")
+
+    if submitted:
+        inputs = {"timeline": timeline, "complexity": complexity, "marketing_strategy": marketing_strategy}
+        result = optimizer.optimize(
+            price_list, target_total, timeline, complexity, marketing_strategy,
+            developers=developers, designers=designers, extra_techs=extra_techs,
+            required_techs=required_techs, tech_options=tech_options or None,
+            top_n=top_n, time_limit=TIME_LIMIT_SECONDS,
+        )
+        st.session_state.optimizer_result = (inputs, result)
+
+    if "optimizer_result" not in st.session_state:
+        return
+    inputs, result = st.session_state.optimizer_result
+    if not result["configurations"]:
+        st.warning("No team fits these limits. Allow more developers, designers or technologies.")
+        return
+    if not result["complete"]:
+        st.info(f"Stopped after {TIME_LIMIT_SECONDS:g}s; these are the closest options found so far.")
+    for number, configuration in enumerate(result["configurations"], start=1):
+        show_configuration(number, configuration, inputs)
+
+if __name__ == "__main__":
+    view_budget_optimizer()
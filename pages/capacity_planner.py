@@ -0,0 +1,94 @@
+import streamlit as st
+from datetime import date, datetime, time, timedelta
+from auth import get_db, shows_outage
+from query_stats import counts_rerun
+import capacity
+
+
+# The same for every user, so shared across sessions; a status change shows
+# up within a minute
+@st.cache_data(ttl=60, show_spinner=False)
+def load_allocations(_db, first_week, weeks):
+    start = datetime.combine(first_week, time())
+    return _db.get_team_allocations(capacity.BOOKED_STATUSES, start, start + timedelta(weeks=weeks))
+
+
+def show_heatmap(loads, week_labels, capacity_limit):
+    # plotly is only needed once there is something to draw
+    import plotly.graph_objects as go
+
+    # Busiest people first
+    names = sorted(loads, key=lambda name: (-max(loads[name]), -sum(loads[name]), name))
+    fig = go.Figure(go.Heatmap(
+        z=[loads[name] for name in names],
+        x=week_labels,
+        y=names,
+        zmin=0,
+        zmax=max(capacity_limit + 1, max(max(row) for row in loads.values())),
+        colorscale=[[0, "#f7fbff"], [0.5, "#6baed6"], [1, "#cb181d"]],
+        colorbar=dict(title="Projects"),
+        hovertemplate="%{y}<br>Week of %{x}: %{z} projects<extra></extra>",
+    ))
+    fig.update_layout(
+        height=max(300, 22 * len(names) + 120),
+        yaxis=dict(autorange="reversed"),
+        margin=dict(l=10, r=10, t=30, b=10),
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@counts_rerun("capacity_planner")
+@shows_outage
+def view_capacity_planner():
+    st.title("Team Capacity")
+    st.caption(
+        "Approved and in-progress quotes, each taking its team from the week it was "
+        "created for its timeline."
+    )
+
+    db = get_db()
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        first_week = capacity.week_start(st.date_input("From week", value=date.today()))
+    with col2:
+        weeks = st.slider("Weeks", min_value=4, max_value=52, value=12)
+    with col3:
+        capacity_limit = st.number_input("Projects per person", min_value=1, value=1)
+    overbooked_only = st.checkbox("Only show overbooked people")
+
+    allocations = load_allocations(db, first_week, weeks)
+    loads, overbooked = capacity.weekly_load(allocations, first_week, weeks, capacity_limit)
+    if not loads:
+        st.info("Nobody is booked on approved or in-progress quotes in these weeks.")
+        return
+
+    overbooked_names = {run["name"] for run in overbooked}
+    col1, col2, col3 = st.columns(3)
+    col1.metric("People Booked", len(loads))
+    col2.metric("Overbooked", len(overbooked_names))
+    col3.metric("Peak Load", max(max(row) for row in loads.values()))
+
+    week_labels = [(first_week + timedelta(weeks=week)).strftime("%Y-%m-%d") for week in range(weeks)]
+    shown = {name: row for name, row in loads.items() if name in overbooked_names} if overbooked_only else loads
+    if shown:
+        show_heatmap(shown, week_labels, capacity_limit)
+
+    if overbooked:
+        import pandas as pd
+
+        st.subheader("Overbooked")
+        clients = {allocation["quote_id"]: allocation["client_name"] for allocation in allocations}
+        st.dataframe(pd.DataFrame([{
+            "Member": run["name"],
+            "From": week_labels[run["start"]],
+            "Until": (first_week + timedelta(weeks=run["end"])).strftime("%Y-%m-%d"),
+            "Peak Projects": run["peak"],
+            "Quotes": ", ".join(f"#{quote_id} {clients[quote_id]}" for quote_id in run["quote_ids"]),
+        } for run in sorted(overbooked, key=lambda run: (run["start"], run["name"]))]),
+            use_container_width=True, hide_index=True)
+    else:
+        st.success("Nobody is booked on more projects than they can take.")
+
+if __name__ == "__main__":
+    view_capacity_planner()
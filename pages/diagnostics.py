@@ -0,0 +1,106 @@
+import streamlit as st
+import pandas as pd
+from auth import get_db, initialize_auth
+from db import pool_stats
+import audit
+from config import SLOW_QUERY_MS
+import query_stats
+
+# Process-wide numbers: every session on this server feeds the same counters.
+
+
+def show_top_queries():
+    st.subheader("Top Queries")
+    rows = []
+    for method, stats in list(query_stats.methods.items()):
+        rows.append({
+            "Method": method,
+            "Calls": stats.calls,
+            "Total (ms)": round(stats.total_ms, 1),
+            "Mean (ms)": round(stats.total_ms / stats.calls, 2),
+            "p50 (ms)": round(stats.percentile(0.5), 2),
+            "p95 (ms)": round(stats.percentile(0.95), 2),
+            "Max (ms)": round(stats.max_ms, 1),
+            "Rows/call": round(stats.rows / stats.calls, 1),
+        })
+    if not rows:
+        st.info("No queries recorded yet.")
+        return
+
+    df = pd.DataFrame(rows).sort_values("Total (ms)", ascending=False)
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+    method = st.selectbox("Latency histogram for", df["Method"].tolist())
+    stats = query_stats.methods[method]
+    labels = [f"≤{bound:g} ms" if bound != float("inf") else "slower" for bound in query_stats.LATENCY_BUCKETS_MS]
+    histogram = pd.DataFrame({"Calls": stats.buckets}, index=pd.CategoricalIndex(labels, categories=labels, ordered=True))
+    st.bar_chart(histogram)
+
+
+def show_reruns():
+    st.subheader("Queries per Rerun")
+    rows = [{
+        "Script / Fragment": name,
+        "Runs": stats.runs,
+        "Mean queries": round(stats.queries / stats.runs, 1),
+        "Max queries": stats.max_queries,
+    } for name, stats in list(query_stats.reruns.items()) if stats.runs]
+    if rows:
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    else:
+        st.info("No reruns recorded yet.")
+
+
+def show_slow_queries():
+    st.subheader(f"Slow Queries (≥ {SLOW_QUERY_MS:g} ms)")
+    slow = list(query_stats.slow_queries)
+    if slow:
+        st.dataframe(pd.DataFrame(reversed(slow)), use_container_width=True, hide_index=True)
+    else:
+        st.success("No slow queries recorded.")
+
+
+def show_pool_and_caches():
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.subheader("Reader Pool")
+        pool = pool_stats()
+        st.metric("Checked out", f"{pool['in_use']} / {pool['size']}")
+        st.metric("Peak", pool["peak"])
+        st.metric("Checkouts", pool["checkouts"])
+    with col2:
+        st.subheader("Caches")
+        for name, (hits, misses) in query_stats.cache_stats().items():
+            lookups = hits + misses
+            rate = f"{hits / lookups:.0%}" if lookups else "–"
+            st.metric(name, rate, help=f"{hits} hits, {misses} misses")
+    with col3:
+        st.subheader("Audit Log")
+        events = audit.stats()
+        st.metric("Waiting to be written", events["pending"])
+        st.metric("Written", events["written"], help=f"in {events['flushes']} batches")
+        st.metric("Failed writes", events["failed_flushes"], help=f"{events['dropped']} events dropped")
+
+
+def view_diagnostics():
+    st.title("Diagnostics")
+
+    get_db()
+    if not initialize_auth():
+        return
+    if st.session_state.user.get("role") != "admin":
+        st.error("Diagnostics are only available to admins.")
+        return
+
+    if st.button("Reset Counters"):
+        query_stats.reset()
+        st.rerun()
+
+    show_top_queries()
+    show_reruns()
+    show_slow_queries()
+    show_pool_and_caches()
+
+
+if __name__ == "__main__":
+    view_diagnostics()
@@ -1,15 +1,144 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, date, timedelta
-import plotly.graph_objects as go
-import plotly.express as px
-from db import Database
+from auth import get_db, shows_outage
+from config import CHART_MAX_POINTS
+from query_stats import counts_rerun
+import charts
 
+
+# Figure specs for a range of months, shared across sessions. They are
+# rebuilt when the table changes (version) or another range is chosen,
+# not on every rerun of the page; long series are downsampled so the
+# payload stays under CHART_MAX_POINTS points per trace.
+@st.cache_data(max_entries=32, show_spinner=False)
+def overview_figures(_db, start_date, end_date, version):
+    financial_history = _db.get_monthly_financials(start_date, end_date)
+    if not financial_history:
+        return None
+
+    # pandas and plotly are only needed for the charts on this tab
+    import pandas as pd
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    df = pd.DataFrame(financial_history)
+    df['month'] = pd.to_datetime(df['month'])
+    for column in ['revenue', 'expenses', 'overhead_costs', 'profit_loss']:
+        df[column] = df[column].astype(float)
+    months = list(df['month'])
+
+    # Revenue vs expenses plot
+    fig = go.Figure()
+    x, y = charts.downsample(months, list(df['revenue']), CHART_MAX_POINTS)
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=y,
+        name="Revenue",
+        line=dict(color='green')
+    ))
+    x, y = charts.downsample(months, list(df['expenses'] + df['overhead_costs']), CHART_MAX_POINTS)
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=y,
+        name="Total Costs",
+        line=dict(color='red')
+    ))
+    fig.update_layout(
+        title="Revenue vs Costs Over Time",
+        xaxis_title="Month",
+        yaxis_title="Amount ($)",
+        hovermode='x unified'
+    )
+    trend = fig.to_dict()
+
+    # Monthly profit/loss chart
+    shown = df.iloc[charts.lttb_indices(months, list(df['profit_loss']), CHART_MAX_POINTS)]
+    fig = px.bar(
+        shown,
+        x='month',
+        y='profit_loss',
+        title="Monthly Profit/Loss",
+        color='profit_loss',
+        color_continuous_scale=['red', 'green']
+    )
+
+    return {
+        "trend": trend,
+        "profit_loss": fig.to_dict(),
+        "points": len(df),
+        "shown": len(shown),
+        # Key metrics, from every row rather than the downsampled ones
+        "average_revenue": df['revenue'].mean(),
+        "revenue_change": ((df['revenue'].iloc[-1] / df['revenue'].iloc[0]) - 1) * 100,
+        "average_profit": df['profit_loss'].mean(),
+        "profit_change": ((df['profit_loss'].iloc[-1] / df['profit_loss'].iloc[0]) - 1) * 100,
+        "profit_margin": (df['profit_loss'].sum() / df['revenue'].sum()) * 100,
+    }
+
+
+@st.fragment(key="financial_overview")
+@counts_rerun("financial_overview")
+@shows_outage
+def financial_overview_section():
+    db = get_db()
+    st.subheader("Financial Overview")
+
+    version = db.monthly_financials_version()
+    first_month, last_month = version[0], version[1]
+    if first_month is None:
+        st.info("No historical financial data available yet. Start entering monthly data to see trends and analysis.")
+        return
+
+    # The last 12 months by default; narrowing the range reruns only this
+    # fragment and redraws it at full resolution once it fits
+    default_start = min(max(first_month, date.today().replace(day=1) - timedelta(days=365)), last_month)
+    start_date, end_date = first_month, last_month
+    if first_month < last_month:
+        start_date, end_date = st.slider(
+            "Date Range",
+            min_value=first_month,
+            max_value=last_month,
+            value=(default_start, last_month),
+            format="MMM YYYY",
+            key="overview_range",
+        )
+    overview = overview_figures(db, start_date, end_date + timedelta(days=1), version)
+    if overview is None:
+        st.info("No financial data in this date range.")
+        return
+
+    st.plotly_chart(overview["trend"], use_container_width=True)
+    st.plotly_chart(overview["profit_loss"], use_container_width=True)
+    if overview["shown"] < overview["points"]:
+        st.caption(
+            f"Showing {overview['shown']:,} of {overview['points']:,} points; "
+            "narrow the date range to see every point."
+        )
+
+    # Key metrics
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(
+            "Average Monthly Revenue",
+            f"${overview['average_revenue']:,.2f}",
+            f"{overview['revenue_change']:.1f}% YoY"
+        )
+    with col2:
+        st.metric(
+            "Average Monthly Profit",
+            f"${overview['average_profit']:,.2f}",
+            f"{overview['profit_change']:.1f}% YoY"
+        )
+    with col3:
+        st.metric("Overall Profit Margin", f"{overview['profit_margin']:.1f}%")
+
+
+@counts_rerun("finance_planner")
+@shows_outage
 def view_financial_planner():
     st.title("Financial Planning & Forecasting")
     
-    # Initialize database connection
-    db = Database()
+    db = get_db()
     
     # Create tabs for different sections
     tab1, tab2, tab3 = st.tabs(["Monthly Entry", "Forecasting", "Financial Overview"])
@@ -37,17 +166,8 @@ def view_financial_planner():
             st.markdown("&nbsp;")  # Spacing
             show_previous = st.checkbox("Show Previous Month's Data")
         
-        if show_previous:
-            prev_month = (selected_month - timedelta(days=1)).replace(day=1)
-            prev_data = db.get_monthly_financials(
-                start_date=prev_month,
-                end_date=selected_month
-            )
-            if prev_data:
-                st.info(f"Previous Month's Data ({prev_month.strftime('%B %Y')}):\n"
-                       f"Revenue: ${prev_data[0]['revenue']:,.2f}\n"
-                       f"Expenses: ${prev_data[0]['expenses']:,.2f}\n"
-                       f"Overhead: ${prev_data[0]['overhead_costs']:,.2f}")
+        prev_month = (selected_month - timedelta(days=1)).replace(day=1)
+        previous_container = st.container()
         
         # Financial data input
         col1, col2, col3 = st.columns(3)
@@ -85,10 +205,34 @@ def view_financial_planner():
         )
         forecast_month = forecast_date.replace(day=1)
         st.caption(f"Forecasting for: {forecast_month.strftime('%B %Y')}")
-        
-        # Get forecast data
-        forecast = db.get_financial_forecast(forecast_month)
-        
+        forecast_container = st.container()
+    
+    # Financial Overview Tab
+    with tab3:
+        # Cached and rerun on its own, so the other tabs' reruns don't rebuild it
+        financial_overview_section()
+    
+    # The tabs' reads don't depend on each other, so they run concurrently
+    # and the page waits for the slowest one instead of each in turn.
+    reads = [
+        lambda reader: reader.get_financial_forecast(forecast_month),
+    ]
+    if show_previous:
+        reads.append(lambda reader: reader.get_monthly_financials(
+            start_date=prev_month,
+            end_date=selected_month
+        ))
+    forecast, *previous = db.gather(*reads)
+    
+    with previous_container:
+        if show_previous and previous[0]:
+            prev_data = previous[0]
+            st.info(f"Previous Month's Data ({prev_month.strftime('%B %Y')}):\n"
+                   f"Revenue: ${prev_data[0]['revenue']:,.2f}\n"
+                   f"Expenses: ${prev_data[0]['expenses']:,.2f}\n"
+                   f"Overhead: ${prev_data[0]['overhead_costs']:,.2f}")
+    
+    with forecast_container:
         # Rest of the forecasting tab code remains the same
         col1, col2 = st.columns(2)
         
@@ -130,72 +274,6 @@ def view_financial_planner():
             st.metric("Revenue Gap", f"${breakeven['revenue_gap']:,.2f}")
         
         st.info(f"Potential Additional Revenue from Pending Projects: ${breakeven['potential_projects_value']:,.2f}")
-    
-    # Financial Overview Tab
-    with tab3:
-        st.subheader("Financial Overview")
-        
-        # Get last 12 months of financial data
-        end_date = date.today().replace(day=1)
-        start_date = end_date - timedelta(days=365)
-        financial_history = db.get_monthly_financials(start_date, end_date)
-        
-        if financial_history:
-            df = pd.DataFrame(financial_history)
-            df['month'] = pd.to_datetime(df['month'])
-            
-            # Revenue vs expenses plot
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=df['month'],
-                y=df['revenue'],
-                name="Revenue",
-                line=dict(color='green')
-            ))
-            fig.add_trace(go.Scatter(
-                x=df['month'],
-                y=df['expenses'] + df['overhead_costs'],
-                name="Total Costs",
-                line=dict(color='red')
-            ))
-            fig.update_layout(
-                title="Revenue vs Costs Over Time",
-                xaxis_title="Month",
-                yaxis_title="Amount ($)",
-                hovermode='x unified'
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Monthly profit/loss chart
-            fig = px.bar(
-                df,
-                x='month',
-                y='profit_loss',
-                title="Monthly Profit/Loss",
-                color='profit_loss',
-                color_continuous_scale=['red', 'green']
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Key metrics
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric(
-                    "Average Monthly Revenue",
-                    f"${df['revenue'].mean():,.2f}",
-                    f"{((df['revenue'].iloc[-1] / df['revenue'].iloc[0]) - 1) * 100:.1f}% YoY"
-                )
-            with col2:
-                st.metric(
-                    "Average Monthly Profit",
-                    f"${df['profit_loss'].mean():,.2f}",
-                    f"{((df['profit_loss'].iloc[-1] / df['profit_loss'].iloc[0]) - 1) * 100:.1f}% YoY"
-                )
-            with col3:
-                profit_margin = (df['profit_loss'].sum() / df['revenue'].sum()) * 100
-                st.metric("Overall Profit Margin", f"{profit_margin:.1f}%")
-        else:
-            st.info("No historical financial data available yet. Start entering monthly data to see trends and analysis.")
 
 if __name__ == "__main__":
     view_financial_planner()
\ No newline at end of file
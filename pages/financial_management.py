@@ -1,7 +1,11 @@
 import streamlit as st
 from db import Database
 from datetime import datetime, timedelta
+from auth import shows_outage
+from query_stats import counts_rerun
 
+@counts_rerun("financial_management")
+@shows_outage
 def financial_management():
     st.title("Financial Management")
 
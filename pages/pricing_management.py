@@ -1,7 +1,11 @@
 import streamlit as st
 import pandas as pd
 from db import Database
+from auth import shows_outage
+from query_stats import counts_rerun
 
+@counts_rerun("pricing_management")
+@shows_outage
 def manage_pricing():
     st.title("Pricing Management")
     db = Database()
@@ -1,16 +1,19 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime
-from fpdf import FPDF
-import io
-from db import Database
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.application import MIMEApplication
-from email.mime.multipart import MIMEMultipart
+from datetime import datetime, timedelta
+from auth import get_db, shows_outage
+from query_stats import counts_rerun
+import audit
+import metrics
 
 
 def send_email(recipient_email, subject, body, quote, pdf_bytes=None):
+    # Imported on first send; app.py only needs this module for its actions
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.mime.application import MIMEApplication
+    from email.mime.multipart import MIMEMultipart
+
     # Set up the email message
     msg = MIMEMultipart()
     msg['Subject'] = subject
@@ -35,13 +38,16 @@ Best regards,
         msg.attach(part)
 
     # Send the email
-    with smtplib.SMTP("smtp.gmail.com", 587) as smtp:
-        smtp.starttls()
-        smtp.login(st.secrets["gmail_user"], st.secrets["gmail_password"])
-        smtp.send_message(msg)
-        st.success(f"Email sent to {recipient_email}")
+    with metrics.timed("email_send_seconds", failures="email_failures_total"):
+        with smtplib.SMTP("smtp.gmail.com", 587) as smtp:
+            smtp.starttls()
+            smtp.login(st.secrets["gmail_user"], st.secrets["gmail_password"])
+            smtp.send_message(msg)
+    st.success(f"Email sent to {recipient_email}")
 
 def generate_pdf(quote_details):
+    from fpdf import FPDF
+
     pdf = FPDF()
     pdf.add_page()
     
@@ -73,28 +79,120 @@ def generate_pdf(quote_details):
     #pdf_bytes = pdf.output(dest='S').encode('latin-1')
     return pdf
 
+def render_pdf(quote_details):
+    """Build the quote PDF and return its bytes"""
+    with metrics.timed("pdf_render_seconds"):
+        pdf_bytes = generate_pdf(quote_details).output(dest='S').encode('latin-1')
+    metrics.observe("pdf_size_bytes", len(pdf_bytes))
+    return pdf_bytes
+
+def quote_id_from_label(label):
+    # Labels look like "Quote #12: Client Name"
+    if not label:
+        return None
+    return int(label.split("#")[1].split(":")[0])
+
+# Search shows the best matches rather than every quote
+SEARCH_LIMIT = 50
+
+# KPI period label -> days back (None for all time)
+SUMMARY_PERIODS = {"Last 30 days": 30, "Last 90 days": 90, "Last 12 months": 365, "All time": None}
+WON_STATUSES = ("Approved", "In Progress", "Completed")
+TOP_COMPONENTS = 10
+
+def show_kpis(summary):
+    # summary is quote_summary(["status"]): one row per status
+    by_status = {row["status"]: row for row in summary}
+    def total(statuses, field):
+        return sum(float(by_status[status][field]) for status in statuses if status in by_status)
+
+    won = total(WON_STATUSES, "quote_count")
+    decided = won + total(("Rejected",), "quote_count")
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Quotes", f"{int(total(by_status, 'quote_count')):,}")
+    col2.metric("Pending Pipeline", f"${total(('Pending',), 'total_value'):,.0f}")
+    col3.metric("Won Value", f"${total(WON_STATUSES, 'total_value'):,.0f}")
+    col4.metric("Win Rate", f"{won / decided:.0%}" if decided else "–")
+
+
+def current_username():
+    return st.session_state.get("user", {}).get("username")
+
+
+def show_status_history(events):
+    if not events:
+        st.info("No changes recorded for this quote yet.")
+        return
+    st.dataframe(pd.DataFrame([{
+        "When": event["created_at"].strftime("%Y-%m-%d %H:%M"),
+        "Event": audit.EVENT_LABELS.get(event["event"], event["event"]),
+        "From": event["old_value"] or "",
+        "To": event["new_value"] or "",
+        "By": event["username"] or "",
+    } for event in reversed(events)]), use_container_width=True, hide_index=True)
+
+
+@counts_rerun("project_management")
+@shows_outage
 def view_project_details():
     st.title("Project Management")
     
-    # Initialize database connection
-    db = Database()
-    
-    # Get all quotes from database
-    quotes = db.get_all_quotes()
+    db = get_db()
+
+    period = st.selectbox("Period", list(SUMMARY_PERIODS), index=2, key="summary_period")
+    days = SUMMARY_PERIODS[period]
+    since = datetime.now() - timedelta(days=days) if days else None
+
+    search = st.text_input(
+        "Search quotes",
+        key="quote_search",
+        placeholder="Client name, email or proposal text",
+    ).strip()
+
+    def list_quotes(reader):
+        if search:
+            return reader.search_quotes(search, limit=SEARCH_LIMIT)
+        return reader.get_all_quotes()
+
+    # The selectbox remembers the quote picked on the previous run, so the
+    # KPIs, the list and that quote's details are fetched concurrently.
+    selected_id = quote_id_from_label(st.session_state.get("selected_quote"))
+    reads = [
+        lambda reader: reader.quote_summary(["status"], start=since),
+        lambda reader: reader.component_usage(start=since, limit=TOP_COMPONENTS),
+        list_quotes,
+    ]
+    if selected_id is not None:
+        reads.append(lambda reader: reader.get_quote(selected_id))
+    summary, usage, quotes, *selected = db.gather(*reads)
+    quote = selected[0] if selected else None
+
+    show_kpis(summary)
+    if usage:
+        with st.expander(f"Most Quoted Technologies ({period.lower()})"):
+            st.dataframe(pd.DataFrame({
+                "Technology": [row["component"] for row in usage],
+                "Quotes": [row["quote_count"] for row in usage],
+                "Quoted Value": [f"${float(row['total_value']):,.0f}" for row in usage],
+            }), hide_index=True, use_container_width=True)
     
     if not quotes:
-        st.warning("No quotes available.")
+        if search:
+            st.info(f'No quotes match "{search}".')
+        else:
+            st.warning("No quotes available.")
         return
     
     # Display all quotes in a table format
     quotes_data = []
-    for quote in quotes:
+    for listed in quotes:
         quotes_data.append({
-            "Date": quote["created_at"].strftime("%Y-%m-%d"),
-            "Client": quote["client_name"],
-            "Total Cost": f"${float(quote['total_cost']):,.2f}",
-            "Timeline": f"{quote['timeline']} weeks",
-            "Status": quote.get("status", "Pending")
+            "Date": listed["created_at"].strftime("%Y-%m-%d"),
+            "Client": listed["client_name"],
+            "Total Cost": f"${float(listed['total_cost']):,.2f}",
+            "Timeline": f"{listed['timeline']} weeks",
+            "Status": listed.get("status", "Pending")
         })
     
     if quotes_data:
@@ -104,11 +202,12 @@ def view_project_details():
         # Quote details section
         st.subheader("Quote Details")
         quote_indices = [f"Quote #{q['id']}: {q['client_name']}" for q in quotes]
-        selected_quote = st.selectbox("Select Quote to View", quote_indices)
+        selected_quote = st.selectbox("Select Quote to View", quote_indices, key="selected_quote")
         
         if selected_quote:
-            quote_id = int(selected_quote.split("#")[1].split(":")[0])
-            quote = db.get_quote(quote_id)
+            quote_id = quote_id_from_label(selected_quote)
+            if quote is None or quote["id"] != quote_id:
+                quote = db.get_quote(quote_id)
             
             # Display quote details in expandable sections
             with st.expander("Client Information", expanded=True):
@@ -156,12 +255,11 @@ def view_project_details():
                     st.write("Project Duration:", f"{quote['timeline']} weeks")
                     st.write("Weekly Revenue:", f"${float(quote['total_cost'])/quote['timeline']:,.2f}")
             
-            # Actions
+            # Actions; the proposal text is only loaded for the PDF and email
             col1, col2, col3 = st.columns(3)
             with col1:
                 if st.button("Download PDF", key=f"pdf_{quote_id}"):
-                    pdf = generate_pdf(quote)
-                    pdf_bytes = pdf.output(dest='S').encode('latin-1')
+                    pdf_bytes = render_pdf(dict(quote, proposal_text=db.get_proposal(quote_id)))
                     st.download_button(
                         label="Click to Download",
                         data=pdf_bytes,
@@ -170,12 +268,12 @@ def view_project_details():
                     )
 
                 if st.button("Send to Client", key=f"send_{quote_id}"):
-                    pdf = generate_pdf(quote)
-                    pdf_bytes = pdf.output(dest='S').encode('latin-1')
+                    proposal_text = db.get_proposal(quote_id)
+                    pdf_bytes = render_pdf(dict(quote, proposal_text=proposal_text))
                     send_email(
                         quote["client_email"],
                         f"Project Proposal for {quote['client_name']}",
-                        quote["proposal_text"],
+                        proposal_text,
                         quote,
                         pdf_bytes
                     )
@@ -187,15 +285,20 @@ def view_project_details():
                     index=["Pending", "Approved", "Rejected", "In Progress", "Completed"].index(quote.get("status", "Pending"))
                 )
                 if status != quote.get("status", "Pending"):
-                    db.update_quote_status(quote_id, status)
+                    if db.update_quote_status(quote_id, status):
+                        audit.record(db, quote_id, "status", quote.get("status", "Pending"), status, current_username())
                     st.success(f"Status updated to {status}")
             with col3:
                 if st.button("Delete Quote", key=f"delete_{quote_id}"):
-                    if db.delete_quote(quote_id):
+                    if audit.delete_quote(db, quote_id, quote.get("status"), current_username()):
                         st.success("Quote deleted successfully!")
                         st.rerun()
                     else:
                         st.error("Failed to delete quote!")
+
+            # After the actions, so a status change just made is listed
+            with st.expander("Status History"):
+                show_status_history(audit.quote_history(db, quote_id))
     else:
         st.info("No quotes available. Generate some quotes to see them here.")
 
@@ -1,6 +1,8 @@
 import streamlit as st
 from db import Database
 import pandas as pd
+from auth import shows_outage
+from query_stats import counts_rerun
 
 st.set_page_config(
     page_title="Team Management",
@@ -77,6 +79,8 @@ def handle_team_table(members, role_type, db):
                 row['Rate ($/hour)']
             )
 
+@counts_rerun("team_management")
+@shows_outage
 def main():
     st.title("Team Management")
 
@@ -0,0 +1,117 @@
+import base64
+import hashlib
+import hmac
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+
+from config import PASSWORD_KDF, SCRYPT_N, SCRYPT_R, SCRYPT_P, PBKDF2_ITERATIONS, PASSWORD_WORKERS
+
+# Stored hash formats:
+#   scrypt$<n>$<r>$<p>$<salt>$<hash>
+#   pbkdf2_sha256$<iterations>$<salt>$<hash>
+#   <64 hex chars>                       legacy unsalted SHA-256
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+# hashlib releases the GIL while deriving keys, so a small fixed pool keeps a
+# burst of logins from queueing behind each other on the Streamlit script
+# threads while capping how many cores password hashing can take at once.
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_WORKERS, thread_name_prefix="password-kdf")
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        maxmem=256 * n * r * p, dklen=KEY_BYTES,
+    )
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations, dklen=KEY_BYTES)
+
+
+def current_params(kdf=None):
+    """Return (kdf, params) for the configured work factors"""
+    kdf = kdf or PASSWORD_KDF
+    if kdf == "scrypt":
+        return kdf, {"n": SCRYPT_N, "r": SCRYPT_R, "p": SCRYPT_P}
+    if kdf == "pbkdf2_sha256":
+        return kdf, {"iterations": PBKDF2_ITERATIONS}
+    raise ValueError(f"Unknown password KDF: {kdf}")
+
+
+def hash_password(password, kdf=None, **params):
+    """Hash password with the configured KDF, or an explicit kdf and work factors"""
+    if not params:
+        kdf, params = current_params(kdf)
+    salt = secrets.token_bytes(SALT_BYTES)
+
+    if kdf == "scrypt":
+        key = _scrypt(password, salt, params["n"], params["r"], params["p"])
+        return f"scrypt${params['n']}${params['r']}${params['p']}${_b64encode(salt)}${_b64encode(key)}"
+    if kdf == "pbkdf2_sha256":
+        key = _pbkdf2(password, salt, params["iterations"])
+        return f"pbkdf2_sha256${params['iterations']}${_b64encode(salt)}${_b64encode(key)}"
+    raise ValueError(f"Unknown password KDF: {kdf}")
+
+
+def legacy_hash(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def verify_password(password, stored_hash):
+    """Check password against any supported stored format in constant time"""
+    if not stored_hash:
+        return False
+    parts = stored_hash.split("$")
+
+    if parts[0] == "scrypt" and len(parts) == 6:
+        n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+        key = _scrypt(password, _b64decode(parts[4]), n, r, p)
+        return hmac.compare_digest(key, _b64decode(parts[5]))
+    if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+        key = _pbkdf2(password, _b64decode(parts[2]), int(parts[1]))
+        return hmac.compare_digest(key, _b64decode(parts[3]))
+    if len(parts) == 1 and len(stored_hash) == 64:
+        return hmac.compare_digest(legacy_hash(password), stored_hash)
+    return False
+
+
+def needs_rehash(stored_hash):
+    """True for legacy hashes and hashes made with other than the current work factors"""
+    kdf, params = current_params()
+    parts = stored_hash.split("$")
+    if parts[0] != kdf:
+        return True
+    if kdf == "scrypt":
+        return [int(x) for x in parts[1:4]] != [params["n"], params["r"], params["p"]]
+    return int(parts[1]) != params["iterations"]
+
+
+def submit_verify(password, stored_hash):
+    """Queue a verification on the KDF pool and return its Future"""
+    return _executor.submit(verify_password, password, stored_hash)
+
+
+def submit_hash(password):
+    return _executor.submit(hash_password, password)
+
+
+# Compared against when a username doesn't exist, so unknown and known users
+# take the same time to reject.
+_DUMMY_HASH = None
+
+
+def dummy_hash():
+    global _DUMMY_HASH
+    if _DUMMY_HASH is None:
+        _DUMMY_HASH = hash_password(secrets.token_urlsafe(16))
+    return _DUMMY_HASH
@@ -0,0 +1,73 @@
+import logging
+from datetime import datetime, timedelta
+
+import metrics
+
+# Quote pricing lives outside app.py so it can be used (and benchmarked)
+# without a running Streamlit script.
+
+logger = logging.getLogger(__name__)
+
+
+def apply_psychological_pricing(price):
+    #Apply psychological pricing strategy by converting to .99 format
+    if price >= 100:
+        # For prices >= 100, round to nearest whole number and subtract 0.01
+        return round(price) - 0.01
+    else:
+        # For prices < 100, round to nearest 0.99
+        return round(price - 0.01) + 0.99
+
+
+@metrics.timed("calculate_quote_seconds")
+def calculate_quote(team_selections, timeline_weeks, tech_stack, complexity, marketing_strategy, db):
+    base_cost = 0.0
+    
+    # Calculate team cost
+    team_total = 0
+    for member in team_selections:
+        if member.get("name"):
+            team_member = db.get_team_member_by_name(member["name"])
+            if team_member:
+                team_total += float(team_member["default_rate"]) * float(timeline_weeks)
+    base_cost += team_total
+    
+    # Technology stack costs
+    tech_total = 0
+    for tech in tech_stack:
+        tech_price = db.get_component_price(tech, "Technology Stack")
+        tech_total += float(tech_price["base_price"]) * float(tech_price["multiplier"])
+    base_cost += tech_total
+    
+    # Complexity costs
+    complexity_price = db.get_component_price(complexity, "Complexity")
+    complexity_cost = float(complexity_price["base_price"]) * float(complexity_price["multiplier"])
+    base_cost += complexity_cost
+    
+    # Get the profit margin
+    last_month = (datetime.now() - timedelta(days=30)).strftime("%B %Y")
+    previous_revenue = db.get_previous_month_revenue(last_month)
+    profit_margin = float(previous_revenue) if previous_revenue else 50.0  # Default margin
+    
+    # Calculate total with margin
+    total_cost_with_margin = base_cost * (1 + profit_margin / 100)
+    
+    # Marketing strategy adjustment
+    if marketing_strategy == "Psychological Pricing":
+        total_cost_with_margin = apply_psychological_pricing(total_cost_with_margin)
+    else:
+        strategy_price = db.get_component_price(marketing_strategy, "Pricing Strategy")
+        if strategy_price and 'multiplier' in strategy_price:
+            total_cost_with_margin *= float(strategy_price['multiplier'])
+        else:
+            logger.warning("No valid multiplier for pricing strategy %s", marketing_strategy)
+    
+    # Calculate final profit
+    profit = total_cost_with_margin - base_cost
+    
+    logger.debug(
+        "Quote: team $%.2f, tech $%.2f, complexity $%.2f, base $%.2f, margin %s%% (%s), total $%.2f, profit $%.2f",
+        team_total, tech_total, complexity_cost, base_cost, profit_margin, last_month,
+        total_cost_with_margin, profit,
+    )
+    return base_cost, total_cost_with_margin, profit, profit_margin
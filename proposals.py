@@ -0,0 +1,350 @@
+"""Proposal prompts and templates, and batch regeneration of saved quotes' proposals.
+
+    python proposals.py --status Approved --status Pending --since 2026-01-01
+    python proposals.py --quote 12 --quote 15 --dry-run
+    python proposals.py --status Pending --template
+
+The batch sends the requests concurrently through the async OpenAI client.
+At most --concurrency are in flight, and a token bucket keeps usage under
+--tokens-per-minute. 429s and server errors are retried with backoff.
+Proposals are saved --write-batch at a time.
+"""
+import argparse
+import asyncio
+import functools
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+import metrics
+from config import OPENAI_BASE_URL, PROPOSAL_CONCURRENCY, PROPOSAL_TOKENS_PER_MINUTE
+from config import PROPOSAL_MAX_RETRIES, PROPOSAL_WRITE_BATCH
+
+MODEL = "gpt-3.5-turbo"
+SYSTEM_PROMPT = "You are a professional proposal writer for a web development agency."
+
+# Tokens reserved for a reply before its real size is known
+EXPECTED_COMPLETION_TOKENS = 800
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# What each complexity means for the client, for the template's overview
+# and scope sections
+COMPLEXITY_OVERVIEW = {
+    "Website": "a professional website that presents their business clearly and is easy to keep up to date",
+    "Project": "a custom web project with features built around how their business works",
+    "Product": "a web product, designed and engineered to grow with its users",
+}
+COMPLEXITY_SCOPE = {
+    "Website": ["Responsive design for desktop, tablet and mobile", "Content management, so your team can edit pages",
+                "Basic search engine optimisation and analytics"],
+    "Project": ["Responsive design for desktop, tablet and mobile", "Custom features and integrations agreed in discovery",
+                "Testing, launch and handover"],
+    "Product": ["User research and interface design", "Application features, data model and integrations",
+                "Automated testing, deployment and monitoring", "Launch and handover"],
+}
+
+
+def proposal_prompt(project_details):
+    team_details = "\n".join(
+        [
+            f"- {member['name']} ({member['role']})"
+            for member in project_details["team_selections"]
+        ]
+    )
+
+    return f"""Generate a professional website development proposal for {project_details['client_name']}.
+    Project Details:
+    - Pages: {project_details['pages']}
+    - Complexity: {project_details['complexity']}
+    - Technology Stack: {', '.join(project_details['tech_stack'])}
+    - Timeline: {project_details['timeline']} weeks
+    - Budget: ${project_details['total_cost']:,.2f}
+
+    Team Allocation:
+    {team_details}
+
+    Include:
+    1. Project Overview
+    2. Scope of Work
+    3. Technical Approach
+    4. Timeline
+    5. Team Composition
+    6. Cost Breakdown
+
+    Don't include thing such as:
+    Sincerely,
+    [Your Name]
+    [Web Development Agency]
+    """
+
+
+def proposal_messages(project_details):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": proposal_prompt(project_details)},
+    ]
+
+
+def timeline_phases(weeks):
+    """The timeline split into phases, as dicts with name and first/last week"""
+    if weeks <= 1:
+        parts = [("Design, build, testing and launch", 1)]
+    elif weeks == 2:
+        parts = [("Discovery and design", 1), ("Build, testing and launch", 1)]
+    else:
+        discovery = testing = max(1, round(weeks * 0.2))
+        parts = [("Discovery and design", discovery), ("Development", weeks - discovery - testing),
+                 ("Testing and launch", testing)]
+    phases, first = [], 1
+    for name, length in parts:
+        phases.append({"name": name, "first": first, "last": first + length - 1})
+        first += length
+    return phases
+
+
+@functools.lru_cache(maxsize=None)
+def proposal_template(name="proposal.txt.j2"):
+    import jinja2
+
+    environment = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(TEMPLATE_DIR),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        undefined=jinja2.StrictUndefined,
+    )
+    environment.filters["money"] = lambda value: f"${float(value):,.2f}"
+    return environment.get_template(name)
+
+
+def render_proposal(project_details):
+    """The proposal from templates/proposal.txt.j2, without calling OpenAI.
+
+    Takes the same project_details as the prompt, with the same six
+    sections, and renders in about a millisecond.
+    """
+    complexity = project_details["complexity"]
+    timeline = int(project_details["timeline"])
+    return proposal_template().render(
+        client_name=project_details["client_name"],
+        pages=int(project_details["pages"]),
+        complexity=complexity,
+        overview=COMPLEXITY_OVERVIEW.get(complexity, "a new website"),
+        scope=COMPLEXITY_SCOPE.get(complexity, []),
+        tech_stack=project_details["tech_stack"] or [],
+        timeline=timeline,
+        phases=timeline_phases(timeline),
+        team=project_details["team_selections"],
+        total_cost=project_details["total_cost"],
+    )
+
+
+def record_usage(usage):
+    if usage:
+        metrics.inc("proposal_tokens_total", usage.prompt_tokens, kind="prompt")
+        metrics.inc("proposal_tokens_total", usage.completion_tokens, kind="completion")
+
+
+def openai_api_key():
+    """OPENAI_API_KEY, or openai_api_key from .streamlit/secrets.toml as the app uses"""
+    if os.getenv("OPENAI_API_KEY"):
+        return os.environ["OPENAI_API_KEY"]
+    import tomllib
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".streamlit", "secrets.toml")
+    try:
+        with open(path, "rb") as f:
+            return tomllib.load(f)["openai_api_key"]
+    except (OSError, KeyError) as e:
+        raise SystemExit(f"No OpenAI API key: set OPENAI_API_KEY or openai_api_key in {path}") from e
+
+
+class TokenBucket:
+    """A tokens-per-minute budget shared by the concurrent requests.
+
+    Each request reserves its estimated tokens before it is sent and the
+    estimate is corrected from the reply's usage. Single event loop, so no
+    locking.
+    """
+
+    def __init__(self, tokens_per_minute):
+        self.capacity = tokens_per_minute
+        self.per_second = tokens_per_minute / 60
+        self.tokens = tokens_per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.per_second)
+        self.updated = now
+
+    async def acquire(self, tokens):
+        tokens = min(tokens, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return
+            await asyncio.sleep((tokens - self.tokens) / self.per_second)
+
+    def adjust(self, tokens):
+        """Charge (or, when negative, refund) tokens after the fact"""
+        self._refill()
+        self.tokens -= tokens
+
+    def drain(self):
+        """The server says we're over its limit: everyone waits for a refill"""
+        self._refill()
+        self.tokens = min(self.tokens, 0)
+
+
+def retry_after(error, attempt):
+    """Seconds to wait before retrying: the server's hint, else jittered backoff"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for header, scale in (("retry-after-ms", 1000), ("retry-after", 1)):
+        try:
+            return float(headers[header]) / scale
+        except (KeyError, ValueError):
+            pass
+    return random.uniform(0, min(30, 0.5 * 2 ** attempt))
+
+
+async def _generate_one(client, bucket, semaphore, quote, max_retries, stats):
+    import openai
+
+    messages = proposal_messages(quote)
+    # About four characters per token for English prompts
+    estimate = sum(len(message["content"]) for message in messages) // 4 + EXPECTED_COMPLETION_TOKENS
+    for attempt in range(max_retries + 1):
+        await bucket.acquire(estimate)
+        start = time.perf_counter()
+        try:
+            async with semaphore:
+                response = await client.chat.completions.create(model=MODEL, messages=messages)
+        except (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError) as e:
+            if isinstance(e, openai.RateLimitError):
+                stats["rate_limited"] += 1
+                bucket.drain()
+            else:
+                bucket.adjust(-estimate)
+            if attempt == max_retries:
+                raise
+            stats["retries"] += 1
+            await asyncio.sleep(retry_after(e, attempt))
+            continue
+
+        metrics.observe("proposal_seconds", time.perf_counter() - start)
+        if response.usage:
+            bucket.adjust(response.usage.total_tokens - estimate)
+            stats["tokens"] += response.usage.total_tokens
+        record_usage(response.usage)
+        return response.choices[0].message.content
+
+
+async def _generate_all(db, quotes, client, concurrency, tokens_per_minute, max_retries, write_batch, progress):
+    bucket = TokenBucket(tokens_per_minute)
+    semaphore = asyncio.Semaphore(concurrency)
+    stats = {"generated": 0, "failed": {}, "retries": 0, "rate_limited": 0, "tokens": 0}
+    pending = []
+
+    def flush():
+        if pending and db.save_proposals(pending):
+            stats["generated"] += len(pending)
+        elif pending:
+            stats["failed"].update((quote_id, "could not save") for quote_id, _ in pending)
+        pending.clear()
+
+    async def run(quote):
+        try:
+            text = await _generate_one(client, bucket, semaphore, quote, max_retries, stats)
+        except Exception as e:
+            metrics.inc("proposal_failures_total")
+            stats["failed"][quote["id"]] = str(e)
+        else:
+            pending.append((quote["id"], text))
+            if len(pending) >= write_batch:
+                flush()
+        if progress:
+            progress(stats["generated"] + len(pending) + len(stats["failed"]), len(quotes))
+
+    await asyncio.gather(*(run(quote) for quote in quotes))
+    flush()
+    return stats
+
+
+def generate_proposals(db, quotes, api_key, base_url=OPENAI_BASE_URL, concurrency=PROPOSAL_CONCURRENCY,
+                       tokens_per_minute=PROPOSAL_TOKENS_PER_MINUTE, max_retries=PROPOSAL_MAX_RETRIES,
+                       write_batch=PROPOSAL_WRITE_BATCH, progress=None):
+    """Write a new proposal for each quote (as get_quote returns them) and save it to db.
+
+    Returns {"generated", "failed" ({quote_id: error}), "retries",
+    "rate_limited", "tokens", "seconds"}.
+    """
+    import openai
+
+    async def main():
+        # Retries are handled here, with the token bucket, not by the client
+        client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url or None, max_retries=0)
+        try:
+            return await _generate_all(db, quotes, client, concurrency, tokens_per_minute,
+                                       max_retries, write_batch, progress)
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    stats = asyncio.run(main())
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate the proposals of saved quotes.")
+    parser.add_argument("--quote", type=int, action="append", help="a quote id (repeatable)")
+    parser.add_argument("--status", action="append", help="only quotes with this status (repeatable)")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="only quotes created on or after this date")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="only quotes created before this date")
+    parser.add_argument("--concurrency", type=int, default=PROPOSAL_CONCURRENCY)
+    parser.add_argument("--tokens-per-minute", type=int, default=PROPOSAL_TOKENS_PER_MINUTE)
+    parser.add_argument("--max-retries", type=int, default=PROPOSAL_MAX_RETRIES)
+    parser.add_argument("--write-batch", type=int, default=PROPOSAL_WRITE_BATCH)
+    parser.add_argument("--base-url", default=OPENAI_BASE_URL, help="an OpenAI-compatible API, e.g. a local fake")
+    parser.add_argument("--template", action="store_true", help="render from the local template instead of OpenAI")
+    parser.add_argument("--dry-run", action="store_true", help="list the quotes without generating anything")
+    args = parser.parse_args()
+
+    from db import Database
+
+    db = Database()
+    quote_ids = args.quote or db.get_quote_ids(args.status, args.since, args.until)
+    quotes = [quote for quote in map(db.get_quote, quote_ids) if quote]
+    print(f"{len(quotes)} quotes selected")
+    if args.dry_run or not quotes:
+        return 0
+
+    if args.template:
+        start = time.perf_counter()
+        rendered = [(quote["id"], render_proposal(quote)) for quote in quotes]
+        for batch in range(0, len(rendered), args.write_batch):
+            if not db.save_proposals(rendered[batch:batch + args.write_batch]):
+                return 1
+        print(f"Rendered {len(rendered)} proposals in {time.perf_counter() - start:.1f}s")
+        return 0
+
+    def progress(done, total):
+        print(f"\r{done}/{total}", end="", flush=True)
+
+    stats = generate_proposals(
+        db, quotes, openai_api_key(), args.base_url, args.concurrency,
+        args.tokens_per_minute, args.max_retries, args.write_batch, progress,
+    )
+    print(f"\nGenerated {stats['generated']} proposals in {stats['seconds']:.1f}s "
+          f"({stats['tokens']} tokens, {stats['rate_limited']} rate limited, {stats['retries']} retries)")
+    for quote_id, error in stats["failed"].items():
+        print(f"Quote #{quote_id} failed: {error}")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
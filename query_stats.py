@@ -0,0 +1,225 @@
+import functools
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from config import SLOW_QUERY_MS
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float("inf")]
+RECENT_SAMPLES = 512
+SLOW_LOG_SIZE = 200
+
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class MethodStats:
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS_MS)
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def record(self, elapsed_ms, rows):
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.rows += rows
+        self.recent.append(elapsed_ms)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[i] += 1
+                break
+
+    def percentile(self, q):
+        samples = sorted(self.recent)
+        if not samples:
+            return 0.0
+        return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+
+class RerunStats:
+    def __init__(self):
+        self.runs = 0
+        self.queries = 0
+        self.max_queries = 0
+
+    def record(self, queries):
+        self.runs += 1
+        self.queries += queries
+        self.max_queries = max(self.max_queries, queries)
+
+
+methods = {}
+reruns = {}
+slow_queries = deque(maxlen=SLOW_LOG_SIZE)
+_caches = {}
+
+
+def record_query(method, sql, elapsed_ms, rows):
+    with _lock:
+        stats = methods.get(method)
+        if stats is None:
+            stats = methods[method] = MethodStats()
+        stats.record(elapsed_ms, rows)
+        if elapsed_ms >= SLOW_QUERY_MS:
+            slow_queries.append({
+                "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "method": method,
+                "ms": round(elapsed_ms, 1),
+                "rows": rows,
+                "sql": " ".join(sql.split())[:500],
+            })
+    if elapsed_ms >= SLOW_QUERY_MS:
+        print(f"Slow query ({elapsed_ms:.0f} ms) in {method}: {' '.join(sql.split())[:200]}")
+
+    run = getattr(_local, "run", None)
+    if run is not None:
+        run["queries"] += 1
+
+
+def register_cache(name, stats):
+    """Show a cache on the diagnostics page; stats() returns (hits, misses)"""
+    _caches[name] = stats
+
+
+def cache_stats():
+    return {name: stats() for name, stats in _caches.items()}
+
+
+def reset():
+    with _lock:
+        methods.clear()
+        reruns.clear()
+        slow_queries.clear()
+
+
+def counts_rerun(name):
+    """Count the queries made while fn runs as one rerun of name.
+
+    Fragments called during a full run are counted as part of that run;
+    when a fragment reruns on its own it is counted under its own name.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "run", None) is not None:
+                return fn(*args, **kwargs)
+            _local.run = {"queries": 0}
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                run, _local.run = _local.run, None
+                with _lock:
+                    stats = reruns.get(name)
+                    if stats is None:
+                        stats = reruns[name] = RerunStats()
+                    stats.record(run["queries"])
+        return wrapper
+    return decorator
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+@contextmanager
+def attached(run):
+    """Count queries on this (worker) thread towards another thread's rerun"""
+    previous = getattr(_local, "run", None)
+    _local.run = run
+    try:
+        yield
+    finally:
+        _local.run = previous
+
+
+def _caller_name(frame):
+    code = frame.f_code
+    return getattr(code, "co_qualname", code.co_name)
+
+
+class InstrumentedCursor:
+    """Times execute plus the fetches that follow it, per calling method"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._pending = None
+
+    def _flush(self):
+        if self._pending is not None:
+            record_query(*self._pending)
+            self._pending = None
+
+    def execute(self, sql, params=None):
+        self._flush()
+        method = _caller_name(sys._getframe(1))
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, params) if params is not None else self._cursor.execute(sql)
+        finally:
+            self._pending = [method, sql, (time.perf_counter() - start) * 1000, 0]
+
+    def executemany(self, sql, seq_params):
+        self._flush()
+        method = _caller_name(sys._getframe(1))
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, seq_params)
+        finally:
+            self._pending = [method, sql, (time.perf_counter() - start) * 1000, 0]
+
+    def _timed_fetch(self, fetch, *args):
+        start = time.perf_counter()
+        result = fetch(*args)
+        if self._pending is not None:
+            self._pending[2] += (time.perf_counter() - start) * 1000
+            if isinstance(result, list):
+                self._pending[3] += len(result)
+            elif result is not None:
+                self._pending[3] += 1
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch(self._cursor.fetchone)
+
+    def fetchall(self):
+        rows = self._timed_fetch(self._cursor.fetchall)
+        # Nothing more to read, and reused (prepared) cursors are never closed
+        self._flush()
+        return rows
+
+    def fetchmany(self, size=1):
+        return self._timed_fetch(self._cursor.fetchmany, size)
+
+    def close(self):
+        self._flush()
+        return self._cursor.close()
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    def __init__(self, connection):
+        self.raw = connection
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self.raw.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+def instrument(connection):
+    if connection is None or isinstance(connection, InstrumentedConnection):
+        return connection
+    return InstrumentedConnection(connection)